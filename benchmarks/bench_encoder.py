@@ -0,0 +1,45 @@
+"""Compares the NumPy encoder against qrcode's make(fit=True).
+
+Run from the project root:
+
+    python -m benchmarks.bench_encoder [--error-correction M] [--repeat 5]
+"""
+import argparse
+import timeit
+
+import qrcode
+
+from src.app.qrcodes.encoder import ERROR_CORRECTION_LEVELS, encode_matrix
+
+
+def qrcode_matrix(url: str, level: int):
+    """Encodes a URL the way the service did before, starting from version 1."""
+    qr = qrcode.QRCode(version=1, border=5, error_correction=level)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--error-correction", default="M", choices=list(ERROR_CORRECTION_LEVELS))
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    level = ERROR_CORRECTION_LEVELS[args.error_correction]
+
+    print(f"{'length':>6} {'version':>7} {'qrcode ms':>10} {'encoder ms':>11} {'speedup':>8}")
+    # Up to the largest byte payload that fits at level H
+    for length in (10, 25, 50, 100, 200, 400, 800, 1200):
+        url = ("https://example.com/" + "x" * length)[:length]
+        # The first call builds the layout of the version, which happens once per process
+        matrix = encode_matrix(url, args.error_correction)
+        version = (len(matrix) - 2 * 5 - 17) // 4
+
+        # Take the best of several runs to reduce scheduling noise
+        slow = min(timeit.repeat(lambda: qrcode_matrix(url, level), number=1, repeat=args.repeat)) * 1000
+        fast = min(timeit.repeat(lambda: encode_matrix(url, args.error_correction), number=1, repeat=args.repeat)) * 1000
+        print(f"{length:>6} {version:>7} {slow:>10.2f} {fast:>11.2f} {slow / fast:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
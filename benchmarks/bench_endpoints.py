@@ -0,0 +1,155 @@
+"""Load-tests the main HTTP endpoints and reports throughput and latency.
+
+Each scenario runs closed-loop client threads against the Flask app for a
+fixed duration and reports requests per second, p50/p95/p99 latency and
+response statuses as JSON. The app talks to the MongoDB at MONGODB_URI
+(a local mongod) unless --mongomock is given.
+
+Scenarios:
+    my_qrcodes      GET  /qrcodes/my_qrcodes for a user owning --seed-qr-codes QR codes
+    user_analytics  GET  /analytics/user/<user_id>
+    scan            POST /scans/<qr_code_id>, spread over the seeded QR codes
+    generate        POST /qrcodes/generate, with a new URL each time so renders are never cached
+
+Run from the project root:
+
+    python -m benchmarks.bench_endpoints [--mongomock] [--duration 10] [--output endpoints.json]
+"""
+import argparse
+import itertools
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+from bson import ObjectId
+
+from benchmarks.common import load_app, percentiles, write_results
+
+# A request to send, as (method, path, JSON body or None)
+Request = Tuple[str, str, Any]
+
+
+def seed(app, qr_codes: int, scans: int) -> Dict[str, Any]:
+    """Registers a benchmark user owning QR codes with some scans.
+
+    Returns:
+        The user's ID, its Authorization headers and the IDs of its QR codes.
+    """
+    from src.app.analytics.ingest import scan_ingestor
+    from src.app.qrcodes.models import create_qr_codes
+
+    client = app.test_client()
+    # Register a fresh account each run, so a real database never holds a stale one
+    email = f"bench-{ObjectId()}@example.com"
+    response = client.post('/auth/register', json={"username": "bench", "email": email, "password": "benchpassword"})
+    user_id: str = response.get_json()["user_id"]
+    response = client.post('/auth/login', json={"email": email, "password": "benchpassword"})
+    headers = {"Authorization": f"Bearer {response.get_json()['access_token']}"}
+
+    saved = create_qr_codes(ObjectId(user_id), [
+        {"url": f"https://example.com/products/{index}", "title": f"Product {index}"} for index in range(qr_codes)
+    ])
+    qr_code_ids = [str(qr_code["_id"]) for qr_code in saved]
+    for index in range(scans):
+        client.post(f'/scans/{qr_code_ids[index % len(qr_code_ids)]}')
+    scan_ingestor.flush()
+    return {"user_id": user_id, "headers": headers, "qr_code_ids": qr_code_ids}
+
+
+def scenarios(fixture: Dict[str, Any]) -> Dict[str, Callable[[], Request]]:
+    """Returns, for each scenario, a function building its next request."""
+    qr_code_ids: List[str] = fixture["qr_code_ids"]
+    # next() on a count is atomic under the GIL, so the threads can share them
+    scan_counter = itertools.count()
+    generate_counter = itertools.count()
+    return {
+        "my_qrcodes": lambda: ("GET", '/qrcodes/my_qrcodes', None),
+        "user_analytics": lambda: ("GET", f"/analytics/user/{fixture['user_id']}", None),
+        "scan": lambda: ("POST", f"/scans/{qr_code_ids[next(scan_counter) % len(qr_code_ids)]}", None),
+        "generate": lambda: (
+            "POST", '/qrcodes/generate', {"url": f"https://example.com/bench/{next(generate_counter)}"}
+        ),
+    }
+
+
+def run_scenario(
+    app, next_request: Callable[[], Request], headers: Dict[str, str], concurrency: int, duration: float
+) -> Dict[str, Any]:
+    """Sends requests from ``concurrency`` threads for ``duration`` seconds."""
+    deadline = time.monotonic() + duration
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    lock = threading.Lock()
+
+    def client_loop() -> None:
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            method, path, body = next_request()
+            start = time.perf_counter()
+            response = client.open(path, method=method, json=body, headers=headers)
+            # Read the whole body, as a real client would
+            response.get_data()
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies.append(elapsed)
+                statuses[response.status_code] += 1
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=client_loop) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    return {
+        "concurrency": concurrency,
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / elapsed,
+        "latency": percentiles(latencies),
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongomock", action="store_true", help="use an in-memory MongoDB stand-in")
+    parser.add_argument("--scenarios", nargs="+", default=["my_qrcodes", "user_analytics", "scan", "generate"])
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=1.0, help="seconds of unrecorded load before each scenario")
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--seed-qr-codes", type=int, default=100)
+    parser.add_argument("--seed-scans", type=int, default=1000)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    app = load_app(args.mongomock)
+    from src.app.analytics.ingest import scan_ingestor
+
+    fixture = seed(app, args.seed_qr_codes, args.seed_scans)
+    requests = scenarios(fixture)
+    unknown = set(args.scenarios) - set(requests)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in args.scenarios:
+        if args.warmup > 0:
+            run_scenario(app, requests[name], fixture["headers"], args.concurrency, args.warmup)
+        results[name] = run_scenario(app, requests[name], fixture["headers"], args.concurrency, args.duration)
+        # Write the buffered scans before the next scenario reads analytics
+        scan_ingestor.flush()
+        # Progress goes to stderr so stdout stays valid JSON
+        print(
+            f"{name:>15}  {results[name]['requests_per_second']:8.1f} req/s  "
+            f"p99 {results[name]['latency']['p99_ms']:8.2f} ms",
+            file=sys.stderr,
+        )
+
+    write_results("endpoints", results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+"""Times JSON responses of large lists of QR code and scan documents.
+
+Compares three ways of building the response of a list endpoint:
+
+    copy_stdlib  each document copied to stringify its ObjectIds, then Flask's default provider
+    raw_stdlib   the documents as stored, through BSONJSONProvider without orjson
+    raw_orjson   the documents as stored, through BSONJSONProvider with orjson (when installed)
+
+Documents are built in memory, so only serialization is timed.
+
+Run from the project root:
+
+    python -m benchmarks.bench_json [--documents 100000] [--repeat 3] [--output json.json]
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+from bson import ObjectId
+from flask import Flask
+
+from benchmarks.common import write_results
+from src.utils import json_provider
+from src.utils.json_provider import BSONJSONProvider
+
+
+def qr_code_documents(count: int) -> List[Dict[str, Any]]:
+    """Builds QR code documents shaped like those of the qrcodes collection."""
+    user_id = ObjectId()
+    created_at = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "user_id": user_id,
+            "code": f"c{index:07d}",
+            "url": f"https://example.com/products/{index}",
+            "title": f"Product {index}",
+            "foreground_color": "#000000",
+            "background_color": "#ffffff",
+            "logo_path": None,
+            "logo_id": None,
+            "error_correction": "M",
+            "created_at": created_at + timedelta(seconds=index),
+        }
+        for index in range(count)
+    ]
+
+
+def scan_documents(count: int) -> List[Dict[str, Any]]:
+    """Builds scan documents shaped like those of the scans collection."""
+    qr_code_id = ObjectId()
+    timestamp = datetime(2024, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "qr_code_id": qr_code_id,
+            "timestamp": timestamp + timedelta(seconds=index),
+            "user_agent": "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X)",
+            "ip_address": "203.0.113.7",
+        }
+        for index in range(count)
+    ]
+
+
+def stringify_ids(document: Dict[str, Any]) -> Dict[str, Any]:
+    """Copies a document with its ObjectIds as strings, like the models did before."""
+    return {key: str(value) if isinstance(value, ObjectId) else value for key, value in document.items()}
+
+
+def time_response(app: Flask, build: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    """Returns the best time of building a response, and the size of its body."""
+    with app.app_context():
+        body = build().get_data()
+        seconds = min(timeit.repeat(build, number=1, repeat=repeat))
+    return {"response_ms": seconds * 1000, "bytes": len(body), "mb_per_second": len(body) / seconds / 1e6}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--documents", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    default_app = Flask(__name__)
+    bson_app = Flask(__name__)
+    bson_app.json = BSONJSONProvider(bson_app)
+    orjson = json_provider.orjson
+
+    results: Dict[str, Dict[str, Any]] = {}
+    for name, documents in (("qrcodes", qr_code_documents(args.documents)), ("scans", scan_documents(args.documents))):
+        results[name] = {
+            "copy_stdlib": time_response(
+                default_app,
+                lambda: default_app.json.response([stringify_ids(document) for document in documents]),
+                args.repeat,
+            ),
+        }
+        # The same provider with its C encoder switched off
+        json_provider.orjson = None
+        results[name]["raw_stdlib"] = time_response(bson_app, lambda: bson_app.json.response(documents), args.repeat)
+        json_provider.orjson = orjson
+        if orjson is not None:
+            results[name]["raw_orjson"] = time_response(bson_app, lambda: bson_app.json.response(documents), args.repeat)
+        # Progress goes to stderr so stdout stays valid JSON
+        for mode, timing in results[name].items():
+            print(f"{name:>8} {mode:>12}  {timing['response_ms']:9.1f} ms  {timing['mb_per_second']:7.1f} MB/s", file=sys.stderr)
+
+    write_results("json", results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Measures /scans latency while /auth/login traffic saturates bcrypt.
+
+Runs the same mixed load twice: once with an effectively unbounded
+password hashing pool and once with the configured admission limits, and
+reports the scan latency percentiles and login outcomes of each run.
+
+Run from the project root:
+
+    python -m benchmarks.bench_login_isolation [--mongomock] [--duration 10]
+"""
+import argparse
+import json
+import threading
+import time
+from collections import Counter
+
+from bson import ObjectId
+
+from benchmarks.common import load_app, percentiles
+
+
+def run_mix(app, login_threads: int, scan_threads: int, duration: float) -> dict:
+    """Runs concurrent logins and scans for ``duration`` seconds."""
+    from src.app.analytics.ingest import scan_ingestor
+
+    deadline = time.monotonic() + duration
+    scan_latencies = []
+    login_statuses = Counter()
+    lock = threading.Lock()
+    qr_code_id = str(ObjectId())
+
+    def login_loop():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            response = client.post('/auth/login', json={"email": "bench@example.com", "password": "benchpassword"})
+            with lock:
+                login_statuses[response.status_code] += 1
+
+    def scan_loop():
+        client = app.test_client()
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            client.post(f'/scans/{qr_code_id}')
+            elapsed = time.perf_counter() - start
+            with lock:
+                scan_latencies.append(elapsed)
+
+    threads = [threading.Thread(target=login_loop) for _ in range(login_threads)]
+    threads += [threading.Thread(target=scan_loop) for _ in range(scan_threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    scan_ingestor.flush()
+
+    return {
+        "scans": percentiles(scan_latencies),
+        "scans_per_second": len(scan_latencies) / duration,
+        "logins": {str(status): count for status, count in sorted(login_statuses.items())},
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mongomock", action="store_true", help="use an in-memory MongoDB stand-in")
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--login-threads", type=int, default=16)
+    parser.add_argument("--scan-threads", type=int, default=4)
+    args = parser.parse_args()
+
+    app = load_app(args.mongomock)
+    from src.app.auth.hashing import password_hasher
+    from src.config import BCRYPT_MAX_CONCURRENCY, BCRYPT_QUEUE_DEPTH
+
+    client = app.test_client()
+    client.post('/auth/register', json={"username": "bench", "email": "bench@example.com", "password": "benchpassword"})
+
+    results = {}
+    # Baseline: every login thread may hash at the same time
+    password_hasher.__init__(max_workers=args.login_threads, max_queue=args.login_threads)
+    results["unbounded"] = run_mix(app, args.login_threads, args.scan_threads, args.duration)
+    # Configured admission control
+    password_hasher.__init__(max_workers=BCRYPT_MAX_CONCURRENCY, max_queue=BCRYPT_QUEUE_DEPTH)
+    results["bounded"] = run_mix(app, args.login_threads, args.scan_threads, args.duration)
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""Compares the NumPy rasterizer against qrcode's PIL image factory.
+
+Run from the project root:
+
+    python -m benchmarks.bench_rasterizer [--box-size 10] [--repeat 5]
+"""
+import argparse
+import io
+import timeit
+
+import qrcode
+
+from src.app.qrcodes.rasterizer import rasterize_matrix
+
+
+def build_qr(version: int, box_size: int) -> qrcode.QRCode:
+    """Builds a QR code of exactly the given version."""
+    qr = qrcode.QRCode(version=version, box_size=box_size, border=5)
+    qr.add_data("QR")
+    qr.make(fit=False)
+    return qr
+
+
+def encode_png(img) -> bytes:
+    """Encodes an image to PNG bytes."""
+    buffer = io.BytesIO()
+    img.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--box-size", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fill", default="#1a237e")
+    parser.add_argument("--back", default="#ffffff")
+    args = parser.parse_args()
+
+    print(f"{'version':>7} {'pil draw ms':>12} {'numpy ms':>10} {'speedup':>8} {'pil+png ms':>11} {'numpy+png ms':>13}")
+    for version in range(1, 41):
+        qr = build_qr(version, args.box_size)
+        matrix = qr.get_matrix()
+
+        def pil_draw():
+            return qr.make_image(fill_color=args.fill, back_color=args.back).get_image()
+
+        def numpy_draw():
+            return rasterize_matrix(matrix, args.box_size, args.fill, args.back)
+
+        # Take the best of several runs to reduce scheduling noise
+        pil = min(timeit.repeat(pil_draw, number=1, repeat=args.repeat)) * 1000
+        fast = min(timeit.repeat(numpy_draw, number=1, repeat=args.repeat)) * 1000
+        pil_png = min(timeit.repeat(lambda: encode_png(pil_draw()), number=1, repeat=args.repeat)) * 1000
+        fast_png = min(timeit.repeat(lambda: encode_png(numpy_draw()), number=1, repeat=args.repeat)) * 1000
+        print(f"{version:>7} {pil:>12.2f} {fast:>10.2f} {pil / fast:>7.1f}x {pil_png:>11.2f} {fast_png:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
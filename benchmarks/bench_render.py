@@ -0,0 +1,115 @@
+"""Measures generate_qr_code by QR code version, box size and logo.
+
+Each combination is rendered with the render cache cleared before every
+call ("cold", the full encode, rasterize and PNG encode path) and again
+with the cache warm, and reported as latency percentiles in JSON.
+
+Run from the project root:
+
+    python -m benchmarks.bench_render [--versions 1 5 10 20 40] [--output render.json]
+"""
+import argparse
+import io
+import sys
+import time
+from typing import Callable, Dict, List
+
+from bson import ObjectId
+from PIL import Image
+from qrcode import util
+from qrcode.constants import ERROR_CORRECT_M
+
+from benchmarks.common import load_app, percentiles, write_results
+
+LOGO_MODES = ("none", "inline", "stored")
+
+
+def payload_for_version(version: int) -> str:
+    """Returns the longest URL that still fits a QR code of the given version at level M."""
+    # Lowercase URLs are encoded as a single byte segment: 4 bits of mode, then the length
+    length_bits = 8 if version < 10 else 16
+    length = (util.BIT_LIMIT_TABLE[ERROR_CORRECT_M][version] - 4 - length_bits) // 8
+    return ("https://example.com/" + "q" * length)[:length]
+
+
+def logo_png() -> bytes:
+    """Returns a colorful RGBA logo, like a typical brand mark."""
+    logo = Image.new('RGBA', (512, 512), (0, 0, 0, 0))
+    logo.paste((220, 40, 60, 255), (64, 64, 448, 448))
+    logo.paste((30, 90, 200, 255), (160, 160, 352, 352))
+    buffer = io.BytesIO()
+    logo.save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+def measure(render: Callable[[], object], repeat: int, before: Callable[[], None]) -> List[float]:
+    """Times ``render`` ``repeat`` times, calling ``before`` untimed ahead of each run."""
+    samples: List[float] = []
+    for _ in range(repeat):
+        before()
+        start = time.perf_counter()
+        render()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--versions", type=int, nargs="+", default=[1, 5, 10, 20, 40])
+    parser.add_argument("--box-sizes", type=int, nargs="+", default=[4, 10, 20])
+    parser.add_argument("--logos", nargs="+", choices=LOGO_MODES, default=list(LOGO_MODES))
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    # Renders never query MongoDB, but the app must load for the settings to be validated
+    load_app(use_mongomock=True)
+    from src.app.qrcodes.cache import render_cache
+    from src.app.qrcodes.encoder import encode_matrix
+    from src.app.qrcodes.logos import logo_store
+    from src.app.qrcodes.rendering import generate_qr_code
+
+    # Time renders against the in-process tier only, not a shared RENDER_CACHE_DIR
+    render_cache.disk = None
+    logo_bytes = logo_png()
+    logo_id = str(ObjectId())
+    logo_store.save(logo_id, logo_bytes)
+
+    results: Dict[str, Dict[str, object]] = {}
+    try:
+        for version in args.versions:
+            url = payload_for_version(version)
+            # Guard against the payload landing on another version
+            assert len(encode_matrix(url, border=0)) == 17 + 4 * version
+            for box_size in args.box_sizes:
+                for logo in args.logos:
+                    def render() -> object:
+                        return generate_qr_code(
+                            url,
+                            "",
+                            box_size=box_size,
+                            logo=io.BytesIO(logo_bytes) if logo == "inline" else None,
+                            logo_id=logo_id if logo == "stored" else None,
+                        )
+
+                    cold = measure(render, args.repeat, render_cache.clear)
+                    warm = measure(render, args.repeat, lambda: None)
+                    name = f"v{version}/box{box_size}/logo-{logo}"
+                    results[name] = {
+                        "version": version,
+                        "box_size": box_size,
+                        "logo": logo,
+                        "image_side_px": (17 + 4 * version + 10) * box_size,
+                        "cold": percentiles(cold),
+                        "warm": percentiles(warm),
+                    }
+                    # Progress goes to stderr so stdout stays valid JSON
+                    print(f"{name:>28}  cold p50 {results[name]['cold']['p50_ms']:8.2f} ms", file=sys.stderr)
+    finally:
+        logo_store.delete(logo_id)
+
+    write_results("render", results, args.output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Helpers shared by the benchmark scripts."""
+import json
+import os
+import platform
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+
+def load_app(use_mongomock: bool = False):
+    """Imports the Flask app, optionally backed by an in-memory mongomock client.
+
+    Without mongomock the app talks to the MongoDB at MONGODB_URI, like in
+    production. The shared client is created lazily, so swapping the client
+    class before the first query is enough.
+    """
+    # The app refuses to import without these settings
+    os.environ.setdefault("PORT", "5000")
+    os.environ.setdefault("JWT_SECRET_KEY", "benchmark-secret-key-of-at-least-32-bytes")
+    if use_mongomock:
+        import mongomock
+        from src.db import database
+        database.MongoClient = mongomock.MongoClient
+    from src import app
+    app.config['TESTING'] = True
+    return app
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Returns the p50/p95/p99 and mean of latency samples, in milliseconds."""
+    if not samples:
+        return {"count": 0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    ordered = sorted(samples)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": pick(0.50),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+    }
+
+
+def git_commit() -> Optional[str]:
+    """Returns the commit the benchmarks run on, or None outside a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def write_results(benchmark: str, results: Dict[str, Any], output: Optional[str] = None) -> None:
+    """Prints benchmark results as JSON, and writes them to ``output`` if given.
+
+    The results are tagged with the commit and Python version they were
+    measured on, so files from two commits can be compared with
+    ``python -m benchmarks.compare``.
+    """
+    document = {
+        "benchmark": benchmark,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "results": results,
+    }
+    text = json.dumps(document, indent=2)
+    print(text)
+    if output:
+        with open(output, 'w') as f:
+            f.write(text + "\n")
@@ -0,0 +1,63 @@
+"""Compares two benchmark result files and flags regressions.
+
+Latencies (``*_ms``) regress when they grow, throughputs (``*_per_second``)
+when they shrink. Exits with status 1 if any metric regressed by more
+than the threshold, so it can gate a CI job.
+
+Run from the project root:
+
+    python -m benchmarks.compare baseline.json candidate.json [--threshold 0.10]
+"""
+import argparse
+import json
+import sys
+from typing import Any, Dict, Iterator, Tuple
+
+
+def metrics(results: Dict[str, Any], prefix: str = "") -> Iterator[Tuple[str, float]]:
+    """Yields the (path, value) of every latency and throughput in nested results."""
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            yield from metrics(value, f"{path}.")
+        elif isinstance(value, (int, float)) and (key.endswith("_ms") or key.endswith("_per_second")):
+            yield path, float(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=0.10, help="relative change counted as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+    if baseline["benchmark"] != candidate["benchmark"]:
+        parser.error(f"cannot compare {baseline['benchmark']} results with {candidate['benchmark']} results")
+
+    before = dict(metrics(baseline["results"]))
+    after = dict(metrics(candidate["results"]))
+    print(f"{baseline['benchmark']}: {baseline['commit']} -> {candidate['commit']}")
+    print(f"{'metric':<50} {'baseline':>12} {'candidate':>12} {'change':>8}")
+
+    regressions = 0
+    for path in sorted(before.keys() & after.keys()):
+        old, new = before[path], after[path]
+        change = (new - old) / old if old else 0.0
+        # A slower latency or a lower throughput is worse
+        worse = change if path.endswith("_ms") else -change
+        flag = ""
+        if worse > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{path:<50} {old:>12.2f} {new:>12.2f} {change:>+7.1%}{flag}")
+
+    print(f"{regressions} regression(s) above {args.threshold:.0%}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == '__main__':
+    main()
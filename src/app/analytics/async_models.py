@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING
+from pymongo.asynchronous.cursor import AsyncCursor
+
+# Share the query builders with the synchronous models
+from src.app.analytics.models import (
+    field_histogram_pipeline,
+    fold_rollups,
+    rollup_decrements,
+    rollup_histogram_query,
+    scans_query,
+    total_scans_pipeline,
+)
+from src.config import ANALYTICS_CURSOR_BATCH_SIZE
+from src.db.async_database import get_async_collection
+
+scans_collection = get_async_collection('scans')
+scan_rollups_collection = get_async_collection('scan_rollups')
+
+def find_scans_by_qr_code(
+    qr_code_id: ObjectId,
+    after: Optional[ObjectId] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = ANALYTICS_CURSOR_BATCH_SIZE,
+) -> AsyncCursor:
+    """Returns an async cursor over the scan events of a QR code, oldest first.
+
+    Takes the same arguments as the synchronous find_scans_by_qr_code; iterate
+    the cursor with ``async for``.
+
+    Returns:
+        A pymongo AsyncCursor over the matching scan documents.
+    """
+    query = scans_query(qr_code_id, after, since, until)
+    projection = {field: 1 for field in fields} if fields else None
+
+    cursor = scans_collection.find(query, projection).sort("_id", ASCENDING).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+async def get_scans_by_qr_code(
+    qr_code_id: ObjectId,
+    after: Optional[ObjectId] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieves a page of scan events for a given QR code.
+
+    Returns:
+        A list of scan documents, as stored; the app's JSON provider encodes their ObjectIds.
+    """
+    return await find_scans_by_qr_code(qr_code_id, after, limit, fields, since, until).to_list(None)
+
+async def get_total_scans_by_user(user_id: ObjectId) -> List[Dict[str, int]]:
+    """Calculates the total number of scans for all QR codes owned by a user.
+
+    Returns:
+        A list containing a single dictionary with the total scan count.
+    """
+    cursor = await scan_rollups_collection.aggregate(total_scans_pipeline(user_id))
+    result = await cursor.to_list()
+
+    return result if result else [{"total_scans": 0}]
+
+async def get_rollup_histogram(
+    scope: str,
+    key: ObjectId,
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Reads a time histogram of scans from the rollup documents.
+
+    Returns:
+        A list of {"key": bucket start, "count": scans} dictionaries, oldest first.
+    """
+    rollups = scan_rollups_collection.find(
+        rollup_histogram_query(scope, key, by, since, until), {"_id": 0, "bucket": 1, "count": 1}
+    ).sort("bucket", ASCENDING)
+    return fold_rollups(await rollups.to_list(), by)
+
+async def get_field_histogram(
+    qr_code_ids: List[ObjectId],
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Groups the raw scans of some QR codes by browser family or IP prefix.
+
+    Returns:
+        A list of {"key": group, "count": scans} dictionaries, largest first.
+    """
+    cursor = await scans_collection.aggregate(field_histogram_pipeline(qr_code_ids, by, since, until))
+    return await cursor.to_list()
+
+async def delete_scans_of_qr_codes(qr_code_ids: List[ObjectId], user_id: ObjectId) -> int:
+    """Deletes the scans and rollups of deleted QR codes (see the synchronous model).
+
+    Returns:
+        The number of deleted scans.
+    """
+    rollups_query = {"scope": "qr_code", "key": {"$in": qr_code_ids}}
+    rollups = await scan_rollups_collection.find(
+        rollups_query, {"granularity": 1, "bucket": 1, "count": 1}
+    ).to_list(None)
+    decrements = rollup_decrements(rollups, user_id)
+    if decrements:
+        await scan_rollups_collection.bulk_write(decrements, ordered=False)
+        await scan_rollups_collection.delete_many({"scope": "user", "key": user_id, "count": {"$lte": 0}})
+    await scan_rollups_collection.delete_many(rollups_query)
+    result = await scans_collection.delete_many({"qr_code_id": {"$in": qr_code_ids}})
+    return result.deleted_count
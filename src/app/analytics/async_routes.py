@@ -0,0 +1,175 @@
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from bson.objectid import ObjectId, InvalidId
+from quart import Blueprint, current_app, jsonify, request, Response, url_for
+
+from src.app.analytics.ingest import IngestQueueFull, scan_ingestor
+from src.app.analytics.services import get_scan_histogram_async, scan_event
+from src.app.analytics.models import FIELD_GROUPINGS, TIME_GROUPINGS
+from src.app.analytics.async_models import (
+    find_scans_by_qr_code,
+    get_scans_by_qr_code,
+    get_total_scans_by_user,
+)
+from src.config import ANALYTICS_MAX_PAGE_SIZE, ANALYTICS_PAGE_SIZE
+from src.utils.datetimes import parse_datetime
+
+# Async variants of the analytics routes, served by src.asgi
+analytics = Blueprint('analytics', __name__)
+
+@analytics.route('/scans/<qr_code_id>', methods=['POST'])
+async def record_scan(qr_code_id: str) -> Tuple[Response, int]:
+    """Records a scan for the given QR code ID.
+
+    The scan is accepted (202) immediately and written asynchronously in a
+    batch. The event loop never waits for room in the scan buffer: a full
+    buffer is reported with a 503 right away.
+
+    Args:
+        qr_code_id: The ID of the QR code that was scanned.
+
+    Returns:
+        A JSON response and the corresponding HTTP status code.
+    """
+    try:
+        qr_code_id_obj: ObjectId = ObjectId(qr_code_id)  # Convert to ObjectId
+    except InvalidId:
+        return jsonify({"error": "Invalid QR Code ID"}), 400
+
+    try:
+        scan_ingestor.submit(
+            scan_event(qr_code_id_obj, request.headers.get("User-Agent"), request.remote_addr), timeout=0
+        )
+    except IngestQueueFull:
+        # Shed load while the writer catches up
+        response = jsonify({"error": "Too many scans, please retry"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    return jsonify({"message": "Scan accepted"}), 202
+
+@analytics.route('/analytics/<qr_code_id>', methods=['GET'])
+async def fetch_qr_code_analytics(qr_code_id: str) -> Tuple[Response, int]:
+    """Fetches analytics data for a specific QR code.
+
+    Accepts the same query parameters as the synchronous route (after,
+    limit, fields, since, until and format=ndjson).
+
+    Args:
+        qr_code_id: The ID of the QR code for which to fetch analytics.
+
+    Returns:
+        A JSON response containing the analytics data, along with the
+        corresponding HTTP status code.
+    """
+    try:
+        qr_code_id_obj: ObjectId = ObjectId(qr_code_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid QR Code ID"}), 400
+
+    try:
+        after: Optional[ObjectId] = ObjectId(request.args["after"]) if request.args.get("after") else None
+        limit: Optional[int] = request.args.get("limit", type=int)
+        since: Optional[datetime] = parse_datetime(request.args.get("since"))
+        until: Optional[datetime] = parse_datetime(request.args.get("until"))
+    except (InvalidId, ValueError):
+        return jsonify({"error": "Invalid pagination or time range parameters"}), 400
+    # A negative limit would reach cursor.limit(), where it means a single batch
+    if request.args.get("limit") is not None and (limit is None or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    fields: Optional[List[str]] = (
+        [field for field in request.args["fields"].split(",") if field] if request.args.get("fields") else None
+    )
+
+    # Stream every matching scan as newline-delimited JSON straight from the cursor
+    if request.args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        cursor = find_scans_by_qr_code(qr_code_id_obj, after, limit, fields, since, until)
+        dumps = current_app.json.dumps
+
+        async def generate() -> AsyncIterator[str]:
+            async for scan in cursor:
+                yield dumps(scan) + "\n"
+
+        return Response(generate(), mimetype="application/x-ndjson"), 200
+
+    # Return a bounded page of scans otherwise
+    limit = min(limit or ANALYTICS_PAGE_SIZE, ANALYTICS_MAX_PAGE_SIZE)
+    scans: List[Dict[str, Any]] = await get_scans_by_qr_code(qr_code_id_obj, after, limit, fields, since, until)
+    response = jsonify(scans)
+    if len(scans) == limit:
+        # Point at the next page, keeping the other query parameters
+        next_url = url_for(
+            request.endpoint,
+            **{**request.view_args, **request.args.to_dict(), "after": scans[-1]["_id"], "limit": limit},
+        )
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
+
+@analytics.route('/analytics/user/<user_id>', methods=['GET'])
+async def fetch_user_analytics(user_id: str) -> Tuple[Response, int]:
+    """Fetches analytics data for all QR codes owned by a user.
+
+    Args:
+        user_id: The ID of the user for whom to fetch analytics.
+
+    Returns:
+        A JSON response containing the total scan count, along with the
+        corresponding HTTP status code.
+    """
+    try:
+        user_id_obj: ObjectId = ObjectId(user_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid User ID"}), 400
+    total_scans: List[Dict[str, int]] = await get_total_scans_by_user(user_id_obj)
+    return jsonify(total_scans), 200
+
+@analytics.route('/analytics/<qr_code_id>/histogram', methods=['GET'])
+async def fetch_qr_code_histogram(qr_code_id: str) -> Tuple[Response, int]:
+    """Fetches a scan histogram for a specific QR code.
+
+    Args:
+        qr_code_id: The ID of the QR code for which to fetch the histogram.
+
+    Returns:
+        A JSON response containing the histogram buckets, along with the
+        corresponding HTTP status code.
+    """
+    try:
+        qr_code_id_obj: ObjectId = ObjectId(qr_code_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid QR Code ID"}), 400
+    return await histogram_response("qr_code", qr_code_id_obj)
+
+@analytics.route('/analytics/user/<user_id>/histogram', methods=['GET'])
+async def fetch_user_histogram(user_id: str) -> Tuple[Response, int]:
+    """Fetches a scan histogram across all QR codes owned by a user.
+
+    Args:
+        user_id: The ID of the user for whom to fetch the histogram.
+
+    Returns:
+        A JSON response containing the histogram buckets, along with the
+        corresponding HTTP status code.
+    """
+    try:
+        user_id_obj: ObjectId = ObjectId(user_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid User ID"}), 400
+    return await histogram_response("user", user_id_obj)
+
+async def histogram_response(scope: str, key: ObjectId) -> Tuple[Response, int]:
+    """Validates the histogram query parameters and builds the response."""
+    by: str = request.args.get("by", "day")
+    if by not in TIME_GROUPINGS + FIELD_GROUPINGS:
+        return jsonify({"error": f"Invalid grouping, expected one of {', '.join(TIME_GROUPINGS + FIELD_GROUPINGS)}"}), 400
+    try:
+        since: Optional[datetime] = parse_datetime(request.args.get("since"))
+        until: Optional[datetime] = parse_datetime(request.args.get("until"))
+    except ValueError:
+        return jsonify({"error": "Invalid time range parameters"}), 400
+
+    buckets: List[Dict[str, Any]] = await get_scan_histogram_async(scope, key, by, since, until)
+    if by in TIME_GROUPINGS:
+        # Report bucket starts as ISO 8601 UTC times
+        buckets = [{"key": bucket["key"].isoformat() + "Z", "count": bucket["count"]} for bucket in buckets]
+    return jsonify({"by": by, "buckets": buckets}), 200
@@ -0,0 +1,220 @@
+import bisect
+import csv
+import ipaddress
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from src.app.analytics.models import USER_AGENT_FAMILIES, find_unenriched_scans, set_scan_fields
+from src.config import (
+    SCAN_ENRICH_BATCH_SIZE,
+    SCAN_REGION_CACHE_SIZE,
+    SCAN_REGION_DATABASE,
+    SCAN_USER_AGENT_CACHE_SIZE,
+)
+from src.utils.cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Value of an enriched field that could not be determined
+UNKNOWN = "unknown"
+
+# Operating systems matched in order; iOS and Android come before the desktop systems their UAs mention
+OS_FAMILIES: Tuple[Tuple[str, str], ...] = (
+    ("iOS", "iPhone|iPad|iPod"),
+    ("Android", "Android"),
+    ("Windows", "Windows"),
+    ("ChromeOS", "CrOS"),
+    ("macOS", "Macintosh|Mac OS X"),
+    ("Linux", "Linux|X11"),
+)
+# Device types matched in order; Android tablets are the Android UAs without "Mobile"
+DEVICE_TYPES: Tuple[Tuple[str, str], ...] = (
+    ("bot", "bot|crawler|spider"),
+    ("tablet", "iPad|Tablet|Android(?!.*Mobile)"),
+    ("mobile", "Mobi|iPhone|iPod|Android"),
+)
+
+# A parsed User-Agent: the device type, operating system and browser family
+UserAgent = Tuple[str, str, str]
+
+
+def compile_families(families: Tuple[Tuple[str, str], ...]) -> List[Tuple[str, Pattern[str]]]:
+    """Compiles a table of (name, pattern), case-insensitively like the $regexMatch of the histograms."""
+    return [(name, re.compile(pattern, re.IGNORECASE)) for name, pattern in families]
+
+
+BROWSER_PATTERNS = compile_families(USER_AGENT_FAMILIES)
+OS_PATTERNS = compile_families(OS_FAMILIES)
+DEVICE_PATTERNS = compile_families(DEVICE_TYPES)
+
+
+def match_family(patterns: List[Tuple[str, Pattern[str]]], user_agent: str, default: str) -> str:
+    """Returns the name of the first pattern found in a User-Agent, or the default."""
+    for name, pattern in patterns:
+        if pattern.search(user_agent):
+            return name
+    return default
+
+
+def parse_user_agent(user_agent: Optional[str]) -> UserAgent:
+    """Parses a User-Agent header into its device type, operating system and browser family.
+
+    Browser families are those of the "user_agent" histogram, "Other" when
+    none matches, so enriched and raw scans group the same way.
+
+    Args:
+        user_agent: The User-Agent header of the scanning client, if any (string, optional).
+
+    Returns:
+        A (device, os, browser) tuple; device is "bot", "tablet", "mobile" or "desktop".
+    """
+    if not user_agent:
+        return UNKNOWN, UNKNOWN, "Other"
+    return (
+        match_family(DEVICE_PATTERNS, user_agent, "desktop"),
+        match_family(OS_PATTERNS, user_agent, "Other"),
+        match_family(BROWSER_PATTERNS, user_agent, "Other"),
+    )
+
+
+class RegionDatabase:
+    """Maps IP addresses to a coarse region from a local CSV of address ranges.
+
+    Each line holds ``start_ip,end_ip,region``, inclusive, e.g. a country
+    code as in the free DB-IP country database. The file is read on the first
+    lookup, by the scan writer rather than a request, and looked up with a
+    binary search over the range starts of each IP version.
+    """
+
+    def __init__(self, path: str = SCAN_REGION_DATABASE) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        # Sorted range starts, and the matching range ends and regions, by IP version
+        self._ranges: Optional[Dict[int, Tuple[List[int], List[int], List[str]]]] = None
+
+    def _load(self) -> Dict[int, Tuple[List[int], List[int], List[str]]]:
+        rows: Dict[int, List[Tuple[int, int, str]]] = {4: [], 6: []}
+        if self.path:
+            try:
+                with open(self.path, newline='', encoding='utf-8') as f:
+                    regions: Dict[str, str] = {}
+                    for row in csv.reader(f):
+                        try:
+                            start, end = ipaddress.ip_address(row[0]), ipaddress.ip_address(row[1])
+                        except (IndexError, ValueError):
+                            # Skip headers, comments and malformed lines
+                            continue
+                        if len(row) < 3 or start.version != end.version:
+                            continue
+                        # Share one string per region across the ranges
+                        region = regions.setdefault(row[2], row[2])
+                        rows[start.version].append((int(start), int(end), region))
+            except OSError:
+                logger.exception("Failed to read the region database %s", self.path)
+        ranges = {}
+        for version, version_rows in rows.items():
+            version_rows.sort()
+            ranges[version] = (
+                [start for start, _, _ in version_rows],
+                [end for _, end, _ in version_rows],
+                [region for _, _, region in version_rows],
+            )
+        return ranges
+
+    def lookup(self, ip_address: Optional[str]) -> Optional[str]:
+        """Returns the region of an IP address, or None if it is not in any range."""
+        if self._ranges is None:
+            with self._lock:
+                if self._ranges is None:
+                    self._ranges = self._load()
+        try:
+            address = ipaddress.ip_address(ip_address or "")
+        except ValueError:
+            return None
+        # Look up IPv4-mapped IPv6 addresses, as sent by dual-stack servers, in the IPv4 ranges
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        starts, ends, regions = self._ranges[address.version]
+        index = bisect.bisect_right(starts, int(address)) - 1
+        if index >= 0 and int(address) <= ends[index]:
+            return regions[index]
+        return None
+
+
+class ScanEnricher:
+    """Derives the compact analytics fields of scan events.
+
+    Scans get the device, os and browser parsed from their User-Agent and
+    the region of their IP address, which histograms group by instead of
+    matching the raw strings. User-Agent strings repeat heavily across
+    scans, and so do the addresses of a campaign's audience, so both
+    lookups go through an LRU cache.
+    """
+
+    def __init__(
+        self,
+        region_database: Optional[RegionDatabase] = None,
+        user_agent_cache_size: int = SCAN_USER_AGENT_CACHE_SIZE,
+        region_cache_size: int = SCAN_REGION_CACHE_SIZE,
+    ) -> None:
+        self.regions = region_database if region_database is not None else RegionDatabase()
+        self.user_agents = LRUCache(max_entries=user_agent_cache_size)
+        self.addresses = LRUCache(max_entries=region_cache_size)
+
+    def user_agent(self, user_agent: Optional[str]) -> UserAgent:
+        """Returns the parsed User-Agent (see parse_user_agent), from the cache when possible."""
+        parsed: Optional[UserAgent] = self.user_agents.get(user_agent)
+        if parsed is None:
+            parsed = parse_user_agent(user_agent)
+            self.user_agents.set(user_agent, parsed)
+        return parsed
+
+    def region(self, ip_address: Optional[str]) -> str:
+        """Returns the region of an IP address, or "unknown", from the cache when possible."""
+        region: Optional[str] = self.addresses.get(ip_address)
+        if region is None:
+            region = self.regions.lookup(ip_address) or UNKNOWN
+            self.addresses.set(ip_address, region)
+        return region
+
+    def fields(self, scan: Dict[str, Any]) -> Dict[str, str]:
+        """Returns the enriched fields of a scan document."""
+        device, os_family, browser = self.user_agent(scan.get("user_agent"))
+        return {"device": device, "os": os_family, "browser": browser, "region": self.region(scan.get("ip_address"))}
+
+    def enrich(self, scans: List[Dict[str, Any]]) -> None:
+        """Adds the enriched fields to scan documents, in place."""
+        for scan in scans:
+            scan.update(self.fields(scan))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the counters of both lookup caches."""
+        return {"user_agents": self.user_agents.stats(), "regions": self.addresses.stats()}
+
+
+# Process-wide enricher used by the scan ingestor
+scan_enricher = ScanEnricher()
+
+
+def enrich_stored_scans(batch_size: int = SCAN_ENRICH_BATCH_SIZE, enricher: ScanEnricher = scan_enricher) -> int:
+    """Enriches the scans stored before enrichment, or while it failed.
+
+    Args:
+        batch_size: The number of scans updated per bulk write (int).
+        enricher: The enricher computing the fields (ScanEnricher).
+
+    Returns:
+        The number of enriched scans.
+    """
+    total = 0
+    updates: List[Tuple[Any, Dict[str, str]]] = []
+    for scan in find_unenriched_scans(batch_size):
+        updates.append((scan["_id"], enricher.fields(scan)))
+        if len(updates) >= batch_size:
+            set_scan_fields(updates)
+            total += len(updates)
+            updates = []
+    set_scan_fields(updates)
+    return total + len(updates)
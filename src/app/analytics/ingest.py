@@ -0,0 +1,190 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, List, Optional
+
+from src.app.analytics.enrichment import ScanEnricher, scan_enricher
+from src.app.analytics.models import increment_scan_rollups, record_scans
+from src.config import (
+    SCAN_BATCH_SIZE,
+    SCAN_BUFFER_SIZE,
+    SCAN_ENQUEUE_TIMEOUT,
+    SCAN_FLUSH_INTERVAL,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class IngestQueueFull(Exception):
+    """Raised when the scan buffer is full and the event cannot be accepted."""
+
+
+class ScanIngestor:
+    """Buffers scan events in memory and writes them in batches.
+
+    Requests enqueue events and return immediately; a background thread
+    enriches them (see ScanEnricher) and writes them with one insert_many
+    per batch, either when a full batch is buffered or when the flush
+    interval elapses, and adds them to the scan rollups. Scans that could
+    not be stored count as failed; stored scans whose rollup update failed
+    count as rollup_failed. The buffer is bounded: when it
+    is full, enqueueing waits briefly and then fails, so callers can shed
+    load instead of growing memory without limit.
+    """
+
+    def __init__(
+        self,
+        max_buffer: int = SCAN_BUFFER_SIZE,
+        batch_size: int = SCAN_BATCH_SIZE,
+        flush_interval: float = SCAN_FLUSH_INTERVAL,
+        enqueue_timeout: float = SCAN_ENQUEUE_TIMEOUT,
+        enricher: ScanEnricher = scan_enricher,
+    ) -> None:
+        self.max_buffer = max_buffer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self.enricher = enricher
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=self.max_buffer)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._batch_ready = threading.Condition()
+        # Counters exposed through stats()
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.rollup_failed = 0
+        self.batches = 0
+
+    def submit(self, event: Dict[str, Any], timeout: Optional[float] = None) -> None:
+        """Adds a scan event to the buffer.
+
+        Args:
+            event: The scan document to write.
+            timeout: How long to wait for room in a full buffer, defaults to
+                the enqueue timeout; pass 0 from an event loop (float, optional).
+
+        Raises:
+            IngestQueueFull: If the buffer stays full for longer than the enqueue timeout.
+        """
+        self._ensure_started()
+        try:
+            self._queue.put(event, timeout=self.enqueue_timeout if timeout is None else timeout)
+        except queue.Full:
+            self.rejected += 1
+            raise IngestQueueFull("Scan buffer is full")
+        self.enqueued += 1
+        # Wake the writer as soon as a full batch is waiting
+        if self._queue.qsize() >= self.batch_size:
+            with self._batch_ready:
+                self._batch_ready.notify()
+
+    def _ensure_started(self) -> None:
+        # Start the writer lazily, again in each forked worker process, and again if it died
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._pid != pid or self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(
+                    target=self._run, name="scan-ingestor", daemon=True
+                )
+                self._thread.start()
+                self._pid = pid
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            # Sleep until a full batch is buffered or the flush interval elapses
+            with self._batch_ready:
+                self._batch_ready.wait_for(
+                    lambda: self._stop.is_set() or self._queue.qsize() >= self.batch_size,
+                    timeout=self.flush_interval,
+                )
+            self.flush()
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        events: List[Dict[str, Any]] = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+    def _write(self, events: List[Dict[str, Any]]) -> None:
+        for start in range(0, len(events), self.batch_size):
+            chunk = events[start:start + self.batch_size]
+            try:
+                self.write_batch(chunk)
+            except Exception:
+                # Keep the writer alive whatever the error, e.g. a document bson cannot encode;
+                # the batch is dropped and counted
+                self.failed += len(chunk)
+                logger.exception("Failed to write %d scan events", len(chunk))
+                continue
+            self.written += len(chunk)
+            self.batches += 1
+            try:
+                self.roll_up_batch(chunk)
+            except Exception:
+                # The scans are stored, only their counters are missing until flask rebuild-scan-rollups
+                self.rollup_failed += len(chunk)
+                logger.exception("Failed to add %d stored scan events to the rollups", len(chunk))
+
+    def write_batch(self, events: List[Dict[str, Any]]) -> None:
+        """Enriches and persists one batch of scan events."""
+        try:
+            self.enricher.enrich(events)
+        except Exception:
+            # Store the scans anyway; flask enrich-scans fills in their fields later
+            logger.exception("Failed to enrich %d scan events", len(events))
+        record_scans(events)
+
+    def roll_up_batch(self, events: List[Dict[str, Any]]) -> None:
+        """Adds one persisted batch of scan events to the scan rollups."""
+        increment_scan_rollups(events)
+
+    def flush(self) -> None:
+        """Synchronously writes every event currently in the buffer."""
+        # Serialize flushes so that when this returns no drained batch is still in flight
+        with self._write_lock:
+            self._write(self._drain())
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        """Stops the writer thread and flushes the remaining events."""
+        if self._thread is not None and self._pid == os.getpid():
+            self._stop.set()
+            with self._batch_ready:
+                self._batch_ready.notify()
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the ingestion counters and the current buffer depth."""
+        return {
+            "buffered": self._queue.qsize(),
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "written": self.written,
+            "failed": self.failed,
+            "rollup_failed": self.rollup_failed,
+            "batches": self.batches,
+        }
+
+
+# Process-wide scan ingestor used by the /scans route
+scan_ingestor = ScanIngestor()
+# Forked workers start with an empty buffer and their own writer thread
+os.register_at_fork(after_in_child=scan_ingestor._init_state)
+# Write whatever is still buffered when the worker shuts down
+atexit.register(scan_ingestor.stop)
@@ -1,71 +1,471 @@
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-from pymongo.results import InsertOneResult
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, UpdateOne
+from pymongo.cursor import Cursor
+from pymongo.results import BulkWriteResult, InsertManyResult
 
-from src.db.database import get_db
+from src.app.qrcodes.models import get_qr_code_owners
+from src.config import ANALYTICS_CURSOR_BATCH_SIZE
+from src.db.database import get_collection
+from src.db.indexes import declared_indexes
+from src.utils.metrics import timed
 
-db = get_db()
-scans_collection = db['scans']
+scans_collection = get_collection('scans')
+# Pre-aggregated scan counts per QR code and per user, by hour and by day
+scan_rollups_collection = get_collection('scan_rollups')
+# Staging collection of rebuild_scan_rollups, renamed over scan_rollups once complete
+scan_rollups_rebuild_collection = get_collection('scan_rollups_rebuild')
 
-def record_scan(qr_code_id: str, metadata: Dict[str, Any]) -> InsertOneResult:
-    """Records a scan event with associated metadata.
+ROLLUP_GRANULARITIES: Tuple[str, ...] = ("hour", "day")
+# Histogram groupings served from the rollups, and from the raw scans
+TIME_GROUPINGS: Tuple[str, ...] = ("hour", "day", "week")
+FIELD_GROUPINGS: Tuple[str, ...] = ("user_agent", "ip_prefix", "device", "os", "region")
+# Fields added to scans by the enrichment stage (see src.app.analytics.enrichment)
+ENRICHED_FIELDS: Tuple[str, ...] = ("device", "os", "browser", "region")
+
+# Browser families matched in order against the raw User-Agent string
+USER_AGENT_FAMILIES: Tuple[Tuple[str, str], ...] = (
+    ("Bot", "bot|crawler|spider"),
+    ("Edge", "Edg/|EdgiOS|EdgA"),
+    ("Opera", "OPR/|Opera"),
+    ("Samsung Internet", "SamsungBrowser"),
+    ("Chrome", "Chrome/|CriOS"),
+    ("Firefox", "Firefox/|FxiOS"),
+    ("Safari", "Safari/"),
+)
+
+class RollupRebuildConflict(Exception):
+    """Raised when scans are written while the scan rollups are rebuilt."""
+
+@timed("db.record_scans")
+def record_scans(scans: List[Dict[str, Any]]) -> Optional[InsertManyResult]:
+    """Records a batch of scan events in a single unordered insert.
 
     Args:
-        qr_code_id: The ID of the scanned QR code.
-        metadata: A dictionary containing additional metadata about the scan.
+        scans: A list of scan documents, each with a qr_code_id and a timestamp.
 
     Returns:
-        The result of the insertion operation.
+        The result of the insertion operation, or None if there was nothing to insert.
     """
-    scan_data = {
-        "qr_code_id": qr_code_id,
-        "timestamp": datetime.utcnow(),
-        **metadata  # Include additional metadata like user agent, location, etc.
-    }
-    return scans_collection.insert_one(scan_data)
+    if not scans:
+        return None
+    # Unordered so one bad document does not prevent the rest of the batch
+    return scans_collection.insert_many(scans, ordered=False)
 
-def get_scans_by_qr_code(qr_code_id: str) -> List[Dict[str, Any]]:
-    """Retrieves all scan events for a given QR code.
+def find_unenriched_scans(batch_size: int = 1000) -> Cursor:
+    """Returns a cursor over the scans without enriched fields, with the fields enrichment reads."""
+    return scans_collection.find(
+        {"browser": {"$exists": False}}, {"user_agent": 1, "ip_address": 1}
+    ).batch_size(batch_size)
+
+@timed("db.set_scan_fields")
+def set_scan_fields(updates: List[Tuple[ObjectId, Dict[str, Any]]]) -> Optional[BulkWriteResult]:
+    """Sets fields on many scans in a single unordered bulk write.
+
+    Args:
+        updates: A list of (scan ID, fields to set) tuples.
+
+    Returns:
+        The result of the bulk write, or None if there was nothing to update.
+    """
+    if not updates:
+        return None
+    return scans_collection.bulk_write(
+        [UpdateOne({"_id": scan_id}, {"$set": fields}) for scan_id, fields in updates], ordered=False
+    )
+
+def time_range(since: Optional[datetime], until: Optional[datetime]) -> Optional[Dict[str, datetime]]:
+    """Builds a query condition for the half-open time range [since, until)."""
+    if since is None and until is None:
+        return None
+    condition: Dict[str, datetime] = {}
+    if since is not None:
+        condition["$gte"] = since
+    if until is not None:
+        condition["$lt"] = until
+    return condition
+
+def scans_query(
+    qr_code_id: ObjectId,
+    after: Optional[ObjectId] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Builds the query selecting a page of scans of a QR code."""
+    query: Dict[str, Any] = {"qr_code_id": qr_code_id}
+    if after is not None:
+        query["_id"] = {"$gt": after}
+    timestamp = time_range(since, until)
+    if timestamp is not None:
+        query["timestamp"] = timestamp
+    return query
+
+def find_scans_by_qr_code(
+    qr_code_id: ObjectId,
+    after: Optional[ObjectId] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    batch_size: int = ANALYTICS_CURSOR_BATCH_SIZE,
+) -> Cursor:
+    """Returns a cursor over the scan events of a QR code, oldest first.
+
+    Pages are addressed by keyset: pass the _id of the last scan of the
+    previous page as ``after``, which resumes the index scan directly instead
+    of skipping over earlier documents.
 
     Args:
         qr_code_id: The ID of the QR code.
+        after: Only return scans with a greater _id (ObjectId, optional).
+        limit: The maximum number of scans to return (int, optional).
+        fields: The scan fields to return; _id is always included (list of strings, optional).
+        since: Only return scans at or after this time (datetime, optional).
+        until: Only return scans before this time (datetime, optional).
+        batch_size: The number of documents fetched per round trip (int).
 
     Returns:
-        A list of dictionaries, where each dictionary represents a scan event.
+        A pymongo Cursor over the matching scan documents.
     """
-    scans = scans_collection.find({"qr_code_id": qr_code_id})
+    query = scans_query(qr_code_id, after, since, until)
+    projection = {field: 1 for field in fields} if fields else None
+
+    cursor = scans_collection.find(query, projection).sort("_id", ASCENDING).batch_size(batch_size)
+    if limit:
+        cursor = cursor.limit(limit)
+    return cursor
+
+@timed("db.get_scans_by_qr_code")
+def get_scans_by_qr_code(
+    qr_code_id: ObjectId,
+    after: Optional[ObjectId] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieves a page of scan events for a given QR code.
+
+    Args:
+        qr_code_id: The ID of the QR code.
+        after: Only return scans with a greater _id (ObjectId, optional).
+        limit: The maximum number of scans to return (int, optional).
+        fields: The scan fields to return; _id is always included (list of strings, optional).
+        since: Only return scans at or after this time (datetime, optional).
+        until: Only return scans before this time (datetime, optional).
+
+    Returns:
+        A list of scan documents, as stored; the app's JSON provider encodes their ObjectIds.
+    """
+    return list(find_scans_by_qr_code(qr_code_id, after, limit, fields, since, until))
+
+def rollup_bucket(timestamp: datetime, granularity: str) -> datetime:
+    """Truncates a timestamp to the start of its rollup bucket.
+
+    Args:
+        timestamp: The time of the scan.
+        granularity: Either "hour" or "day".
+
+    Returns:
+        The start of the hour or day containing the timestamp.
+    """
+    if granularity == "hour":
+        return timestamp.replace(minute=0, second=0, microsecond=0)
+    return timestamp.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def rollup_increments(scans: List[Dict[str, Any]]) -> List[UpdateOne]:
+    """Builds the upserts adding a batch of scan events to the per QR code and per user rollups.
+
+    Args:
+        scans: A list of scan documents, each with a qr_code_id and a timestamp.
+
+    Returns:
+        One update per rollup bucket, incrementing it by the scans of the batch.
+    """
+    if not scans:
+        return []
+    # Resolve the owner of every scanned QR code in a single query
+    owners = get_qr_code_owners(list({scan["qr_code_id"] for scan in scans}))
+
+    # Combine the increments of the batch before writing them
+    increments: Counter = Counter()
+    for scan in scans:
+        for granularity in ROLLUP_GRANULARITIES:
+            bucket = rollup_bucket(scan["timestamp"], granularity)
+            increments[("qr_code", scan["qr_code_id"], granularity, bucket)] += 1
+            owner = owners.get(scan["qr_code_id"])
+            if owner is not None:
+                increments[("user", owner, granularity, bucket)] += 1
 
     return [
-        {
-            **scan,
-            "_id": str(scan["_id"]),
-            "qr_code_id": str(scan["qr_code_id"]),
-        }
-        for scan in scans
+        UpdateOne(
+            {"scope": scope, "key": key, "granularity": granularity, "bucket": bucket},
+            {"$inc": {"count": count}},
+            upsert=True,
+        )
+        for (scope, key, granularity, bucket), count in increments.items()
     ]
 
+@timed("db.increment_scan_rollups")
+def increment_scan_rollups(scans: List[Dict[str, Any]]) -> Optional[BulkWriteResult]:
+    """Adds a batch of scan events to the per QR code and per user rollups.
+
+    Args:
+        scans: A list of scan documents, each with a qr_code_id and a timestamp.
+
+    Returns:
+        The result of the bulk write, or None if there was nothing to update.
+    """
+    operations = rollup_increments(scans)
+    if not operations:
+        return None
+    return scan_rollups_collection.bulk_write(operations, ordered=False)
+
+def scans_written_since(started: datetime) -> bool:
+    """Checks whether any scan was inserted during or after the second of a time (UTC)."""
+    return scans_collection.find_one({"_id": {"$gte": ObjectId.from_datetime(started)}}, {"_id": 1}) is not None
+
+def rebuild_scan_rollups(batch_size: int = 1000) -> int:
+    """Recomputes every rollup document from the raw scans collection.
+
+    The rollups are built into a staging collection, which then replaces
+    scan_rollups in a single rename, so analytics never read partial counts.
+    Increments made by the scan ingestor while the rebuild runs would be
+    lost with the replaced collection, so scan ingestion must be stopped
+    first: if scans were written meanwhile, the staging collection is
+    dropped and the current rollups are kept.
+
+    Args:
+        batch_size: The number of scans to aggregate per bulk write (int).
+
+    Returns:
+        The number of scans that were aggregated.
+
+    Raises:
+        RollupRebuildConflict: If scans were written while the rollups were rebuilt.
+    """
+    started = datetime.utcnow()
+    scan_rollups_rebuild_collection.drop()
+    scan_rollups_rebuild_collection.create_indexes(declared_indexes()["scan_rollups"])
+    total = 0
+    batch: List[Dict[str, Any]] = []
+    for scan in scans_collection.find({}, {"qr_code_id": 1, "timestamp": 1}).batch_size(batch_size):
+        batch.append(scan)
+        if len(batch) >= batch_size:
+            _write_rebuilt_rollups(batch)
+            total += len(batch)
+            batch = []
+    _write_rebuilt_rollups(batch)
+    total += len(batch)
+
+    if scans_written_since(started):
+        scan_rollups_rebuild_collection.drop()
+        raise RollupRebuildConflict("Scans were written while the rollups were rebuilt; stop scan ingestion and retry")
+    # Swap the rebuilt rollups in, together with their indexes
+    scan_rollups_rebuild_collection.rename(scan_rollups_collection.name, dropTarget=True)
+    return total
+
+def _write_rebuilt_rollups(scans: List[Dict[str, Any]]) -> None:
+    operations = rollup_increments(scans)
+    if operations:
+        scan_rollups_rebuild_collection.bulk_write(operations, ordered=False)
+
+def rollup_decrements(rollups: Iterable[Dict[str, Any]], user_id: ObjectId) -> List[UpdateOne]:
+    """Builds the updates removing QR code rollups from their owner's rollups.
+
+    Args:
+        rollups: The rollup documents of QR codes owned by the user.
+        user_id: The ID of the owner (ObjectId).
+
+    Returns:
+        One update per user bucket, decrementing it by the counts of the QR codes.
+    """
+    decrements: Counter = Counter()
+    for rollup in rollups:
+        decrements[(rollup["granularity"], rollup["bucket"])] += rollup["count"]
+    return [
+        UpdateOne(
+            {"scope": "user", "key": user_id, "granularity": granularity, "bucket": bucket},
+            {"$inc": {"count": -count}},
+        )
+        for (granularity, bucket), count in decrements.items()
+    ]
+
+@timed("db.delete_scans_of_qr_codes")
+def delete_scans_of_qr_codes(qr_code_ids: List[ObjectId], user_id: ObjectId) -> int:
+    """Deletes the scans and rollups of deleted QR codes.
+
+    The scans of the QR codes are also subtracted from their owner's
+    rollups, so user totals and histograms stay consistent.
+
+    Args:
+        qr_code_ids: The IDs of the deleted QR codes (list of ObjectId).
+        user_id: The ID of the user who owned them (ObjectId).
+
+    Returns:
+        The number of deleted scans.
+    """
+    rollups_query = {"scope": "qr_code", "key": {"$in": qr_code_ids}}
+    decrements = rollup_decrements(
+        scan_rollups_collection.find(rollups_query, {"granularity": 1, "bucket": 1, "count": 1}), user_id
+    )
+    if decrements:
+        scan_rollups_collection.bulk_write(decrements, ordered=False)
+        # Drop the user buckets that only counted the deleted QR codes
+        scan_rollups_collection.delete_many({"scope": "user", "key": user_id, "count": {"$lte": 0}})
+    scan_rollups_collection.delete_many(rollups_query)
+    return scans_collection.delete_many({"qr_code_id": {"$in": qr_code_ids}}).deleted_count
+
+def total_scans_pipeline(user_id: ObjectId) -> List[Dict[str, Any]]:
+    """Builds the pipeline summing a user's daily rollup buckets."""
+    return [
+        {"$match": {"scope": "user", "key": user_id, "granularity": "day"}},
+        {"$group": {"_id": None, "total_scans": {"$sum": "$count"}}},
+        {"$project": {"_id": 0, "total_scans": 1}},
+    ]
+
+@timed("db.get_total_scans_by_user")
 def get_total_scans_by_user(user_id: str) -> List[Dict[str, int]]:
     """Calculates the total number of scans for all QR codes owned by a user.
 
+    Reads the user's daily rollup documents instead of joining the scans
+    collection with the QR codes.
+
     Args:
         user_id: The ID of the user.
 
     Returns:
         A list containing a single dictionary with the total scan count.
     """
-    # Aggregate scans for all QR codes owned by a user
-    pipeline = [
-        {"$lookup": {
-            "from": "qrcodes",
-            "localField": "qr_code_id",
-            "foreignField": "_id",
-            "as": "qr_code_details"
-        }},
-        {"$unwind": "$qr_code_details"},
-        {"$match": {"qr_code_details.user_id": user_id}},
-        {"$count": "total_scans"}
+    result = list(scan_rollups_collection.aggregate(total_scans_pipeline(user_id)))
+
+    return result if result else [{"total_scans": 0}]
+
+
+@timed("db.get_rollup_histogram")
+def get_rollup_histogram(
+    scope: str,
+    key: ObjectId,
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Reads a time histogram of scans from the rollup documents.
+
+    Args:
+        scope: Either "qr_code" or "user".
+        key: The ID of the QR code or of the user.
+        by: One of TIME_GROUPINGS; weeks start on Monday.
+        since: Only count buckets overlapping this time or later (datetime, optional).
+        until: Only count buckets starting before this time (datetime, optional).
+
+    Returns:
+        A list of {"key": bucket start, "count": scans} dictionaries, oldest first.
+    """
+    rollups = scan_rollups_collection.find(
+        rollup_histogram_query(scope, key, by, since, until), {"_id": 0, "bucket": 1, "count": 1}
+    ).sort("bucket", ASCENDING)
+    return fold_rollups(rollups, by)
+
+def rollup_histogram_query(
+    scope: str,
+    key: ObjectId,
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Builds the query selecting the rollup buckets of a time histogram."""
+    granularity = "hour" if by == "hour" else "day"
+    query: Dict[str, Any] = {"scope": scope, "key": key, "granularity": granularity}
+    # Include the bucket containing ``since``
+    bucket = time_range(rollup_bucket(since, granularity) if since is not None else None, until)
+    if bucket is not None:
+        query["bucket"] = bucket
+    return query
+
+def fold_rollups(rollups: Iterable[Dict[str, Any]], by: str) -> List[Dict[str, Any]]:
+    """Turns rollup documents sorted by bucket into histogram entries."""
+    counts: Dict[datetime, int] = {}
+    for rollup in rollups:
+        bucket = rollup["bucket"]
+        if by == "week":
+            # Fold daily buckets into the week starting on their Monday
+            bucket = bucket - timedelta(days=bucket.weekday())
+        counts[bucket] = counts.get(bucket, 0) + rollup["count"]
+    return [{"key": bucket, "count": count} for bucket, count in counts.items()]
+
+@timed("db.get_field_histogram")
+def get_field_histogram(
+    qr_code_ids: List[ObjectId],
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Groups the scans of some QR codes by browser family, IP prefix or enriched field.
+
+    The grouping runs server-side in a single $match + $group pipeline on
+    the (qr_code_id, timestamp) index, which also holds the enriched fields.
+
+    Args:
+        qr_code_ids: The IDs of the QR codes whose scans are counted.
+        by: One of FIELD_GROUPINGS.
+        since: Only count scans at or after this time (datetime, optional).
+        until: Only count scans before this time (datetime, optional).
+
+    Returns:
+        A list of {"key": group, "count": scans} dictionaries, largest first.
+    """
+    return list(scans_collection.aggregate(field_histogram_pipeline(qr_code_ids, by, since, until)))
+
+def field_histogram_pipeline(
+    qr_code_ids: List[ObjectId],
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Builds the $match + $group pipeline of a field histogram."""
+    match: Dict[str, Any] = {"qr_code_id": {"$in": qr_code_ids}}
+    timestamp = time_range(since, until)
+    if timestamp is not None:
+        match["timestamp"] = timestamp
+    return [
+        {"$match": match},
+        {"$group": {"_id": _group_expression(by), "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$project": {"_id": 0, "key": "$_id", "count": 1}},
     ]
-    result = list(scans_collection.aggregate(pipeline))
 
-    return result if result else [{"total_scans": 0}]
\ No newline at end of file
+def _group_expression(by: str) -> Dict[str, Any]:
+    # Build the $group key expression for a field grouping
+    if by in ENRICHED_FIELDS:
+        return {"$ifNull": [f"${by}", "unknown"]}
+    if by == "user_agent":
+        # Only scans the enrichment stage has not reached yet match the raw string
+        user_agent = {"$ifNull": ["$user_agent", ""]}
+        return {"$ifNull": ["$browser", {"$switch": {
+            "branches": [
+                {"case": {"$regexMatch": {"input": user_agent, "regex": pattern, "options": "i"}}, "then": family}
+                for family, pattern in USER_AGENT_FAMILIES
+            ],
+            "default": "Other",
+        }}]}
+    # IPv4 addresses are grouped by /24, IPv6 addresses by /48
+    ip_address = {"$ifNull": ["$ip_address", ""]}
+    return {"$let": {
+        "vars": {
+            "v4": {"$regexFind": {"input": ip_address, "regex": r"^(\d+\.\d+\.\d+)\.\d+$"}},
+            "v6": {"$regexFind": {"input": ip_address, "regex": "^([0-9a-fA-F]*:[0-9a-fA-F]*:[0-9a-fA-F]*):"}},
+        },
+        "in": {"$cond": [
+            {"$ne": ["$$v4", None]},
+            {"$concat": [{"$arrayElemAt": ["$$v4.captures", 0]}, ".0/24"]},
+            {"$cond": [
+                {"$ne": ["$$v6", None]},
+                {"$concat": [{"$arrayElemAt": ["$$v6.captures", 0]}, "::/48"]},
+                "unknown",
+            ]},
+        ]},
+    }}
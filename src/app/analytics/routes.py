@@ -1,10 +1,20 @@
-from typing import Any, Dict, List, Tuple
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from bson.objectid import ObjectId, InvalidId
-from flask import Blueprint, jsonify, Response
+from flask import Blueprint, current_app, jsonify, request, Response, stream_with_context, url_for
 
-from src.app.analytics.services import log_qr_code_scan
-from src.app.analytics.models import get_scans_by_qr_code, get_total_scans_by_user
+from src.app.analytics.ingest import IngestQueueFull
+from src.app.analytics.services import get_scan_histogram, log_qr_code_scan
+from src.app.analytics.models import (
+    FIELD_GROUPINGS,
+    TIME_GROUPINGS,
+    find_scans_by_qr_code,
+    get_scans_by_qr_code,
+    get_total_scans_by_user,
+)
+from src.config import ANALYTICS_MAX_PAGE_SIZE, ANALYTICS_PAGE_SIZE
+from src.utils.datetimes import parse_datetime
 
 analytics = Blueprint('analytics', __name__)
 
@@ -17,20 +27,37 @@ def record_scan(qr_code_id: str) -> Tuple[Response, int]:
 
     Returns:
         A JSON response indicating the success or failure of the operation,
-        along with the corresponding HTTP status code.
+        along with the corresponding HTTP status code. The scan is accepted
+        (202) immediately and written asynchronously in a batch.
     """
     try:
         qr_code_id_obj: ObjectId = ObjectId(qr_code_id)  # Convert to ObjectId
     except InvalidId:
         return jsonify({"error": "Invalid QR Code ID"}), 400
 
-    log_qr_code_scan(qr_code_id_obj)
-    return jsonify({"message": "Scan recorded successfully"}), 201
+    try:
+        log_qr_code_scan(qr_code_id_obj)
+    except IngestQueueFull:
+        # Shed load while the writer catches up
+        response = jsonify({"error": "Too many scans, please retry"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+    return jsonify({"message": "Scan accepted"}), 202
 
 @analytics.route('/analytics/<qr_code_id>', methods=['GET'])
 def fetch_qr_code_analytics(qr_code_id: str) -> Tuple[Response, int]:
     """Fetches analytics data for a specific QR code.
 
+    Query parameters:
+        after: The _id of the last scan of the previous page.
+        limit: The page size (defaults to ANALYTICS_PAGE_SIZE).
+        fields: A comma-separated list of scan fields to return.
+        since, until: An ISO 8601 time range on the scan timestamp.
+        format: "ndjson" to stream every matching scan, one JSON document per line.
+
+    When more scans are available, the response carries a Link header with
+    rel="next" pointing at the following page.
+
     Args:
         qr_code_id: The ID of the QR code for which to fetch analytics.
 
@@ -40,12 +67,45 @@ def fetch_qr_code_analytics(qr_code_id: str) -> Tuple[Response, int]:
     """
     try:
         qr_code_id_obj: ObjectId = ObjectId(qr_code_id)
-        scans: List[Dict[str, Any]] = get_scans_by_qr_code(qr_code_id_obj)
-        return jsonify(scans), 200
     except InvalidId:
         return jsonify({"error": "Invalid QR Code ID"}), 400
 
+    try:
+        after: Optional[ObjectId] = ObjectId(request.args["after"]) if request.args.get("after") else None
+        limit: Optional[int] = request.args.get("limit", type=int)
+        since: Optional[datetime] = parse_datetime(request.args.get("since"))
+        until: Optional[datetime] = parse_datetime(request.args.get("until"))
+    except (InvalidId, ValueError):
+        return jsonify({"error": "Invalid pagination or time range parameters"}), 400
+    # A negative limit would reach cursor.limit(), where it means a single batch
+    if request.args.get("limit") is not None and (limit is None or limit < 1):
+        return jsonify({"error": "limit must be a positive integer"}), 400
+    fields: Optional[List[str]] = (
+        [field for field in request.args["fields"].split(",") if field] if request.args.get("fields") else None
+    )
+
+    # Stream every matching scan as newline-delimited JSON straight from the cursor
+    if request.args.get("format") == "ndjson" or request.accept_mimetypes.best == "application/x-ndjson":
+        cursor = find_scans_by_qr_code(qr_code_id_obj, after, limit, fields, since, until)
 
+        def generate() -> Iterator[str]:
+            for scan in cursor:
+                yield current_app.json.dumps(scan) + "\n"
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson"), 200
+
+    # Return a bounded page of scans otherwise
+    limit = min(limit or ANALYTICS_PAGE_SIZE, ANALYTICS_MAX_PAGE_SIZE)
+    scans: List[Dict[str, Any]] = get_scans_by_qr_code(qr_code_id_obj, after, limit, fields, since, until)
+    response = jsonify(scans)
+    if len(scans) == limit:
+        # Point at the next page, keeping the other query parameters
+        next_url = url_for(
+            request.endpoint,
+            **{**request.view_args, **request.args.to_dict(), "after": scans[-1]["_id"], "limit": limit},
+        )
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
 
 @analytics.route('/analytics/user/<user_id>', methods=['GET'])
 def fetch_user_analytics(user_id: str) -> Tuple[Response, int]:
@@ -63,4 +123,62 @@ def fetch_user_analytics(user_id: str) -> Tuple[Response, int]:
         total_scans: List[Dict[str, int]] = get_total_scans_by_user(user_id_obj)
         return jsonify(total_scans), 200
     except InvalidId:
-        return jsonify({"error": "Invalid User ID"}), 400
\ No newline at end of file
+        return jsonify({"error": "Invalid User ID"}), 400
+
+
+@analytics.route('/analytics/<qr_code_id>/histogram', methods=['GET'])
+def fetch_qr_code_histogram(qr_code_id: str) -> Tuple[Response, int]:
+    """Fetches a scan histogram for a specific QR code.
+
+    Query parameters:
+        by: "hour", "day", "week", "user_agent", "device", "os", "region" or "ip_prefix" (defaults to "day").
+        since, until: An optional ISO 8601 time range.
+
+    Args:
+        qr_code_id: The ID of the QR code for which to fetch the histogram.
+
+    Returns:
+        A JSON response containing the histogram buckets, along with the
+        corresponding HTTP status code.
+    """
+    try:
+        qr_code_id_obj: ObjectId = ObjectId(qr_code_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid QR Code ID"}), 400
+    return histogram_response("qr_code", qr_code_id_obj)
+
+@analytics.route('/analytics/user/<user_id>/histogram', methods=['GET'])
+def fetch_user_histogram(user_id: str) -> Tuple[Response, int]:
+    """Fetches a scan histogram across all QR codes owned by a user.
+
+    Accepts the same query parameters as the QR code histogram.
+
+    Args:
+        user_id: The ID of the user for whom to fetch the histogram.
+
+    Returns:
+        A JSON response containing the histogram buckets, along with the
+        corresponding HTTP status code.
+    """
+    try:
+        user_id_obj: ObjectId = ObjectId(user_id)
+    except InvalidId:
+        return jsonify({"error": "Invalid User ID"}), 400
+    return histogram_response("user", user_id_obj)
+
+def histogram_response(scope: str, key: ObjectId) -> Tuple[Response, int]:
+    """Validates the histogram query parameters and builds the response."""
+    by: str = request.args.get("by", "day")
+    if by not in TIME_GROUPINGS + FIELD_GROUPINGS:
+        return jsonify({"error": f"Invalid grouping, expected one of {', '.join(TIME_GROUPINGS + FIELD_GROUPINGS)}"}), 400
+    try:
+        since: Optional[datetime] = parse_datetime(request.args.get("since"))
+        until: Optional[datetime] = parse_datetime(request.args.get("until"))
+    except ValueError:
+        return jsonify({"error": "Invalid time range parameters"}), 400
+
+    buckets: List[Dict[str, Any]] = get_scan_histogram(scope, key, by, since, until)
+    if by in TIME_GROUPINGS:
+        # Report bucket starts as ISO 8601 UTC times
+        buckets = [{"key": bucket["key"].isoformat() + "Z", "count": bucket["count"]} for bucket in buckets]
+    return jsonify({"by": by, "buckets": buckets}), 200
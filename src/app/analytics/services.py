@@ -1,24 +1,147 @@
-from typing import Any, Dict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
 
 from flask import request
-from pymongo.results import InsertOneResult
 from bson.objectid import ObjectId
 
-from src.app.analytics.models import record_scan
+from src.app.analytics import async_models
+from src.app.analytics.ingest import scan_ingestor
+from src.app.analytics.models import (
+    TIME_GROUPINGS,
+    get_field_histogram,
+    get_rollup_histogram,
+    rollup_bucket,
+)
+from src.app.qrcodes import async_models as qrcodes_async_models
+from src.app.qrcodes.models import get_qr_code_ids_by_user
+from src.config import ANALYTICS_CACHE_CLOSED_TTL, ANALYTICS_CACHE_MAX_ENTRIES, ANALYTICS_CACHE_TTL
+from src.utils.cache import TTLCache
 
-def log_qr_code_scan(qr_code_id: ObjectId) -> InsertOneResult:
-    """Logs a QR code scan with metadata extracted from the request.
+# Process-wide cache of computed scan histograms
+histogram_cache = TTLCache(max_entries=ANALYTICS_CACHE_MAX_ENTRIES, ttl=ANALYTICS_CACHE_TTL)
+
+def log_qr_code_scan(qr_code_id: ObjectId) -> None:
+    """Queues a QR code scan with metadata extracted from the request.
+
+    The scan is timestamped now and written later, in a batch, by the
+    background scan ingestor.
+
+    Args:
+        qr_code_id: The ID of the QR code that was scanned.
+
+    Raises:
+        IngestQueueFull: If the scan buffer is full.
+    """
+    scan_ingestor.submit(scan_event(qr_code_id, request.headers.get("User-Agent"), request.remote_addr))
+
+def scan_event(qr_code_id: ObjectId, user_agent: Optional[str], ip_address: Optional[str]) -> Dict[str, Any]:
+    """Builds the scan document of a QR code scanned now.
 
     Args:
         qr_code_id: The ID of the QR code that was scanned.
+        user_agent: The User-Agent header of the scanning client, if any.
+        ip_address: The IP address of the scanning client, if any.
 
     Returns:
-        The result of the insertion operation from record_scan function
+        The scan document.
     """
-    metadata: Dict[str, Any] = {
-        "user_agent": request.headers.get("User-Agent"),
-        "ip_address": request.remote_addr
+    return {
+        "qr_code_id": qr_code_id,
+        "timestamp": datetime.utcnow(),
+        "user_agent": user_agent,
+        "ip_address": ip_address
     }
 
-    record_scan(qr_code_id, metadata)
-    return record_scan(qr_code_id, metadata)
\ No newline at end of file
+def get_scan_histogram(
+    scope: str,
+    key: ObjectId,
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Returns a scan histogram of a QR code or of all a user's QR codes.
+
+    Time groupings are read from the scan rollups; browser family and IP
+    prefix groupings are computed from the raw scans. Results are cached
+    per query until the current bucket closes (or the cache TTL elapses).
+
+    Args:
+        scope: Either "qr_code" or "user".
+        key: The ID of the QR code or of the user.
+        by: One of TIME_GROUPINGS or FIELD_GROUPINGS.
+        since: Only count scans at or after this time (datetime, optional).
+        until: Only count scans before this time (datetime, optional).
+
+    Returns:
+        A list of {"key": group, "count": scans} dictionaries.
+    """
+    cache_key = (scope, key, by, since, until)
+    histogram: Optional[List[Dict[str, Any]]] = histogram_cache.get(cache_key)
+    if histogram is not None:
+        return histogram
+
+    if by in TIME_GROUPINGS:
+        histogram = get_rollup_histogram(scope, key, by, since, until)
+    else:
+        qr_code_ids = [key] if scope == "qr_code" else get_qr_code_ids_by_user(key)
+        histogram = get_field_histogram(qr_code_ids, by, since, until)
+
+    histogram_cache.set(cache_key, histogram, histogram_expiry(by, until))
+    return histogram
+
+async def get_scan_histogram_async(
+    scope: str,
+    key: ObjectId,
+    by: str,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """Returns a scan histogram like get_scan_histogram, querying the async client.
+
+    Shares the histogram cache with the synchronous version.
+    """
+    cache_key = (scope, key, by, since, until)
+    histogram: Optional[List[Dict[str, Any]]] = histogram_cache.get(cache_key)
+    if histogram is not None:
+        return histogram
+
+    if by in TIME_GROUPINGS:
+        histogram = await async_models.get_rollup_histogram(scope, key, by, since, until)
+    else:
+        qr_code_ids = [key] if scope == "qr_code" else await qrcodes_async_models.get_qr_code_ids_by_user(key)
+        histogram = await async_models.get_field_histogram(qr_code_ids, by, since, until)
+
+    histogram_cache.set(cache_key, histogram, histogram_expiry(by, until))
+    return histogram
+
+def histogram_expiry(by: str, until: Optional[datetime], now: Optional[datetime] = None) -> float:
+    """Computes when a cached histogram must be recomputed.
+
+    Histograms of a range entirely in the past no longer change and are kept
+    for ANALYTICS_CACHE_CLOSED_TTL. Otherwise they are kept for
+    ANALYTICS_CACHE_TTL, and never past the end of the current time bucket,
+    so a new bucket shows up as soon as the previous one closes.
+
+    Args:
+        by: The histogram grouping.
+        until: The end of the requested time range (datetime, optional).
+        now: The current naive UTC time (datetime, defaults to now).
+
+    Returns:
+        The expiry time as a UNIX timestamp.
+    """
+    now = now or datetime.utcnow()
+    if until is not None and until <= now:
+        expires_at = now + timedelta(seconds=ANALYTICS_CACHE_CLOSED_TTL)
+    else:
+        expires_at = now + timedelta(seconds=ANALYTICS_CACHE_TTL)
+        if by in TIME_GROUPINGS:
+            # Start of the next hour, day or week
+            if by == "hour":
+                boundary = rollup_bucket(now, "hour") + timedelta(hours=1)
+            elif by == "day":
+                boundary = rollup_bucket(now, "day") + timedelta(days=1)
+            else:
+                boundary = rollup_bucket(now, "day") + timedelta(days=7 - now.weekday())
+            expires_at = min(expires_at, boundary)
+    return expires_at.replace(tzinfo=timezone.utc).timestamp()
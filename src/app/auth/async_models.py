@@ -0,0 +1,70 @@
+from typing import Dict, Any, Optional
+from pymongo.results import InsertOneResult, UpdateResult
+from bson.objectid import ObjectId
+
+# Import the function to get collections on the async MongoDB client
+from src.db.async_database import get_async_collection
+from datetime import datetime
+
+# Access the 'users' collection from the async database client
+users_collection = get_async_collection('users')
+
+# Find a user by email
+async def find_user_by_email(email: str) -> Optional[Dict[str, Any]]:
+    """Finds a user by their email address.
+
+    Args:
+        email: The email address of the user to find (string).
+
+    Returns:
+        The user document as a dictionary if found, otherwise None.
+    """
+    return await users_collection.find_one({"email": email})
+
+# Find a user by ID
+async def find_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
+    """Finds a user by their ID.
+
+    Args:
+        user_id: The ID of the user to find (string).
+
+    Returns:
+        The user document as a dictionary if found, otherwise None.
+    """
+    return await users_collection.find_one({"_id": ObjectId(user_id)})
+
+# Create a new user
+async def create_user(username: str, email: str, hashed_password: str) -> str:
+    """Creates a new user.
+
+    Args:
+        username: The username of the new user (string).
+        email: The email address of the new user (string).
+        hashed_password: The hashed password of the new user (string).
+
+    Returns:
+        The ID of the newly created user as a string.
+    """
+    user: Dict[str, Any] = {
+        "username": username,
+        "email": email,
+        "password_hash": hashed_password,
+        "created_at": datetime.utcnow() # Set the creation timestamp.
+    }
+    result: InsertOneResult = await users_collection.insert_one(user)
+    return str(result.inserted_id)
+
+# Replace a user's password hash
+async def update_password_hash(user_id: ObjectId, hashed_password: bytes) -> UpdateResult:
+    """Replaces the stored password hash of a user.
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+        hashed_password: The new hashed password (bytes).
+
+    Returns:
+        The result of the update operation.
+    """
+    return await users_collection.update_one(
+        {"_id": user_id}, {"$set": {"password_hash": hashed_password}}
+    )
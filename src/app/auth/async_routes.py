@@ -0,0 +1,133 @@
+from typing import Tuple, Dict, Optional
+
+from quart import Blueprint, request, jsonify, Response
+from pymongo.errors import DuplicateKeyError
+
+from src.app.auth.async_decorators import async_token_required, bearer_token
+from src.app.auth.hashing import HashingBusy
+from src.app.auth.utils import (
+    decode_token,
+    generate_token,
+    hash_password_async,
+    is_token_revoked,
+    password_needs_rehash,
+    revoke_token,
+    verify_password_async,
+)
+from src.app.auth.async_models import create_user, find_user_by_email, update_password_hash
+
+# Async variants of the authentication routes, served by src.asgi
+auth = Blueprint('auth', __name__)
+
+@auth.errorhandler(HashingBusy)
+async def hashing_busy(error: HashingBusy) -> Tuple[Response, int]:
+    """Sheds load when the password hashing pool is saturated."""
+    response = jsonify({"error": "Too many authentication requests, please retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+# Register route
+@auth.route('/register', methods=['POST'])
+async def register() -> Tuple[Response, int]:
+    """Registers a new user.
+
+    Returns:
+        A JSON response indicating the success or failure of the registration,
+        along with the corresponding HTTP status code.
+    """
+    data: Dict = await request.get_json()
+
+    # Validate input
+    if not data.get('username') or not data.get('email') or not data.get('password'):
+        return jsonify({"error": "All fields are required"}), 400
+
+    # Check if the user already exists
+    if await find_user_by_email(data['email']):
+        return jsonify({"error": "User already exists"}), 400
+
+    # Hash the password on the hashing pool and create the user
+    hashed_password: bytes = await hash_password_async(data['password'])
+    try:
+        user_id: str = await create_user(data['username'], data['email'], hashed_password)
+    except DuplicateKeyError:
+        # A concurrent registration won the race on the unique email index
+        return jsonify({"error": "User already exists"}), 400
+
+    return jsonify({"message": "User registered successfully", "user_id": user_id}), 201
+
+# Login route
+@auth.route('/login', methods=['POST'])
+async def login() -> Tuple[Response, int]:
+    """Logs in an existing user.
+
+    Returns:
+        A JSON response indicating the success or failure of the login, along
+        with the corresponding HTTP status code.
+    """
+    data: Dict = await request.get_json()
+
+    # Validate input
+    if not data.get('email') or not data.get('password'):
+        return jsonify({"error": "Email and password are required"}), 400
+
+    # Find the user by email
+    user: Dict = await find_user_by_email(data['email'])
+    if not user:
+        return jsonify({"error": "Invalid email or password"}), 401
+
+    # Verify the password
+    if not await verify_password_async(data['password'], user['password_hash']):
+        return jsonify({"error": "Invalid email or password"}), 401
+
+    # Upgrade hashes made with another cost factor while the password is known
+    if password_needs_rehash(user['password_hash']):
+        try:
+            await update_password_hash(user['_id'], await hash_password_async(data['password']))
+        except HashingBusy:
+            # Best effort: the login itself succeeded, retry on a later login
+            pass
+
+    # Generate a JWT
+    access_token: str = generate_token(user['_id'])
+    refresh_token: str = generate_token(user["_id"], token_type="refresh")
+
+    return jsonify({"message": "Login successful", "access_token": access_token, "refresh_token": refresh_token}), 200
+
+# Generate access token with refresh token route
+@auth.route('/auth/refresh', methods=['POST'])
+async def refresh_token() -> Tuple[Response, int]:
+    """Refreshes an expired access token using a refresh token."""
+    data: Optional[Dict] = await request.get_json()
+    if not data or not isinstance(data, dict):
+        return jsonify({"error": "Invalid request data"}), 400
+
+    refresh_token: Optional[str] = data.get("refresh_token")
+    if not isinstance(refresh_token, str):
+        return jsonify({"error": "Invalid refresh token format"}), 400
+
+    # Decode the refresh token, unless it was revoked by a logout
+    user_id: Optional[int] = None if is_token_revoked(refresh_token) else decode_token(refresh_token)
+    if not user_id:
+        return jsonify({"error": "Invalid or expired refresh token"}), 401
+
+    # Issue a new access token
+    new_access_token: str = generate_token(user_id)
+    return jsonify({"access_token": new_access_token}), 200
+
+# Logout route
+@auth.route('/logout', methods=['POST'])
+@async_token_required
+async def logout() -> Tuple[Response, int]:
+    """Revokes the access token (and optionally the refresh token) of the request.
+
+    Requires an Authorization header with a valid JWT token. A refresh token
+    may be passed in the body as {"refresh_token": "..."}.
+
+    Returns:
+        A JSON response confirming the logout, along with the HTTP status code.
+    """
+    revoke_token(bearer_token())
+    data: Optional[Dict] = await request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get("refresh_token"), str):
+        revoke_token(data["refresh_token"])
+    return jsonify({"message": "Logged out successfully"}), 200
@@ -0,0 +1,36 @@
+from functools import wraps
+from typing import Any, Callable, Optional
+
+from bson.objectid import ObjectId
+from flask import g, jsonify, request
+
+from src.app.auth.utils import verify_token_cached
+
+
+def bearer_token() -> Optional[str]:
+    """Extracts the token from the request's Authorization header, if any."""
+    header: str = request.headers.get("Authorization", "")
+    parts = header.split(" ")
+    return parts[1] if len(parts) == 2 and parts[1] else None
+
+
+def token_required(view: Callable[..., Any]) -> Callable[..., Any]:
+    """Requires a valid JWT token in the Authorization header.
+
+    The authenticated user's ID is stored in ``g.user_id``; requests without
+    a valid token get a 401 response. Verified tokens are cached, so
+    repeated requests with the same token skip signature verification.
+    """
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token: Optional[str] = bearer_token()
+        user_id: Optional[ObjectId] = verify_token_cached(token) if token else None
+
+        # Return 401 if user is not authorized
+        if not user_id:
+            return jsonify({"error": "Unauthorized"}), 401
+
+        g.user_id = user_id
+        return view(*args, **kwargs)
+
+    return wrapper
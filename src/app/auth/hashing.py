@@ -0,0 +1,96 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Any, Callable
+
+import bcrypt
+
+from src.config import BCRYPT_MAX_CONCURRENCY, BCRYPT_QUEUE_DEPTH, BCRYPT_ROUNDS, BCRYPT_TIMEOUT
+from src.utils.metrics import span
+
+
+class HashingBusy(Exception):
+    """Raised when the password hashing pool cannot accept more work."""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a small dedicated thread pool with admission control.
+
+    At most ``max_workers`` hashes run at once and at most ``max_queue`` more
+    may wait; beyond that requests are rejected immediately instead of tying
+    up a worker, which keeps login bursts from starving cheap endpoints.
+    bcrypt releases the GIL while hashing, so other request threads keep
+    running meanwhile.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = BCRYPT_MAX_CONCURRENCY,
+        max_queue: int = BCRYPT_QUEUE_DEPTH,
+        rounds: int = BCRYPT_ROUNDS,
+        timeout: float = BCRYPT_TIMEOUT,
+    ) -> None:
+        self.rounds = rounds
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(max_workers + max_queue)
+        self.rejected = 0
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        # Admit the work only if a running or queued slot is free
+        if not self._slots.acquire(blocking=False):
+            self.rejected += 1
+            raise HashingBusy("Password hashing is saturated")
+        try:
+            future: Future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Timed from the request thread, so the time waiting for a free worker counts too
+        with span("auth.bcrypt"):
+            future = self._submit(fn, *args)
+            try:
+                return future.result(timeout=self.timeout)
+            except TimeoutError:
+                raise HashingBusy("Password hashing timed out")
+
+    async def _run_async(self, fn: Callable[..., Any], *args: Any) -> Any:
+        # Await the pool from an event loop without blocking it
+        with span("auth.bcrypt"):
+            future = self._submit(fn, *args)
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+            except asyncio.TimeoutError:
+                raise HashingBusy("Password hashing timed out")
+
+    def hash(self, password: str) -> bytes:
+        """Hashes a password with the configured cost factor."""
+        return self._run(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)))
+
+    def verify(self, password: str, password_hash: bytes) -> bool:
+        """Checks a password against a bcrypt hash."""
+        return self._run(lambda: bcrypt.checkpw(password.encode('utf-8'), password_hash))
+
+    async def hash_async(self, password: str) -> bytes:
+        """Hashes a password, awaitable from an event loop."""
+        return await self._run_async(lambda: bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds=self.rounds)))
+
+    async def verify_async(self, password: str, password_hash: bytes) -> bool:
+        """Checks a password against a bcrypt hash, awaitable from an event loop."""
+        return await self._run_async(lambda: bcrypt.checkpw(password.encode('utf-8'), password_hash))
+
+    def needs_rehash(self, password_hash: bytes) -> bool:
+        """Returns True if a hash was made with a different cost factor."""
+        # bcrypt hashes look like b"$2b$12$...", the cost being the third field
+        try:
+            return int(bytes(password_hash).split(b"$")[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+
+# Process-wide password hasher
+password_hasher = PasswordHasher()
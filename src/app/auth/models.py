@@ -1,18 +1,18 @@
 from typing import Dict, Any, Optional
-from pymongo.results import InsertOneResult
+from pymongo.results import InsertOneResult, UpdateResult
 from bson.objectid import ObjectId
 from bson.son import SON
 
-# Import the function to get database connection
-from src.db.database import get_db
+# Import the function to get database collections
+from src.db.database import get_collection
+from src.utils.metrics import timed
 from datetime import datetime
 
-# Get the database instance
-db = get_db()
-# Access the 'users' collection from the database
-users_collection = db['users']
+# Access the 'users' collection from the shared database client
+users_collection = get_collection('users')
 
 # Find a user by email
+@timed("db.find_user_by_email")
 def find_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     """Finds a user by their email address.
 
@@ -26,6 +26,7 @@ def find_user_by_email(email: str) -> Optional[Dict[str, Any]]:
     return users_collection.find_one({"email": email})
 
 # Find a user by ID
+@timed("db.find_user_by_id")
 def find_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
     """Finds a user by their ID.
 
@@ -40,6 +41,7 @@ def find_user_by_id(user_id: str) -> Optional[Dict[str, Any]]:
     return users_collection.find_one({"_id": ObjectId(user_id)})
 
 # Create a new user
+@timed("db.create_user")
 def create_user(username: str, email: str, hashed_password: str) -> str:
     """Creates a new user.
 
@@ -61,4 +63,20 @@ def create_user(username: str, email: str, hashed_password: str) -> str:
     # Insert the new user document into the 'users' collection.
     result: InsertOneResult = users_collection.insert_one(user)
     # Return the newly inserted user's ID as a string.
-    return str(result.inserted_id)
\ No newline at end of file
+    return str(result.inserted_id)
+
+# Replace a user's password hash
+@timed("db.update_password_hash")
+def update_password_hash(user_id: ObjectId, hashed_password: bytes) -> UpdateResult:
+    """Replaces the stored password hash of a user.
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+        hashed_password: The new hashed password (bytes).
+
+    Returns:
+        The result of the update operation.
+    """
+    return users_collection.update_one(
+        {"_id": user_id}, {"$set": {"password_hash": hashed_password}}
+    )
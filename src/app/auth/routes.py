@@ -1,12 +1,30 @@
-from typing import Tuple, Dict
+from typing import Tuple, Dict, Optional
 
 from flask import Blueprint, request, jsonify, Response
-
-from src.app.auth.utils import decode_token, hash_password, verify_password, generate_token
-from src.app.auth.models import create_user, find_user_by_email
+from pymongo.errors import DuplicateKeyError
+
+from src.app.auth.decorators import bearer_token, token_required
+from src.app.auth.hashing import HashingBusy
+from src.app.auth.utils import (
+    decode_token,
+    generate_token,
+    hash_password,
+    is_token_revoked,
+    password_needs_rehash,
+    revoke_token,
+    verify_password,
+)
+from src.app.auth.models import create_user, find_user_by_email, update_password_hash
 
 auth = Blueprint('auth', __name__)
 
+@auth.errorhandler(HashingBusy)
+def hashing_busy(error: HashingBusy) -> Tuple[Response, int]:
+    """Sheds load when the password hashing pool is saturated."""
+    response = jsonify({"error": "Too many authentication requests, please retry"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
 # Register route
 @auth.route('/register', methods=['POST'])
 def register() -> Tuple[Response, int]:
@@ -29,7 +47,11 @@ def register() -> Tuple[Response, int]:
 
     # Hash the password and create the user
     hashed_password: str = hash_password(data['password'])
-    user_id: str = create_user(data['username'], data['email'], hashed_password)
+    try:
+        user_id: str = create_user(data['username'], data['email'], hashed_password)
+    except DuplicateKeyError:
+        # A concurrent registration won the race on the unique email index
+        return jsonify({"error": "User already exists"}), 400
 
     return jsonify({"message": "User registered successfully", "user_id": user_id}), 201
 
@@ -57,6 +79,14 @@ def login() -> Tuple[Response, int]:
     if not verify_password(data['password'], user['password_hash']):
         return jsonify({"error": "Invalid email or password"}), 401
 
+    # Upgrade hashes made with another cost factor while the password is known
+    if password_needs_rehash(user['password_hash']):
+        try:
+            update_password_hash(user['_id'], hash_password(data['password']))
+        except HashingBusy:
+            # Best effort: the login itself succeeded, retry on a later login
+            pass
+
     # Generate a JWT
     access_token: str = generate_token(user['_id'])
     refresh_token: str = generate_token(user["_id"], token_type="refresh")
@@ -76,11 +106,29 @@ def refresh_token() -> Tuple[Response, int]:
     if not isinstance(refresh_token, str):
        return jsonify({"error": "Invalid refresh token format"}), 400
     
-    # Decode the refresh token
-    user_id: Optional[int] = decode_token(refresh_token)
+    # Decode the refresh token, unless it was revoked by a logout
+    user_id: Optional[int] = None if is_token_revoked(refresh_token) else decode_token(refresh_token)
     if not user_id:
         return jsonify({"error": "Invalid or expired refresh token"}), 401
 
     # Issue a new access token
     new_access_token: str = generate_token(user_id)
-    return jsonify({"access_token": new_access_token}), 200
\ No newline at end of file
+    return jsonify({"access_token": new_access_token}), 200
+
+# Logout route
+@auth.route('/logout', methods=['POST'])
+@token_required
+def logout() -> Tuple[Response, int]:
+    """Revokes the access token (and optionally the refresh token) of the request.
+
+    Requires an Authorization header with a valid JWT token. A refresh token
+    may be passed in the body as {"refresh_token": "..."}.
+
+    Returns:
+        A JSON response confirming the logout, along with the HTTP status code.
+    """
+    revoke_token(bearer_token())
+    data: Optional[Dict] = request.get_json(silent=True)
+    if isinstance(data, dict) and isinstance(data.get("refresh_token"), str):
+        revoke_token(data["refresh_token"])
+    return jsonify({"message": "Logged out successfully"}), 200
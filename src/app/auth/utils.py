@@ -1,11 +1,15 @@
-import bcrypt
+import hashlib
 
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Callable, List
 
 # Import configurations for JWT tokens
-from src.config import JWT_SECRET_KEY, ACCESS_TOKEN_EXPIRES, REFRESH_TOKEN_EXPIRES
+from src.config import JWT_SECRET_KEY, ACCESS_TOKEN_EXPIRES, REFRESH_TOKEN_EXPIRES, TOKEN_CACHE_MAX_ENTRIES
+from src.app.auth.hashing import password_hasher
+from src.utils.cache import TTLCache
+from src.utils.metrics import timed
 
 import jwt
 
@@ -17,9 +21,12 @@ def hash_password(password: str) -> bytes:
 
     Returns:
         The hashed password as bytes.
+
+    Raises:
+        HashingBusy: If the password hashing pool is saturated.
     """
-    # Hashes the password using bcrypt with a randomly generated salt.
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    # Hashes the password using bcrypt with a randomly generated salt, on the hashing pool.
+    return password_hasher.hash(password)
 
 def verify_password(password: str, password_hash: bytes) -> bool:
     """Verifies a password against a hashed password.
@@ -30,9 +37,52 @@ def verify_password(password: str, password_hash: bytes) -> bool:
 
     Returns:
         True if the password matches the hash, False otherwise.
+
+    Raises:
+        HashingBusy: If the password hashing pool is saturated.
+    """
+    # Checks if the provided password matches the stored hash using bcrypt, on the hashing pool.
+    return password_hasher.verify(password, password_hash)
+
+async def hash_password_async(password: str) -> bytes:
+    """Hashes a password using bcrypt without blocking the event loop.
+
+    Args:
+        password: The password to hash (string).
+
+    Returns:
+        The hashed password as bytes.
+
+    Raises:
+        HashingBusy: If the password hashing pool is saturated.
+    """
+    return await password_hasher.hash_async(password)
+
+async def verify_password_async(password: str, password_hash: bytes) -> bool:
+    """Verifies a password against a hashed password without blocking the event loop.
+
+    Args:
+        password: The password to verify (string).
+        password_hash: The hashed password to compare against (bytes).
+
+    Returns:
+        True if the password matches the hash, False otherwise.
+
+    Raises:
+        HashingBusy: If the password hashing pool is saturated.
     """
-    # Checks if the provided password matches the stored hash using bcrypt.
-    return bcrypt.checkpw(password.encode('utf-8'), password_hash)
+    return await password_hasher.verify_async(password, password_hash)
+
+def password_needs_rehash(password_hash: bytes) -> bool:
+    """Checks whether a stored hash uses a cost factor other than the configured one.
+
+    Args:
+        password_hash: The stored hashed password (bytes).
+
+    Returns:
+        True if the password should be hashed again, False otherwise.
+    """
+    return password_hasher.needs_rehash(password_hash)
 
 def generate_token(user_id: ObjectId, token_type: str = "access") -> str:
     """Generates a JWT (JSON Web Token) for a user.
@@ -57,6 +107,7 @@ def generate_token(user_id: ObjectId, token_type: str = "access") -> str:
     # Encode the payload into a JWT using the provided secret key and HS256 algorithm.
     return jwt.encode(payload, JWT_SECRET_KEY, algorithm="HS256")
 
+@timed("auth.jwt_decode")
 def decode_token(token: str) -> Optional[ObjectId]:
     """Decodes a JWT token and returns the user ID.
 
@@ -96,4 +147,91 @@ def is_token_expired(token: str) -> bool:
         return False
     except jwt.ExpiredSignatureError:
         # Return True if the token has expired.
-        return True
\ No newline at end of file
+        return True
+
+def _token_digest(token: str) -> str:
+    # Cache entries are keyed by digest so raw tokens are never kept in memory
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _is_revoked(digest: str) -> bool:
+    return revoked_tokens.get(digest) is not None
+
+def is_token_revoked(token: str) -> bool:
+    """Checks if a JWT token was revoked before its expiry time.
+
+    Args:
+        token: The JWT token to check (string).
+
+    Returns:
+        True if the token is revoked, False otherwise.
+    """
+    return _is_revoked(_token_digest(token))
+
+def verify_token_cached(token: str) -> Optional[ObjectId]:
+    """Verifies a JWT token, reusing earlier verifications of the same token.
+
+    A successfully verified token is cached until its own expiry time, so
+    repeated requests with the same token skip the signature check and the
+    claim validation. Revoked tokens are always rejected.
+
+    Args:
+        token: The JWT token to verify (string).
+
+    Returns:
+        The user ID as an ObjectId if the token is valid, None otherwise.
+    """
+    digest = _token_digest(token)
+    # Reject tokens revoked before their expiry
+    if _is_revoked(digest):
+        return None
+    user_id: Optional[ObjectId] = token_cache.get(digest)
+    if user_id is not None:
+        return user_id
+
+    try:
+        payload: Dict[str, Any] = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
+        user_id = ObjectId(payload["user_id"])
+    except (jwt.InvalidTokenError, KeyError, InvalidId):
+        return None
+    # Keep the verified token only until it expires
+    token_cache.set(digest, user_id, expires_at=payload["exp"])
+    return user_id
+
+def revoke_token(token: str) -> bool:
+    """Revokes a JWT token before its expiry time.
+
+    Args:
+        token: The JWT token to revoke (string).
+
+    Returns:
+        True if the token was valid and is now revoked, False otherwise.
+    """
+    try:
+        payload: Dict[str, Any] = jwt.decode(token, JWT_SECRET_KEY, algorithms=["HS256"])
+    except jwt.InvalidTokenError:
+        return False
+    digest = _token_digest(token)
+    token_cache.delete(digest)
+    # Remember the revocation for as long as the token would have been valid
+    revoked_tokens.set(digest, True, expires_at=payload["exp"])
+    for listener in revocation_listeners:
+        listener(token, payload)
+    return True
+
+def token_cache_stats() -> Dict[str, Dict[str, int]]:
+    """Returns the counters of the verified and revoked token caches."""
+    return {"verified": token_cache.stats(), "revoked": revoked_tokens.stats()}
+
+def on_token_revoked(listener: Callable[[str, Dict[str, Any]], None]) -> Callable[[str, Dict[str, Any]], None]:
+    """Registers a function called with (token, payload) whenever a token is revoked.
+
+    Can be used as a decorator, e.g. to propagate revocations to other workers.
+    """
+    revocation_listeners.append(listener)
+    return listener
+
+
+# Verified tokens and revoked tokens of this process, keyed by token digest
+token_cache = TTLCache(max_entries=TOKEN_CACHE_MAX_ENTRIES)
+revoked_tokens = TTLCache(max_entries=TOKEN_CACHE_MAX_ENTRIES)
+revocation_listeners: List[Callable[[str, Dict[str, Any]], None]] = []
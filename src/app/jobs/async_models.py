@@ -0,0 +1,31 @@
+from typing import Any, Dict, Optional
+
+from bson.objectid import ObjectId
+
+# Import the function to get collections on the async MongoDB client
+from src.db.async_database import get_async_collection
+# Share the document layout with the synchronous models
+from src.app.jobs.models import job_document
+
+# Access the 'jobs' collection from the async database client
+jobs_collection = get_async_collection('jobs')
+
+# Create job
+async def create_job(user_id: ObjectId, kind: str, params: Dict[str, Any], total: int = 0) -> Dict[str, Any]:
+    """Saves a queued job to the database (see job_document).
+
+    Returns:
+        The inserted job document, including its _id.
+    """
+    job: Dict[str, Any] = job_document(user_id, kind, params, total)
+    await jobs_collection.insert_one(job)
+    return job
+
+# Find a job by ID
+async def find_job(job_id: ObjectId, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Finds a job submitted by a user.
+
+    Returns:
+        The job document if found, otherwise None.
+    """
+    return await jobs_collection.find_one({"_id": job_id, "user_id": user_id}, {"params": 0})
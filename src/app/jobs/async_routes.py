@@ -0,0 +1,107 @@
+import asyncio
+from typing import Any, Dict, Optional, Tuple
+
+from bson.objectid import ObjectId
+from kombu.exceptions import OperationalError
+from quart import Blueprint, Response, g, jsonify, request, send_file, url_for
+
+from src.app.auth.async_decorators import async_token_required
+from src.app.jobs.async_models import create_job, find_job
+from src.app.jobs.routes import job_status_body, qr_codes_job_params, scans_job_params
+from src.app.jobs.tasks import JOB_OUTPUTS, enqueue_job
+from src.app.qrcodes.async_models import find_qr_code
+from src.app.qrcodes.services import parse_object_id
+
+# Async variants of the background job routes, served by src.asgi
+jobs = Blueprint('jobs', __name__)
+
+# Authorized background QR code generation
+@jobs.route('/qrcodes', methods=['POST'])
+@async_token_required
+async def submit_qr_codes_job() -> Tuple[Response, int]:
+    """Queues the generation of many QR codes as a background job (see the synchronous route).
+
+    Returns:
+        A tuple containing the JSON response with the job and the HTTP status code.
+    """
+    data: Dict[str, Any] = await request.get_json(silent=True) or {}
+    params, error = qr_codes_job_params(data)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    job: Dict[str, Any] = await create_job(g.user_id, "qrcodes", params, len(params["items"]))
+    return await queued_response(job)
+
+# Authorized background scans export
+@jobs.route('/scans', methods=['POST'])
+@async_token_required
+async def submit_scans_job() -> Tuple[Response, int]:
+    """Queues the export of the scans of a QR code as a background job (see the synchronous route).
+
+    Returns:
+        A tuple containing the JSON response with the job and the HTTP status code.
+    """
+    data: Dict[str, Any] = await request.get_json(silent=True) or {}
+    params, error = scans_job_params(data)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    if await find_qr_code(params["qr_code_id"], g.user_id) is None:
+        return jsonify({"error": "QR code not found or unauthorized"}), 404
+    job: Dict[str, Any] = await create_job(g.user_id, "scans", params)
+    return await queued_response(job)
+
+async def queued_response(job: Dict[str, Any]) -> Tuple[Response, int]:
+    """Sends a new job to the workers and returns the 202 response pointing at its status."""
+    try:
+        # Publishing to the broker blocks, so keep it off the event loop
+        await asyncio.get_running_loop().run_in_executor(None, enqueue_job, job)
+    except OperationalError:
+        return jsonify({"error": "The job queue is unavailable, please retry"}), 503
+    status_url: str = url_for('.job_status', job_id=str(job["_id"]))
+    response = jsonify({"job_id": str(job["_id"]), "status": "queued", "status_url": status_url})
+    response.headers["Location"] = status_url
+    return response, 202
+
+# Authorized GET job status
+@jobs.route('/<job_id>', methods=['GET'])
+@async_token_required
+async def job_status(job_id: str) -> Tuple[Response, int]:
+    """Reports the status and progress of a job (see the synchronous route).
+
+    Args:
+        job_id: The ID of the job (string).
+
+    Returns:
+        A tuple containing the JSON response with the job and the HTTP status code.
+    """
+    object_id: Optional[ObjectId] = parse_object_id(job_id)
+    job: Optional[Dict[str, Any]] = await find_job(object_id, g.user_id) if object_id else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_status_body(job, url_for('.download_job_output', job_id=job_id))), 200
+
+# Authorized GET job output
+@jobs.route('/<job_id>/download', methods=['GET'])
+@async_token_required
+async def download_job_output(job_id: str) -> Tuple[Response, int]:
+    """Downloads the file written by a succeeded job.
+
+    Args:
+        job_id: The ID of the job (string).
+
+    Returns:
+        A tuple containing the file response and the HTTP status code.
+    """
+    object_id: Optional[ObjectId] = parse_object_id(job_id)
+    job: Optional[Dict[str, Any]] = await find_job(object_id, g.user_id) if object_id else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != "succeeded":
+        return jsonify({"error": f"The job is {job['status']}"}), 409
+
+    extension, mimetype = JOB_OUTPUTS[job["kind"]]
+    return await send_file(
+        job["path"],
+        mimetype=mimetype,
+        as_attachment=True,
+        attachment_filename=f"{job['kind']}-{job_id}.{extension}",
+    )
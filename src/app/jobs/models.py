@@ -0,0 +1,156 @@
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from bson.objectid import ObjectId
+from pymongo import ReturnDocument
+from pymongo.results import UpdateResult
+
+from src.db.database import get_collection
+from src.utils.metrics import timed
+
+# Background jobs and their progress, written by the Celery workers
+jobs_collection = get_collection('jobs')
+
+# Kinds of job, each run by the task of the same name in src.app.jobs.tasks
+JOB_KINDS = ("qrcodes", "scans")
+
+# Build a job document
+def job_document(user_id: ObjectId, kind: str, params: Dict[str, Any], total: int = 0) -> Dict[str, Any]:
+    """Builds the document stored for a queued job.
+
+    Args:
+        user_id: The ID of the user who submitted the job (ObjectId).
+        kind: One of JOB_KINDS (string).
+        params: The request parameters the worker runs the job with (dict).
+        total: The number of items to process, if known upfront (int, default is 0).
+
+    Returns:
+        The job document.
+    """
+    return {
+        "user_id": user_id,
+        "kind": kind,
+        "status": "queued",
+        "params": params,
+        "done": 0,
+        "total": total,
+        "error": None,
+        "result": None,
+        "path": None,
+        "created_at": datetime.utcnow(),
+        "started_at": None,
+        "finished_at": None,
+    }
+
+# Create job
+@timed("db.create_job")
+def create_job(user_id: ObjectId, kind: str, params: Dict[str, Any], total: int = 0) -> Dict[str, Any]:
+    """Saves a queued job to the database (see job_document).
+
+    Returns:
+        The inserted job document, including its _id.
+    """
+    job: Dict[str, Any] = job_document(user_id, kind, params, total)
+    jobs_collection.insert_one(job)
+    return job
+
+# Find a job by ID
+@timed("db.find_job")
+def find_job(job_id: ObjectId, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Finds a job submitted by a user.
+
+    Args:
+        job_id: The ID of the job (ObjectId).
+        user_id: The ID of the user who submitted the job (ObjectId).
+
+    Returns:
+        The job document if found, otherwise None.
+    """
+    return jobs_collection.find_one({"_id": job_id, "user_id": user_id}, {"params": 0})
+
+# Claim a queued job
+@timed("db.start_job")
+def start_job(job_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Marks a queued job as running.
+
+    Only the first delivery of a job claims it, so a job redelivered after
+    its worker was lost is not run twice.
+
+    Args:
+        job_id: The ID of the job (ObjectId).
+
+    Returns:
+        The job document, with its params, if it was queued, otherwise None.
+    """
+    return jobs_collection.find_one_and_update(
+        {"_id": job_id, "status": "queued"},
+        {"$set": {"status": "running", "started_at": datetime.utcnow()}},
+        return_document=ReturnDocument.AFTER,
+    )
+
+# Report the progress of a running job
+@timed("db.update_job_progress")
+def update_job_progress(job_id: ObjectId, done: int, total: Optional[int] = None) -> UpdateResult:
+    """Records how many items of a running job were processed.
+
+    Args:
+        job_id: The ID of the job (ObjectId).
+        done: The number of items processed so far (int).
+        total: The number of items to process, when only known once running (int, optional).
+
+    Returns:
+        The result of the update operation as an `UpdateResult` object.
+    """
+    progress: Dict[str, Any] = {"done": done}
+    if total is not None:
+        progress["total"] = total
+    return jobs_collection.update_one({"_id": job_id}, {"$set": progress})
+
+# Finish a job
+@timed("db.complete_job")
+def complete_job(job_id: ObjectId, path: str, result: Dict[str, Any]) -> UpdateResult:
+    """Marks a job as succeeded.
+
+    Args:
+        job_id: The ID of the job (ObjectId).
+        path: The path of the file written by the job (string).
+        result: A summary of the job's output (dict).
+
+    Returns:
+        The result of the update operation as an `UpdateResult` object.
+    """
+    return jobs_collection.update_one(
+        {"_id": job_id},
+        {"$set": {"status": "succeeded", "path": path, "result": result, "finished_at": datetime.utcnow()}},
+    )
+
+@timed("db.fail_job")
+def fail_job(job_id: ObjectId, error: str) -> UpdateResult:
+    """Marks a job as failed.
+
+    Args:
+        job_id: The ID of the job (ObjectId).
+        error: The reason of the failure (string).
+
+    Returns:
+        The result of the update operation as an `UpdateResult` object.
+    """
+    return jobs_collection.update_one(
+        {"_id": job_id},
+        {"$set": {"status": "failed", "error": error, "finished_at": datetime.utcnow()}},
+    )
+
+def serialize_job(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Returns the public fields of a job document, with ObjectIds as strings."""
+    return {
+        "job_id": str(job["_id"]),
+        "kind": job["kind"],
+        "status": job["status"],
+        "done": job["done"],
+        "total": job["total"],
+        "error": job["error"],
+        "result": job["result"],
+        "created_at": job["created_at"],
+        "started_at": job["started_at"],
+        "finished_at": job["finished_at"],
+    }
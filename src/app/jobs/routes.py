@@ -0,0 +1,155 @@
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from bson.objectid import ObjectId
+from flask import Blueprint, Response, g, jsonify, request, send_file, url_for
+from kombu.exceptions import OperationalError
+
+from src.app.auth.decorators import token_required
+from src.app.jobs.models import create_job, find_job, serialize_job
+from src.app.jobs.tasks import JOB_OUTPUTS, enqueue_job
+from src.app.qrcodes.models import find_qr_code
+from src.app.qrcodes.services import parse_object_id
+from src.config import JOB_MAX_ITEMS
+from src.utils.datetimes import parse_datetime
+
+# Define the blueprint for background job routes
+jobs = Blueprint('jobs', __name__)
+
+# Authorized background QR code generation
+@jobs.route('/qrcodes', methods=['POST'])
+@token_required
+def submit_qr_codes_job() -> Tuple[Response, int]:
+    """Queues the generation of many QR codes as a background job.
+
+    Requires an Authorization header with a valid JWT token. The request body
+    is the same as the one of /qrcodes/generate/batch, but may hold up to
+    JOB_MAX_ITEMS items. A Celery worker saves and renders them in chunks
+    into a ZIP archive, downloaded from /jobs/<job_id>/download once done.
+
+    Returns:
+        A tuple containing the JSON response with the job and the HTTP status code.
+    """
+    data: Dict[str, Any] = request.get_json(silent=True) or {}
+    params, error = qr_codes_job_params(data)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    job: Dict[str, Any] = create_job(g.user_id, "qrcodes", params, len(params["items"]))
+    return queued_response(job)
+
+# Authorized background scans export
+@jobs.route('/scans', methods=['POST'])
+@token_required
+def submit_scans_job() -> Tuple[Response, int]:
+    """Queues the export of the scans of a QR code as a background job.
+
+    Requires an Authorization header with a valid JWT token. The request body
+    holds the "qr_code_id" of a QR code owned by the user and an optional
+    ISO 8601 "since" and "until" time range. A Celery worker writes the scans
+    as newline-delimited JSON, downloaded from /jobs/<job_id>/download.
+
+    Returns:
+        A tuple containing the JSON response with the job and the HTTP status code.
+    """
+    data: Dict[str, Any] = request.get_json(silent=True) or {}
+    params, error = scans_job_params(data)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    if find_qr_code(params["qr_code_id"], g.user_id) is None:
+        return jsonify({"error": "QR code not found or unauthorized"}), 404
+    job: Dict[str, Any] = create_job(g.user_id, "scans", params)
+    return queued_response(job)
+
+def qr_codes_job_params(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validates the body of a QR code generation job.
+
+    Returns:
+        A tuple of (job params, None) on success or (None, error message).
+    """
+    items: Any = data.get("items")
+    if not isinstance(items, list) or not items:
+        return None, "A non-empty list of items is required"
+    if len(items) > JOB_MAX_ITEMS:
+        return None, f"A job may contain at most {JOB_MAX_ITEMS} items"
+    return {"items": items}, None
+
+def scans_job_params(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validates the body of a scans export job.
+
+    Returns:
+        A tuple of (job params, None) on success or (None, error message).
+    """
+    qr_code_id: Optional[ObjectId] = parse_object_id(data.get("qr_code_id"))
+    if qr_code_id is None:
+        return None, "Invalid QR Code ID"
+    try:
+        since: Optional[datetime] = parse_datetime(data.get("since"))
+        until: Optional[datetime] = parse_datetime(data.get("until"))
+    except (TypeError, ValueError):
+        return None, "Invalid time range parameters"
+    return {"qr_code_id": qr_code_id, "since": since, "until": until}, None
+
+def queued_response(job: Dict[str, Any]) -> Tuple[Response, int]:
+    """Sends a new job to the workers and returns the 202 response pointing at its status."""
+    try:
+        enqueue_job(job)
+    except OperationalError:
+        return jsonify({"error": "The job queue is unavailable, please retry"}), 503
+    status_url: str = url_for('.job_status', job_id=str(job["_id"]))
+    response = jsonify({"job_id": str(job["_id"]), "status": "queued", "status_url": status_url})
+    response.headers["Location"] = status_url
+    return response, 202
+
+# Authorized GET job status
+@jobs.route('/<job_id>', methods=['GET'])
+@token_required
+def job_status(job_id: str) -> Tuple[Response, int]:
+    """Reports the status and progress of a job.
+
+    Requires an Authorization header with a valid JWT token. "done" and
+    "total" count the processed items; a succeeded job also has a
+    "download_url" and a "result" summary, and a failed one an "error".
+
+    Args:
+        job_id: The ID of the job (string).
+
+    Returns:
+        A tuple containing the JSON response with the job and the HTTP status code.
+    """
+    object_id: Optional[ObjectId] = parse_object_id(job_id)
+    job: Optional[Dict[str, Any]] = find_job(object_id, g.user_id) if object_id else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job_status_body(job, url_for('.download_job_output', job_id=job_id))), 200
+
+def job_status_body(job: Dict[str, Any], download_url: str) -> Dict[str, Any]:
+    """Returns the status response of a job, with its download URL once succeeded."""
+    body: Dict[str, Any] = serialize_job(job)
+    if job["status"] == "succeeded":
+        body["download_url"] = download_url
+    return body
+
+# Authorized GET job output
+@jobs.route('/<job_id>/download', methods=['GET'])
+@token_required
+def download_job_output(job_id: str) -> Tuple[Response, int]:
+    """Downloads the file written by a succeeded job.
+
+    Args:
+        job_id: The ID of the job (string).
+
+    Returns:
+        A tuple containing the file response and the HTTP status code.
+    """
+    object_id: Optional[ObjectId] = parse_object_id(job_id)
+    job: Optional[Dict[str, Any]] = find_job(object_id, g.user_id) if object_id else None
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    if job["status"] != "succeeded":
+        return jsonify({"error": f"The job is {job['status']}"}), 409
+
+    extension, mimetype = JOB_OUTPUTS[job["kind"]]
+    # Serve the file from its path so the server can use sendfile
+    return send_file(
+        job["path"], mimetype=mimetype, as_attachment=True, download_name=f"{job['kind']}-{job_id}.{extension}"
+    )
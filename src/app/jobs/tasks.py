@@ -0,0 +1,192 @@
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple
+
+from bson.objectid import ObjectId
+from kombu.exceptions import OperationalError
+
+from src.app.analytics.models import find_scans_by_qr_code, scans_collection, scans_query
+from src.app.jobs.models import complete_job, fail_job, start_job, update_job_progress
+from src.app.qrcodes.models import create_qr_codes, delete_qr_codes_by_ids, get_logos
+from src.app.qrcodes.rendering import render_qr_specs
+from src.app.qrcodes.services import batch_specs, qr_code_target, referenced_logo_ids
+from src.config import ANALYTICS_CURSOR_BATCH_SIZE, JOB_CHUNK_SIZE, JOB_STORAGE_DIR
+from src.utils.zipstream import stream_zip
+from src.worker import celery
+
+# File written by each kind of job, as (extension, mimetype)
+JOB_OUTPUTS: Dict[str, Tuple[str, str]] = {
+    "qrcodes": ("zip", "application/zip"),
+    "scans": ("ndjson", "application/x-ndjson"),
+}
+
+
+def job_path(job_id: ObjectId, kind: str) -> str:
+    """Returns the absolute path of the file written by a job.
+
+    The path is stored with the job and served by Flask's send_file, which
+    would resolve a relative path against the app root instead of the cwd.
+    """
+    return os.path.abspath(os.path.join(JOB_STORAGE_DIR, f"{job_id}.{JOB_OUTPUTS[kind][0]}"))
+
+def write_file(path: str, chunks: Iterable[bytes]) -> None:
+    """Writes a file from chunks without holding it in memory.
+
+    The file only appears at ``path`` once complete, so it is never
+    downloaded half-written.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def run_job(job_id: str, export: Callable[[Dict[str, Any], str], Dict[str, Any]]) -> None:
+    """Claims a queued job, runs its export and records the outcome.
+
+    Args:
+        job_id: The ID of the job (string).
+        export: A function writing the job's output file to the given path
+            and returning a summary of it.
+    """
+    job = start_job(ObjectId(job_id))
+    if job is None:
+        # Redelivered after its worker was lost: part of its output may already be saved
+        fail_job(ObjectId(job_id), "The worker running this job stopped, please submit it again")
+        return
+    path = job_path(job["_id"], job["kind"])
+    try:
+        result: Dict[str, Any] = export(job, path)
+    except Exception as e:
+        fail_job(job["_id"], str(e))
+        raise
+    complete_job(job["_id"], path, result)
+
+# Generate QR codes in the background
+@celery.task(name="jobs.qrcodes")
+def export_qr_codes(job_id: str) -> None:
+    """Generates the QR codes of a job into a ZIP archive (see write_qr_codes_archive)."""
+    run_job(job_id, write_qr_codes_archive)
+
+def write_qr_codes_archive(job: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Saves and renders the QR codes of a job, chunk by chunk, into a ZIP archive.
+
+    Each chunk of JOB_CHUNK_SIZE items is saved with a single insert and
+    rendered in this worker process before the job's progress is updated.
+    The archive has the same layout as the one of /generate/batch.
+
+    Args:
+        job: The job document, whose params hold the batch "items".
+        path: The path of the archive to write (string).
+
+    Returns:
+        The number of created QR codes and of failed items.
+    """
+    user_id: ObjectId = job["user_id"]
+    items: List[Any] = job["params"]["items"]
+    logos: Dict[ObjectId, Dict[str, Any]] = get_logos(referenced_logo_ids(items), user_id)
+    specs, indexes, errors = batch_specs(items, logos)
+    created: List[Dict[str, Any]] = []
+
+    def archive_files() -> Iterator[Tuple[str, bytes]]:
+        # Invalid items are done already
+        done = len(errors)
+        update_job_progress(job["_id"], done)
+        for start in range(0, len(specs), JOB_CHUNK_SIZE):
+            chunk: List[Dict[str, Any]] = specs[start:start + JOB_CHUNK_SIZE]
+            # Save the metadata of the chunk in one round trip, then encode each short link
+            saved: List[Dict[str, Any]] = create_qr_codes(user_id, chunk)
+            chunk = [{**spec, "url": qr_code_target(qr_code)} for spec, qr_code in zip(chunk, saved)]
+            failed_ids: List[ObjectId] = []
+            for index, qr_code, (png, error) in zip(indexes[start:], saved, render_qr_specs(chunk)):
+                if error is not None:
+                    errors.append({"index": index, "error": error})
+                    failed_ids.append(qr_code["_id"])
+                    continue
+                qr_code_id = str(qr_code["_id"])
+                created.append({"index": index, "qr_code_id": qr_code_id, "file": f"{qr_code_id}.png"})
+                yield f"{qr_code_id}.png", png
+            # Remove the metadata of items that could not be rendered
+            if failed_ids:
+                delete_qr_codes_by_ids(failed_ids, user_id)
+            done += len(chunk)
+            update_job_progress(job["_id"], done)
+        manifest = {"created": created, "errors": sorted(errors, key=lambda e: e["index"])}
+        yield "manifest.json", json.dumps(manifest).encode('utf-8')
+
+    write_file(path, stream_zip(archive_files()))
+    return {"created": len(created), "errors": len(errors)}
+
+# Export scans in the background
+@celery.task(name="jobs.scans")
+def export_scans(job_id: str) -> None:
+    """Exports the scans of a QR code into an NDJSON file (see write_scans_export)."""
+    run_job(job_id, write_scans_export)
+
+def write_scans_export(job: Dict[str, Any], path: str) -> Dict[str, Any]:
+    """Writes the scans of a QR code as newline-delimited JSON, oldest first.
+
+    Args:
+        job: The job document, whose params hold the "qr_code_id" and an
+            optional "since" and "until" time range.
+        path: The path of the file to write (string).
+
+    Returns:
+        The number of exported scans.
+    """
+    params: Dict[str, Any] = job["params"]
+    qr_code_id: ObjectId = params["qr_code_id"]
+    since, until = params.get("since"), params.get("until")
+    total: int = scans_collection.count_documents(scans_query(qr_code_id, None, since, until))
+    update_job_progress(job["_id"], 0, total)
+    exported = 0
+
+    def lines() -> Iterator[bytes]:
+        nonlocal exported
+        batch: List[str] = []
+        for scan in find_scans_by_qr_code(qr_code_id, since=since, until=until):
+            batch.append(json.dumps(scan, default=json_default) + "\n")
+            # Write and report progress once per cursor batch
+            if len(batch) == ANALYTICS_CURSOR_BATCH_SIZE:
+                exported += len(batch)
+                yield "".join(batch).encode('utf-8')
+                update_job_progress(job["_id"], exported)
+                batch = []
+        exported += len(batch)
+        yield "".join(batch).encode('utf-8')
+        update_job_progress(job["_id"], exported)
+
+    write_file(path, lines())
+    return {"scans": exported}
+
+def json_default(value: Any) -> str:
+    """Encodes the values json does not support, such as scan timestamps, in exports."""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+# Tasks running each kind of job
+JOB_TASKS = {
+    "qrcodes": export_qr_codes,
+    "scans": export_scans,
+}
+
+def enqueue_job(job: Dict[str, Any]) -> None:
+    """Sends a job to the Celery workers.
+
+    Raises:
+        OperationalError: If the broker cannot be reached,
+            in which case the job is marked as failed.
+    """
+    try:
+        JOB_TASKS[job["kind"]].delay(str(job["_id"]))
+    except OperationalError as e:
+        fail_job(job["_id"], f"The job could not be queued: {e}")
+        raise
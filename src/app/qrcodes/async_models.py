@@ -0,0 +1,279 @@
+from datetime import datetime
+from typing import Dict, Any, AsyncIterator, List, Optional, Tuple
+
+from bson.objectid import ObjectId
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import BulkWriteResult, InsertOneResult, DeleteResult, UpdateResult
+
+# Import the function to get collections on the async MongoDB client
+from src.db.async_database import get_async_collection
+from src.config import QR_BULK_BATCH_SIZE
+# Share the document layout with the synchronous models
+from src.app.qrcodes.models import (
+    QR_CODE_LIST_SORT,
+    SHORT_CODE_ATTEMPTS,
+    check_replay,
+    is_short_code_conflict,
+    new_short_code,
+    qr_code_document,
+    qr_code_documents,
+    qr_code_update,
+    qr_code_updates,
+    qr_code_upsert_query,
+    qr_codes_page_projection,
+    qr_codes_page_query,
+    short_code_conflicts,
+)
+from src.app.qrcodes.cache import qr_code_list_cache
+
+# Access the 'qrcodes' and 'logos' collections from the async database client
+qrcodes_collection = get_async_collection('qrcodes')
+logos_collection = get_async_collection('logos')
+
+# Create QR code
+async def create_qr_code(
+    user_id: ObjectId,
+    url: str,
+    title: str,
+    foreground_color: str,
+    background_color: str,
+    logo_path: Optional[str] = None,
+    logo_id: Optional[str] = None,
+    error_correction: str = "M",
+) -> Dict[str, Any]:
+    """Saves a QR code to the database with a unique short code.
+
+    Returns:
+        The inserted QR code document, including its _id and code.
+    """
+    qr_code_data: Dict[str, Any] = qr_code_document(
+        user_id, url, title, foreground_color, background_color, logo_path,
+        logo_id=logo_id, error_correction=error_correction,
+    )
+    for attempt in range(SHORT_CODE_ATTEMPTS):
+        try:
+            await qrcodes_collection.insert_one(qr_code_data)
+            qr_code_list_cache.invalidate(user_id)
+            return qr_code_data
+        except DuplicateKeyError as e:
+            if attempt == SHORT_CODE_ATTEMPTS - 1 or not is_short_code_conflict(e.details):
+                raise
+            # The short code is taken, draw another one
+            qr_code_data["code"] = new_short_code()
+
+# Create QR code unless it exists
+async def find_or_create_qr_code(
+    user_id: ObjectId,
+    url: str,
+    title: str,
+    foreground_color: str,
+    background_color: str,
+    logo_path: Optional[str] = None,
+    logo_id: Optional[str] = None,
+    error_correction: str = "M",
+    idempotency_key: Optional[str] = None,
+    dedupe: bool = False,
+) -> Tuple[Dict[str, Any], bool]:
+    """Saves a QR code, or returns the one an earlier request already saved (see the synchronous model).
+
+    Returns:
+        A tuple of the QR code document and whether it was created by this call.
+
+    Raises:
+        IdempotencyKeyReused: If the idempotency key was used for a QR code with other content.
+    """
+    if idempotency_key is None and not dedupe:
+        return await create_qr_code(
+            user_id, url, title, foreground_color, background_color, logo_path, logo_id, error_correction
+        ), True
+    qr_code_data: Dict[str, Any] = qr_code_document(
+        user_id, url, title, foreground_color, background_color, logo_path,
+        logo_id=logo_id, error_correction=error_correction,
+    )
+    # Choose the _id up front to tell an insert from a match
+    qr_code_data["_id"] = ObjectId()
+    query: Dict[str, Any] = qr_code_upsert_query(qr_code_data, idempotency_key, dedupe)
+    for attempt in range(SHORT_CODE_ATTEMPTS):
+        try:
+            qr_code: Dict[str, Any] = await qrcodes_collection.find_one_and_update(
+                query, {"$setOnInsert": qr_code_data}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError as e:
+            if attempt == SHORT_CODE_ATTEMPTS - 1:
+                raise
+            if is_short_code_conflict(e.details):
+                # The short code is taken, draw another one
+                qr_code_data["code"] = new_short_code()
+            # Otherwise a concurrent request inserted the same QR code first, and the next attempt finds it
+            continue
+        if qr_code["_id"] != qr_code_data["_id"]:
+            check_replay(qr_code, qr_code_data)
+            return qr_code, False
+        qr_code_list_cache.invalidate(user_id)
+        return qr_code, True
+
+# Get QR codes by User
+async def get_qr_codes_by_user(
+    user_id: ObjectId,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieves a page of the QR codes created by a specific user, newest first (see the synchronous model)."""
+    cursor = qrcodes_collection.find(
+        qr_codes_page_query(user_id, after), qr_codes_page_projection(fields)
+    ).sort(QR_CODE_LIST_SORT)
+    if limit:
+        cursor = cursor.limit(limit)
+    return await cursor.to_list(None)
+
+# Delete QR code by ID
+async def delete_qr_code_by_id(qr_code_id: ObjectId, user_id: ObjectId) -> DeleteResult:
+    """Deletes a QR code by its ID, ensuring the user making the request
+       is the owner of the QR code.
+
+    Args:
+        qr_code_id: The ID of the QR code to delete (ObjectId).
+        user_id: The ID of the user attempting to delete the QR code (ObjectId).
+
+    Returns:
+        The result of the delete operation as a `DeleteResult` object.
+    """
+    result: DeleteResult = await qrcodes_collection.delete_one(
+        {"_id": qr_code_id, "user_id": user_id}
+    )
+    qr_code_list_cache.invalidate(user_id)
+    return result
+
+# Create a batch of QR codes
+async def create_qr_codes(user_id: ObjectId, qr_codes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Saves several QR codes to the database with a single insert.
+
+    Returns:
+        The inserted QR code documents, including their _id and code, in input order.
+    """
+    documents: List[Dict[str, Any]] = qr_code_documents(user_id, qr_codes)
+    pending: List[Dict[str, Any]] = documents
+    try:
+        for attempt in range(SHORT_CODE_ATTEMPTS):
+            if not pending:
+                break
+            try:
+                await qrcodes_collection.insert_many(pending, ordered=False)
+                break
+            except BulkWriteError as e:
+                conflicts = short_code_conflicts(e)
+                if attempt == SHORT_CODE_ATTEMPTS - 1 or conflicts is None:
+                    raise
+                # Only retry the documents whose short code was taken
+                pending = [pending[index] for index in conflicts]
+                for document in pending:
+                    document["code"] = new_short_code()
+    finally:
+        # Some documents may have been inserted even if the batch failed
+        qr_code_list_cache.invalidate(user_id)
+    return documents
+
+# Delete a batch of QR codes by ID
+async def delete_qr_codes_by_ids(qr_code_ids: List[ObjectId], user_id: ObjectId) -> DeleteResult:
+    """Deletes several QR codes owned by a user.
+
+    Args:
+        qr_code_ids: The IDs of the QR codes to delete (list of ObjectId).
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+
+    Returns:
+        The result of the delete operation as a `DeleteResult` object.
+    """
+    result: DeleteResult = await qrcodes_collection.delete_many(
+        {"_id": {"$in": qr_code_ids}, "user_id": user_id}
+    )
+    qr_code_list_cache.invalidate(user_id)
+    return result
+
+# Find a QR code by ID
+async def get_qr_code_owners(qr_code_ids: List[ObjectId]) -> Dict[ObjectId, ObjectId]:
+    """Maps QR code IDs to the ID of the user who owns them; unknown IDs are omitted."""
+    qr_codes = await qrcodes_collection.find({"_id": {"$in": qr_code_ids}}, {"user_id": 1}).to_list(None)
+    return {qr_code["_id"]: qr_code["user_id"] for qr_code in qr_codes}
+
+async def find_qr_code_batches(
+    query: Dict[str, Any], batch_size: int = QR_BULK_BATCH_SIZE
+) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Yields the QR codes matching a filter in batches (see the synchronous model)."""
+    cursor = qrcodes_collection.find(query, {"code": 1}).sort("_id", ASCENDING).batch_size(batch_size)
+    batch: List[Dict[str, Any]] = []
+    async for qr_code in cursor:
+        batch.append(qr_code)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+async def update_qr_codes_by_ids(
+    qr_code_ids: List[ObjectId], user_id: ObjectId, fields: Dict[str, Any]
+) -> UpdateResult:
+    """Sets the same fields on several QR codes owned by a user."""
+    result: UpdateResult = await qrcodes_collection.update_many(
+        {"_id": {"$in": qr_code_ids}, "user_id": user_id}, qr_code_update(fields)
+    )
+    qr_code_list_cache.invalidate(user_id)
+    return result
+
+async def bulk_update_qr_codes(user_id: ObjectId, updates: List[Tuple[ObjectId, Dict[str, Any]]]) -> BulkWriteResult:
+    """Applies different updates to several QR codes owned by a user in one round trip."""
+    try:
+        return await qrcodes_collection.bulk_write(qr_code_updates(user_id, updates), ordered=False)
+    finally:
+        # Unordered writes may partly succeed even when the bulk write raises
+        qr_code_list_cache.invalidate(user_id)
+
+async def find_qr_code(qr_code_id: ObjectId, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Finds a QR code owned by a user, or returns None."""
+    return await qrcodes_collection.find_one({"_id": qr_code_id, "user_id": user_id})
+
+# Find a QR code by short code
+async def find_qr_code_by_code(code: str) -> Optional[Dict[str, Any]]:
+    """Finds the QR code behind a short code; returns its _id and url, or None."""
+    return await qrcodes_collection.find_one({"code": code}, {"url": 1})
+
+# Get the IDs of the QR codes owned by a user
+async def get_qr_code_ids_by_user(user_id: ObjectId) -> List[ObjectId]:
+    """Retrieves the IDs of all QR codes created by a specific user.
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+
+    Returns:
+        A list of QR code IDs.
+    """
+    qr_codes = qrcodes_collection.find({"user_id": user_id}, {"_id": 1})
+    return [qr_code["_id"] async for qr_code in qr_codes]
+
+# Save a logo
+async def save_logo(logo: Dict[str, Any]) -> str:
+    """Saves an uploaded logo's document (see models.logo_document).
+
+    Raises:
+        DuplicateKeyError: If the user already uploaded the same image.
+    """
+    result: InsertOneResult = await logos_collection.insert_one(logo)
+    return str(result.inserted_id)
+
+# Find a logo by ID
+async def find_logo(logo_id: ObjectId, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Finds a logo owned by a user, or returns None."""
+    return await logos_collection.find_one({"_id": logo_id, "user_id": user_id})
+
+# Find a logo by content
+async def find_logo_by_digest(user_id: ObjectId, digest: str) -> Optional[Dict[str, Any]]:
+    """Finds the logo a user uploaded with the given content digest, or returns None."""
+    return await logos_collection.find_one({"user_id": user_id, "digest": digest})
+
+# Get several logos by ID
+async def get_logos(logo_ids: List[ObjectId], user_id: ObjectId) -> Dict[ObjectId, Dict[str, Any]]:
+    """Retrieves several logos owned by a user, keyed by ID; unknown IDs are omitted."""
+    logos = logos_collection.find({"_id": {"$in": logo_ids}, "user_id": user_id})
+    return {logo["_id"]: logo async for logo in logos}
@@ -0,0 +1,401 @@
+import asyncio
+import json
+from typing import Tuple, List, Dict, Any, AsyncIterator, Optional
+from quart import Blueprint, current_app, g, request, jsonify, send_file, Response, url_for
+from bson.objectid import ObjectId, InvalidId
+
+# Import QR code related services and async data models
+from src.app.qrcodes.services import (
+    apply_qr_code_updates_async,
+    batch_specs,
+    color_error,
+    delete_qr_codes_async,
+    image_render_key,
+    list_qr_codes_page_async,
+    parse_object_id,
+    qr_code_target,
+    referenced_logo_ids,
+    render_qr_batch_async,
+    render_qr_spec_async,
+    store_logo_async,
+    stored_image_path_async,
+    update_qr_codes_async,
+)
+from src.app.qrcodes.encoder import DEFAULT_ERROR_CORRECTION, ERROR_CORRECTION_LEVELS
+from src.app.qrcodes.rendering import OUTPUT_FORMATS
+from src.app.qrcodes.images import image_store
+from src.app.qrcodes.logos import InvalidLogo
+from src.app.qrcodes.routes import (
+    bulk_query,
+    idempotency_key_param,
+    image_headers,
+    image_params,
+    list_params,
+    parse_updates,
+    update_fields,
+)
+from src.app.qrcodes.async_models import (
+    create_qr_codes,
+    delete_qr_code_by_id,
+    delete_qr_codes_by_ids,
+    find_logo,
+    find_or_create_qr_code,
+    find_qr_code,
+    get_logos,
+)
+# The bulk filter and the replay error are the same for both clients
+from src.app.qrcodes.models import IdempotencyKeyReused, qr_codes_query
+# Import the decorator authenticating async requests
+from src.app.auth.async_decorators import async_token_required
+from src.config import LOGO_MAX_BYTES, QR_BATCH_MAX_ITEMS, QR_DEDUPE_DEFAULT
+from src.utils.zipstream import stream_zip_async
+
+# Async variants of the QR code routes, served by src.asgi
+qrcodes = Blueprint('qrcodes', __name__)
+
+# Authorized CREATE QR code
+@qrcodes.route('/generate', methods=['POST'])
+@async_token_required
+async def generate_qr() -> Tuple[Response, int]:
+    """Generates and returns a QR code image.
+
+    Requires an Authorization header with a valid JWT token. Rendering runs
+    on the render process pool while the event loop keeps serving requests.
+    Idempotency-Key and "dedupe" replays work as in the synchronous route.
+
+    Returns:
+        A tuple containing the QR code document and the HTTP status code.
+    """
+    # The authenticated user's ID, set by async_token_required
+    user_id: ObjectId = g.user_id
+
+    # Get request data
+    data: Dict[str, Any] = await request.get_json()
+    url: str = data.get("url")
+    title: str = data.get("title", "")
+    foreground_color: str = data.get("foreground_color", "#000000")
+    background_color: str = data.get("background_color", "#ffffff")
+    image_format: str = str(data.get("format", "png")).lower()
+    error_correction: str = str(data.get("error_correction", DEFAULT_ERROR_CORRECTION)).upper()
+    logo_id: Optional[str] = data.get("logo_id")
+    logo = (await request.files).get("logo")
+    dedupe: Any = data.get("dedupe", QR_DEDUPE_DEFAULT)
+    # Only a JSON boolean, as the string "false" would otherwise turn dedupe on
+    if not isinstance(dedupe, bool):
+        return jsonify({"error": "dedupe must be true or false"}), 400
+    idempotency_key, error = idempotency_key_param(request.headers)
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    # Check if url is provided
+    if not url:
+        return jsonify({"error": "No URL provided"}), 400
+    # Check that the output format is supported
+    if image_format not in OUTPUT_FORMATS:
+        return jsonify({"error": f"Unsupported format, expected one of {', '.join(OUTPUT_FORMATS)}"}), 400
+    # Check that the error correction level is supported
+    if error_correction not in ERROR_CORRECTION_LEVELS:
+        levels: str = ', '.join(ERROR_CORRECTION_LEVELS)
+        return jsonify({"error": f"Unsupported error_correction, expected one of {levels}"}), 400
+    if (logo or logo_id) and image_format in ("eps", "pdf"):
+        return jsonify({"error": "Logos are not supported for eps or pdf output"}), 400
+    # Reject colors the renderer could not draw, before saving anything
+    error = color_error("foreground_color", foreground_color, image_format) or color_error(
+        "background_color", background_color, image_format
+    )
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    # Resolve the logo from the logo store
+    logo_doc: Optional[Dict[str, Any]] = None
+    if logo_id:
+        try:
+            logo_doc = await find_logo(ObjectId(logo_id), user_id)
+        except (InvalidId, TypeError):
+            logo_doc = None
+        if logo_doc is None:
+            return jsonify({"error": "Logo not found"}), 404
+    elif logo:
+        logo_bytes: bytes = logo.read(LOGO_MAX_BYTES + 1)
+        if len(logo_bytes) > LOGO_MAX_BYTES:
+            return jsonify({"error": f"Logos may be at most {LOGO_MAX_BYTES} bytes"}), 413
+        try:
+            logo_doc, _ = await store_logo_async(user_id, logo_bytes)
+        except InvalidLogo as e:
+            return jsonify({"error": str(e)}), 400
+
+    # Save the QR code metadata and associate it to the user ID, unless an earlier request did
+    try:
+        qr_code, created = await find_or_create_qr_code(
+            user_id,
+            url,
+            title,
+            foreground_color,
+            background_color,
+            logo_doc["path"] if logo_doc else None,
+            str(logo_doc["_id"]) if logo_doc else None,
+            error_correction,
+            idempotency_key,
+            dedupe,
+        )
+    except IdempotencyKeyReused as e:
+        return jsonify({"error": str(e)}), 422
+    qr_code_id: str = str(qr_code["_id"])
+
+    # Serve the image of the existing QR code instead of rendering it again
+    if not created:
+        try:
+            path: str = await stored_image_path_async(
+                qr_code, image_render_key(qr_code, image_format), image_format
+            )
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        response: Response = await send_file(
+            path, mimetype=OUTPUT_FORMATS[image_format], attachment_filename=f"{qr_code_id}.{image_format}"
+        )
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    # The destination URL, or the short link when redirects are enabled
+    target: str = qr_code_target(qr_code)
+
+    # Render the QR code off the event loop
+    document, error = await render_qr_spec_async({
+        "url": target,
+        "format": image_format,
+        "foreground_color": foreground_color,
+        "background_color": background_color,
+        "logo_id": str(logo_doc["_id"]) if logo_doc else None,
+        "error_correction": error_correction,
+    })
+    if error is not None:
+        await delete_qr_code_by_id(ObjectId(qr_code_id), user_id)
+        return jsonify({"error": error}), 400
+    # Keep the image so GET /qrcodes/<id>/image serves it without rendering again
+    await asyncio.get_running_loop().run_in_executor(
+        None, image_store.put, qr_code_id, image_render_key(qr_code, image_format), image_format, document
+    )
+
+    return Response(
+        document,
+        mimetype=OUTPUT_FORMATS[image_format],
+        headers={"Content-Disposition": f"attachment; filename={qr_code_id}.{image_format}"},
+    ), 200
+
+# Authorized batch CREATE QR codes
+@qrcodes.route('/generate/batch', methods=['POST'])
+@async_token_required
+async def generate_qr_batch() -> Tuple[Response, int]:
+    """Generates many QR codes at once and streams them back as a ZIP archive.
+
+    Accepts the same body as the synchronous route; see its documentation.
+
+    Returns:
+        A tuple containing the streamed ZIP response and the HTTP status code.
+    """
+    # The authenticated user's ID, set by async_token_required
+    user_id: ObjectId = g.user_id
+
+    # Get request data
+    data: Dict[str, Any] = await request.get_json(silent=True) or {}
+    items: Any = data.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "A non-empty list of items is required"}), 400
+    if len(items) > QR_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"A batch may contain at most {QR_BATCH_MAX_ITEMS} items"}), 400
+
+    # Look up every referenced logo in one query
+    logos: Dict[ObjectId, Dict[str, Any]] = await get_logos(referenced_logo_ids(items), user_id)
+
+    # Split the items into valid specs and per-item validation errors
+    specs, indexes, errors = batch_specs(items, logos)
+
+    # Save the metadata of every valid item in one round trip
+    saved: List[Dict[str, Any]] = await create_qr_codes(user_id, specs)
+    qr_code_ids: List[str] = [str(qr_code["_id"]) for qr_code in saved]
+    # Encode each item's short link when redirects are enabled
+    specs = [{**spec, "url": qr_code_target(qr_code)} for spec, qr_code in zip(specs, saved)]
+
+    async def archive_files() -> AsyncIterator[Tuple[str, bytes]]:
+        created: List[Dict[str, Any]] = []
+        failed_ids: List[ObjectId] = []
+        pending = iter(zip(indexes, qr_code_ids))
+        # Render results arrive in input order as the pool completes them
+        async for png, error in render_qr_batch_async(specs):
+            index, qr_code_id = next(pending)
+            if error is not None:
+                errors.append({"index": index, "error": error})
+                failed_ids.append(ObjectId(qr_code_id))
+                continue
+            created.append({"index": index, "qr_code_id": qr_code_id, "file": f"{qr_code_id}.png"})
+            yield f"{qr_code_id}.png", png
+        # Remove the metadata of items that could not be rendered
+        if failed_ids:
+            await delete_qr_codes_by_ids(failed_ids, user_id)
+        manifest = {"created": created, "errors": sorted(errors, key=lambda e: e["index"])}
+        yield "manifest.json", json.dumps(manifest).encode('utf-8')
+
+    # Stream the archive while the remaining items are still rendering
+    return Response(
+        stream_zip_async(archive_files()),
+        mimetype='application/zip',
+        headers={"Content-Disposition": "attachment; filename=qrcodes.zip"},
+    ), 200
+
+# Authorized GET QR code image
+@qrcodes.route('/qrcodes/<qr_code_id>/image', methods=['GET'])
+@async_token_required
+async def get_qr_code_image(qr_code_id: str) -> Tuple[Response, int]:
+    """Serves the stored image of a saved QR code (see the synchronous route).
+
+    Args:
+        qr_code_id: The ID of the QR code (string).
+
+    Returns:
+        A tuple containing the image file response and the HTTP status code.
+    """
+    object_id: Optional[ObjectId] = parse_object_id(qr_code_id)
+    qr_code: Optional[Dict[str, Any]] = await find_qr_code(object_id, g.user_id) if object_id else None
+    if qr_code is None:
+        return jsonify({"error": "QR code not found or unauthorized"}), 404
+
+    params, error = image_params(request.args, qr_code)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    image_format, box_size, border = params
+    key: str = image_render_key(qr_code, image_format, box_size, border)
+
+    # Answer revalidations before touching the disk
+    if request.if_none_match.contains(key):
+        return Response("", status=304, headers=image_headers(key)), 304
+
+    try:
+        path: str = await stored_image_path_async(qr_code, key, image_format, box_size, border)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Serve the file from its path, using the render key as the ETag
+    response: Response = await send_file(
+        path,
+        mimetype=OUTPUT_FORMATS[image_format],
+        attachment_filename=f"{qr_code_id}.{image_format}",
+        add_etags=False,
+        conditional=True,
+    )
+    response.headers.update(image_headers(key))
+    return response
+
+# Authorized logo upload
+@qrcodes.route('/logos', methods=['POST'])
+@async_token_required
+async def upload_logo() -> Tuple[Response, int]:
+    """Uploads a logo to the logo store (see the synchronous route).
+
+    Returns:
+        A tuple containing the JSON response with the logo ID and the HTTP status code.
+    """
+    logo = (await request.files).get("logo")
+    if not logo:
+        return jsonify({"error": "No logo provided"}), 400
+    logo_bytes: bytes = logo.read(LOGO_MAX_BYTES + 1)
+    if len(logo_bytes) > LOGO_MAX_BYTES:
+        return jsonify({"error": f"Logos may be at most {LOGO_MAX_BYTES} bytes"}), 413
+
+    try:
+        logo_doc, created = await store_logo_async(g.user_id, logo_bytes)
+    except InvalidLogo as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "logo_id": str(logo_doc["_id"]),
+        "width": logo_doc["width"],
+        "height": logo_doc["height"],
+    }), 201 if created else 200
+
+# Authorized GET QR code
+@qrcodes.route('/my_qrcodes', methods=['GET'])
+@async_token_required
+async def list_qr_codes() -> Tuple[Response, int]:
+    """Retrieves a page of the QR codes associated with the authenticated user (see the WSGI route).
+
+    Returns:
+        A tuple containing the JSON response with the list of QR codes and
+        the HTTP status code.
+    """
+    params, error = list_params(request.args)
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    body, next_cursor = await list_qr_codes_page_async(g.user_id, dumpb=current_app.json.dumpb, **params)
+    response = Response(body, mimetype="application/json")
+    if next_cursor is not None:
+        # Point at the next page, keeping the other query parameters
+        next_url = url_for(
+            request.endpoint, **{**request.args.to_dict(), "after": next_cursor, "limit": params["limit"]}
+        )
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
+
+# Authorized DELETE QR code
+@qrcodes.route('/qrcodes/<qr_code_id>', methods=['DELETE'])
+@async_token_required
+async def delete_qr_code(qr_code_id: str) -> Tuple[Response, int]:
+    """Deletes a specific QR code owned by the authenticated user.
+
+    Args:
+        qr_code_id: The ID of the QR code to delete (string).
+
+    Returns:
+        A tuple containing the JSON response and the HTTP status code.
+    """
+    # Delete the QR code with its scans and images, checking user ownership
+    object_id: Optional[ObjectId] = parse_object_id(qr_code_id)
+    result: Dict[str, int] = (
+        await delete_qr_codes_async(g.user_id, qr_codes_query(g.user_id, [object_id])) if object_id else {}
+    )
+    # Return 404 if QR code was not found or user is not authorized
+    if not result.get("deleted"):
+        return jsonify({"error": "QR code not found or unauthorized"}), 404
+
+    return jsonify({"message": "QR code deleted successfully"}), 200
+
+# Authorized bulk DELETE QR codes
+@qrcodes.route('/bulk_delete', methods=['POST'])
+@async_token_required
+async def bulk_delete_qr_codes() -> Tuple[Response, int]:
+    """Deletes many QR codes at once, with their scans and stored images (see the synchronous route).
+
+    Returns:
+        A tuple containing the JSON response with the deleted counts and the HTTP status code.
+    """
+    user_id: ObjectId = g.user_id
+    data: Dict[str, Any] = await request.get_json(silent=True) or {}
+    query, error = bulk_query(data, user_id)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    return jsonify(await delete_qr_codes_async(user_id, query)), 200
+
+# Authorized bulk UPDATE QR codes
+@qrcodes.route('/bulk_update', methods=['POST'])
+@async_token_required
+async def bulk_update_qr_codes() -> Tuple[Response, int]:
+    """Updates the title or colors of many QR codes at once (see the synchronous route).
+
+    Returns:
+        A tuple containing the JSON response with the matched and modified
+        counts and the HTTP status code.
+    """
+    user_id: ObjectId = g.user_id
+    data: Dict[str, Any] = await request.get_json(silent=True) or {}
+    if "updates" in data:
+        updates, error = parse_updates(data["updates"])
+        if error is not None:
+            return jsonify({"error": error}), 400
+        return jsonify(await apply_qr_code_updates_async(user_id, updates)), 200
+
+    fields, error = update_fields(data.get("set"))
+    if error is None:
+        query, error = bulk_query(data, user_id)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    return jsonify(await update_qr_codes_async(user_id, query, fields)), 200
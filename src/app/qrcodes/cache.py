@@ -0,0 +1,160 @@
+import hashlib
+from typing import Dict, Hashable, Optional, Tuple
+
+from bson.objectid import ObjectId
+
+from src.config import (
+    QR_LIST_CACHE_MAX_PAGES,
+    QR_LIST_CACHE_MAX_USERS,
+    QR_LIST_CACHE_TTL,
+    RENDER_CACHE_DIR,
+    RENDER_CACHE_DIR_MAX_BYTES,
+    RENDER_CACHE_MAX_BYTES,
+    RENDER_CACHE_MAX_ENTRIES,
+)
+from src.utils.cache import DiskCache, LRUCache, TTLCache
+
+
+class RenderCache:
+    """Two-tier cache of rendered QR code images.
+
+    The first tier is an in-process LRU; the optional second tier is a
+    directory (possibly shared between workers) bounded by total size.
+    Entries are keyed on a digest of every input that affects the output.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = RENDER_CACHE_MAX_ENTRIES,
+        max_bytes: int = RENDER_CACHE_MAX_BYTES,
+        directory: Optional[str] = RENDER_CACHE_DIR,
+        directory_max_bytes: int = RENDER_CACHE_DIR_MAX_BYTES,
+    ) -> None:
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+        self.disk: Optional[DiskCache] = (
+            DiskCache(directory, max_bytes=directory_max_bytes) if directory else None
+        )
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the rendered image bytes for a key, or None on a miss."""
+        data = self.memory.get(key)
+        if data is None and self.disk is not None:
+            data = self.disk.get(key)
+            if data is not None:
+                # Promote disk hits into the memory tier
+                self.memory.set(key, data)
+        return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """Stores rendered image bytes in every tier."""
+        self.memory.set(key, data)
+        if self.disk is not None:
+            self.disk.set(key, data)
+
+    def clear(self) -> None:
+        """Clears the in-process tier."""
+        self.memory.clear()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the counters of each tier."""
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+def render_cache_key(
+    url: str,
+    foreground_color: str,
+    background_color: str,
+    box_size: int,
+    border: int,
+    logo_digest: Optional[str] = None,
+    image_format: str = "png",
+    error_correction: str = "M",
+) -> str:
+    """Builds the content-addressed cache key for a render.
+
+    Args:
+        url: The URL encoded in the QR code (string).
+        foreground_color: The foreground color (string).
+        background_color: The background color (string).
+        box_size: The size in pixels of each module (int).
+        border: The width of the quiet zone in modules (int).
+        logo_digest: The SHA-256 hex digest of the logo bytes, if any (string, optional).
+        image_format: The encoded image format (string, default is "png").
+        error_correction: The error correction level (string, default is "M").
+
+    Returns:
+        A hex SHA-256 digest identifying the rendered output.
+    """
+    h = hashlib.sha256()
+    parts = (
+        url, foreground_color, background_color, box_size, border, logo_digest or "", image_format, error_correction
+    )
+    for part in parts:
+        # Length-prefix each field so different splits can never collide
+        value = str(part).encode('utf-8')
+        h.update(len(value).to_bytes(4, 'big'))
+        h.update(value)
+    return h.hexdigest()
+
+
+# Process-wide render cache used by generate_qr_code
+render_cache = RenderCache()
+
+
+# A page of a user's QR code list: its JSON body and the cursor of the next page, if any
+ListPage = Tuple[bytes, Optional[str]]
+
+
+class QRCodeListCache:
+    """Per-user cache of the serialized pages of the QR code list.
+
+    The pages of a user live in one bucket, keyed on the cursor, size and
+    fields of each page, so a write drops every page of its owner at once.
+    A reader takes the bucket before querying MongoDB and stores its page in
+    that same bucket: if a write invalidates the user in the meantime, the
+    page lands in a discarded bucket and is never served. Invalidation only
+    reaches the current process; buckets expire after ``ttl`` seconds, which
+    bounds how long other workers serve a list from before a write.
+    """
+
+    def __init__(
+        self,
+        max_users: int = QR_LIST_CACHE_MAX_USERS,
+        max_pages: int = QR_LIST_CACHE_MAX_PAGES,
+        ttl: float = QR_LIST_CACHE_TTL,
+    ) -> None:
+        self.users = TTLCache(max_entries=max_users, ttl=ttl)
+        self.max_pages = max_pages
+
+    def bucket(self, user_id: ObjectId) -> Dict[Hashable, ListPage]:
+        """Returns the bucket holding the cached pages of a user, creating it if needed."""
+        bucket: Optional[Dict[Hashable, ListPage]] = self.users.get(user_id)
+        if bucket is None:
+            bucket = {}
+            self.users.set(user_id, bucket)
+        return bucket
+
+    def store(self, bucket: Dict[Hashable, ListPage], key: Hashable, page: ListPage) -> None:
+        """Caches a page in a bucket, unless the bucket already holds ``max_pages`` pages."""
+        # Deep pages of a long walk through the list are not worth the memory
+        if len(bucket) < self.max_pages:
+            bucket[key] = page
+
+    def invalidate(self, user_id: ObjectId) -> None:
+        """Drops every cached page of a user, e.g. after one of their QR codes changed."""
+        self.users.delete(user_id)
+
+    def clear(self) -> None:
+        """Drops every cached page."""
+        self.users.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Returns the counters of the user buckets."""
+        return self.users.stats()
+
+
+# Process-wide cache of the lists served by /my_qrcodes
+qr_code_list_cache = QRCodeListCache()
@@ -0,0 +1,232 @@
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from qrcode import constants, exceptions, util
+from qrcode.main import QRCode
+
+# Error correction levels accepted by the API, with the share of the code they can restore
+ERROR_CORRECTION_LEVELS: Dict[str, int] = {
+    "L": constants.ERROR_CORRECT_L,  # ~7%
+    "M": constants.ERROR_CORRECT_M,  # ~15%
+    "Q": constants.ERROR_CORRECT_Q,  # ~25%
+    "H": constants.ERROR_CORRECT_H,  # ~30%
+}
+# The level used when none is requested, which is also qrcode's default
+DEFAULT_ERROR_CORRECTION = "M"
+
+# First and last version of each range sharing the same character count indicator sizes
+_VERSION_RANGES: Tuple[Tuple[int, int], ...] = ((1, 9), (10, 26), (27, 40))
+
+# The 1:1:3:1:1 finder-like patterns penalized by mask evaluation, with 4 light modules on one side
+_FINDER_PATTERNS = np.array([
+    [1, 0, 1, 1, 1, 0, 1, 0, 0, 0, 0],
+    [0, 0, 0, 0, 1, 0, 1, 1, 1, 0, 1],
+], dtype=bool)
+
+
+def segment_bits(data: util.QRData) -> int:
+    """Returns the number of data bits of an encoded segment, without its header."""
+    length = len(data)
+    if data.mode == util.MODE_NUMBER:
+        # 10 bits per group of 3 digits, then 4 or 7 bits for the remaining ones
+        return 10 * (length // 3) + (0, 4, 7)[length % 3]
+    if data.mode == util.MODE_ALPHA_NUM:
+        return 11 * (length // 2) + 6 * (length % 2)
+    return 8 * length
+
+
+def minimal_version(data_list: List[util.QRData], error_correction: int) -> int:
+    """Returns the smallest QR code version holding some segments.
+
+    The number of bits needed is computed from the segment lengths and modes
+    for each range of versions sharing the same header sizes, then looked up
+    in qrcode's capacity table, instead of encoding the data to measure it.
+
+    Args:
+        data_list: The data segments to encode (list of QRData).
+        error_correction: A qrcode ERROR_CORRECT_* constant (int).
+
+    Returns:
+        The version, between 1 and 40.
+
+    Raises:
+        DataOverflowError: If the data does not fit in a version 40 code.
+    """
+    limits = util.BIT_LIMIT_TABLE[error_correction]
+    for first, last in _VERSION_RANGES:
+        mode_sizes = util.mode_sizes_for_version(first)
+        needed = sum(4 + mode_sizes[data.mode] + segment_bits(data) for data in data_list)
+        for version in range(first, last + 1):
+            if limits[version] >= needed:
+                return version
+    raise exceptions.DataOverflowError()
+
+
+class VersionLayout:
+    """The fixed parts of a QR code version, computed once per version.
+
+    Attributes:
+        size: The number of modules on each side (int).
+        template: The function patterns, with the format and version
+            information areas left light (bool array).
+        rows, cols: The coordinates of the data modules, in placement order
+            (int arrays).
+        masks: The value of each mask pattern at each data module (bool array
+            of shape (8, number of data modules)).
+    """
+
+    def __init__(self, version: int) -> None:
+        # Let qrcode draw the function patterns, so both encoders agree on them
+        qr = QRCode(version=version)
+        qr.modules_count = self.size = version * 4 + 17
+        qr.modules = [[None] * self.size for _ in range(self.size)]
+        qr.setup_position_probe_pattern(0, 0)
+        qr.setup_position_probe_pattern(self.size - 7, 0)
+        qr.setup_position_probe_pattern(0, self.size - 7)
+        qr.setup_position_adjust_pattern()
+        qr.setup_timing_pattern()
+        # Reserve the information areas, filled with light modules as qrcode does when scoring masks
+        qr.setup_type_info(True, 0)
+        if version >= 7:
+            qr.setup_type_number(True)
+
+        self.version = version
+        self.template = np.array([[bool(module) for module in row] for row in qr.modules])
+        self.rows, self.cols = self._data_positions(qr.modules)
+        # qrcode's mask functions work on scalars, and only run once per version here
+        positions = list(zip(self.rows.tolist(), self.cols.tolist()))
+        self.masks = np.array(
+            [[util.mask_func(pattern)(row, col) for row, col in positions] for pattern in range(8)], dtype=bool
+        )
+
+    def _data_positions(self, modules: List[List[object]]) -> Tuple[np.ndarray, np.ndarray]:
+        # Walk the two-column zigzag from the bottom right corner, skipping the vertical timing pattern
+        rows: List[int] = []
+        cols: List[int] = []
+        upward = True
+        for right in range(self.size - 1, 0, -2):
+            if right <= 6:
+                right -= 1
+            for row in (range(self.size - 1, -1, -1) if upward else range(self.size)):
+                for col in (right, right - 1):
+                    if modules[row][col] is None:
+                        rows.append(row)
+                        cols.append(col)
+            upward = not upward
+        return np.array(rows), np.array(cols)
+
+    def information(self, error_correction: int, mask_pattern: int) -> List[Tuple[int, int, bool]]:
+        """Returns the (row, col, dark) format and version information modules of a code."""
+        bits = util.BCH_type_info((error_correction << 3) | mask_pattern)
+        n = self.size
+        modules: List[Tuple[int, int, bool]] = []
+        for i in range(15):
+            dark = bool((bits >> i) & 1)
+            # Next to the top left finder, then split between the other two
+            modules.append((i if i < 6 else i + 1 if i < 8 else n - 15 + i, 8, dark))
+            modules.append((8, n - i - 1 if i < 8 else 15 - i if i < 9 else 14 - i, dark))
+        # The module always dark above the bottom left finder
+        modules.append((n - 8, 8, True))
+        if self.version >= 7:
+            bits = util.BCH_type_number(self.version)
+            for i in range(18):
+                dark = bool((bits >> i) & 1)
+                modules.append((i // 3, i % 3 + n - 11, dark))
+                modules.append((i % 3 + n - 11, i // 3, dark))
+        return modules
+
+
+@lru_cache(maxsize=None)
+def version_layout(version: int) -> VersionLayout:
+    """Returns the cached layout of a QR code version."""
+    return VersionLayout(version)
+
+
+def run_penalties(candidates: np.ndarray) -> np.ndarray:
+    """Scores runs of 5 or more same-colored modules along the rows of each candidate."""
+    count, n, _ = candidates.shape
+    # Separate rows with a value no module has, so runs never span two rows
+    padded = np.full((count, n, n + 2), 2, dtype=np.int8)
+    padded[:, :, 1:-1] = candidates
+    flat = padded.ravel()
+    starts = np.flatnonzero(flat[1:] != flat[:-1]) + 1
+    lengths = np.diff(starts)
+    points = np.where(lengths >= 5, lengths - 2, 0)
+    return np.bincount(starts[:-1] // (n * (n + 2)), weights=points, minlength=count)
+
+
+def mask_penalties(candidates: np.ndarray) -> np.ndarray:
+    """Computes the mask penalty score of several candidate matrices at once.
+
+    The four rules are the ones of qrcode's ``util.lost_point``, evaluated
+    over whole arrays instead of module by module, so the same mask wins.
+
+    Args:
+        candidates: The masked matrices, without border (bool array of shape (count, n, n)).
+
+    Returns:
+        The penalty of each candidate (int array).
+    """
+    count, n, _ = candidates.shape
+    columns = candidates.transpose(0, 2, 1)
+    # Rule 1: runs of 5 or more modules in a row or column
+    penalty = run_penalties(candidates) + run_penalties(np.ascontiguousarray(columns))
+    # Rule 2: 2x2 blocks of a single color
+    top_left = candidates[:, :-1, :-1]
+    blocks = (
+        (top_left == candidates[:, :-1, 1:])
+        & (top_left == candidates[:, 1:, :-1])
+        & (top_left == candidates[:, 1:, 1:])
+    )
+    penalty += 3 * blocks.sum(axis=(1, 2))
+    # Rule 3: finder-like patterns in a row or column
+    for lines in (candidates, columns):
+        windows = sliding_window_view(lines, 11, axis=2)[:, :, :, None, :]
+        matches = (windows == _FINDER_PATTERNS).all(axis=4).any(axis=3)
+        penalty += 40 * matches.sum(axis=(1, 2))
+    # Rule 4: deviation of the share of dark modules from 50%, in steps of 5%
+    dark = candidates.sum(axis=(1, 2))
+    penalty += [int(abs(float(d) / (n * n) * 100 - 50) / 5) * 10 for d in dark]
+    return penalty.astype(int)
+
+
+def encode_matrix(url: str, error_correction: str = DEFAULT_ERROR_CORRECTION, border: int = 5) -> np.ndarray:
+    """Encodes text into a QR code module matrix of the smallest possible version.
+
+    Produces the same modules as qrcode's ``make(fit=True)`` followed by
+    ``get_matrix()``, but computes the version from the capacity tables,
+    places the data with precomputed coordinates and scores the eight masks
+    together with NumPy.
+
+    Args:
+        url: The text to encode (string).
+        error_correction: One of the keys of ERROR_CORRECTION_LEVELS (string, default is "M").
+        border: The width of the quiet zone in modules (int, default is 5).
+
+    Returns:
+        The module matrix, border included, with True for dark modules.
+
+    Raises:
+        DataOverflowError: If the text does not fit in a version 40 code.
+    """
+    level: int = ERROR_CORRECTION_LEVELS[error_correction]
+    # Split the text into numeric, alphanumeric and byte segments like QRCode.add_data
+    data_list: List[util.QRData] = list(util.optimal_data_chunks(url, minimum=20))
+    layout = version_layout(minimal_version(data_list, level))
+
+    # Codewords with error correction, as bits in placement order; remainder bits stay light
+    codewords = np.array(util.create_data(layout.version, level, data_list), dtype=np.uint8)
+    bits = np.zeros(len(layout.rows), dtype=bool)
+    bits[:len(codewords) * 8] = np.unpackbits(codewords)[:len(layout.rows)]
+
+    # Place the data under each of the eight masks and keep the lowest penalty
+    candidates = np.repeat(layout.template[None], 8, axis=0)
+    candidates[:, layout.rows, layout.cols] = bits ^ layout.masks
+    mask_pattern = int(np.argmin(mask_penalties(candidates)))
+
+    modules = candidates[mask_pattern]
+    for row, col, dark in layout.information(level, mask_pattern):
+        modules[row, col] = dark
+    return np.pad(modules, border, constant_values=False)
@@ -0,0 +1,52 @@
+import os
+import shutil
+import threading
+from typing import Optional
+
+from src.config import QR_IMAGE_DIR
+
+
+class ImageStore:
+    """Stores rendered QR code images on disk, one directory per QR code.
+
+    Each file is named after the render key of the image, a digest of every
+    input affecting its content (see render_cache_key), so a request with
+    other parameters never gets a stale file and the key can double as a
+    strong ETag. QR code directories are sharded by the last two characters
+    of their ID, which vary the most between consecutive ObjectIds.
+    """
+
+    def __init__(self, directory: str = QR_IMAGE_DIR) -> None:
+        # Absolute, so Flask's send_file does not resolve stored paths against the app root
+        self.directory = os.path.abspath(directory)
+
+    def _directory(self, qr_code_id: str) -> str:
+        return os.path.join(self.directory, qr_code_id[-2:], qr_code_id)
+
+    def path(self, qr_code_id: str, key: str, image_format: str) -> str:
+        """Returns the path at which an image is stored."""
+        return os.path.join(self._directory(qr_code_id), f"{key}.{image_format}")
+
+    def get(self, qr_code_id: str, key: str, image_format: str) -> Optional[str]:
+        """Returns the path of a stored image, or None if it was not rendered yet."""
+        path = self.path(qr_code_id, key, image_format)
+        return path if os.path.exists(path) else None
+
+    def put(self, qr_code_id: str, key: str, image_format: str, data: bytes) -> str:
+        """Stores a rendered image and returns its path."""
+        path = self.path(qr_code_id, key, image_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file then rename, so readers never see partial data
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        return path
+
+    def delete(self, qr_code_id: str) -> None:
+        """Removes every stored image of a QR code."""
+        shutil.rmtree(self._directory(qr_code_id), ignore_errors=True)
+
+
+# Process-wide store of rendered images
+image_store = ImageStore()
@@ -0,0 +1,165 @@
+import io
+import os
+import shutil
+import threading
+from typing import Iterable, List, Optional, Tuple
+
+from PIL import Image, UnidentifiedImageError
+
+from src.config import (
+    LOGO_CACHE_MAX_BYTES,
+    LOGO_CACHE_MAX_ENTRIES,
+    LOGO_MAX_DIMENSION,
+    LOGO_PRESET_VERSIONS,
+    LOGO_STORAGE_DIR,
+)
+from src.utils.cache import LRUCache
+
+
+class InvalidLogo(ValueError):
+    """Raised when an uploaded logo is not a decodable image."""
+
+
+def logo_side(image_side: int) -> int:
+    """Returns the side in pixels of the logo pasted on a QR code image."""
+    # The logo covers a fifth of the QR code, which error correction tolerates
+    return image_side // 5
+
+
+def preset_sides(versions: Iterable[int], box_size: int = 10, border: int = 5) -> List[int]:
+    """Returns the logo sides used by QR codes of some versions at a given size.
+
+    Args:
+        versions: The QR code versions (iterable of int).
+        box_size: The size in pixels of each module (int, default is 10).
+        border: The width of the quiet zone in modules (int, default is 5).
+
+    Returns:
+        The distinct logo sides in pixels, smallest first.
+    """
+    # A version v code is 17 + 4v modules wide, plus the quiet zone on both sides
+    return sorted({logo_side((17 + 4 * version + 2 * border) * box_size) for version in versions})
+
+
+class LogoStore:
+    """Stores uploaded logos pre-decoded and pre-resized.
+
+    A logo is normalized once on upload: decoded, converted to RGBA and
+    downscaled to ``max_dimension``, then written as ``<logo_id>/logo.png``.
+    Square variants are resized with a Lanczos filter for each logo side a
+    render needs and written next to it as raw RGBA buffers
+    (``<logo_id>/<side>.rgba``), so later renders never decode or resample
+    the logo again. Variants are also kept in an in-process LRU, from which
+    the render path only wraps the buffer into an image to paste.
+    """
+
+    def __init__(
+        self,
+        directory: str = LOGO_STORAGE_DIR,
+        max_dimension: int = LOGO_MAX_DIMENSION,
+        preset_versions: int = LOGO_PRESET_VERSIONS,
+        max_entries: int = LOGO_CACHE_MAX_ENTRIES,
+        max_bytes: int = LOGO_CACHE_MAX_BYTES,
+    ) -> None:
+        self.directory = directory
+        self.max_dimension = max_dimension
+        self.preset_versions = preset_versions
+        self.memory = LRUCache(max_entries=max_entries, max_bytes=max_bytes)
+
+    def path(self, logo_id: str) -> str:
+        """Returns the path of the normalized PNG of a logo."""
+        return os.path.join(self.directory, logo_id, "logo.png")
+
+    def _variant_path(self, logo_id: str, side: int) -> str:
+        return os.path.join(self.directory, logo_id, f"{side}.rgba")
+
+    def save(self, logo_id: str, data: bytes) -> Tuple[str, int, int]:
+        """Normalizes and stores an uploaded logo, with its preset variants.
+
+        Args:
+            logo_id: The identifier of the logo (string).
+            data: The uploaded image bytes (bytes).
+
+        Returns:
+            A tuple of (path of the stored PNG, width, height).
+
+        Raises:
+            InvalidLogo: If the data is not a decodable image.
+        """
+        try:
+            logo = Image.open(io.BytesIO(data))
+            logo.load()
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            raise InvalidLogo("The logo is not a supported image")
+        logo = logo.convert('RGBA')
+        # Logos are only ever drawn small, so do not keep more pixels than needed
+        logo.thumbnail((self.max_dimension, self.max_dimension), Image.LANCZOS)
+
+        png_io = io.BytesIO()
+        logo.save(png_io, 'PNG')
+        path = self.path(logo_id)
+        self._write(path, png_io.getvalue())
+
+        # Resize the variants used by the most common renders right away
+        for side in preset_sides(range(1, self.preset_versions + 1)):
+            self._resize(logo_id, logo, side)
+        return path, logo.width, logo.height
+
+    def png(self, logo_id: str) -> bytes:
+        """Returns the normalized PNG bytes of a logo, e.g. to embed in an SVG.
+
+        Raises:
+            FileNotFoundError: If the logo does not exist.
+        """
+        key = (logo_id, "png")
+        data: Optional[bytes] = self.memory.get(key)
+        if data is None:
+            with open(self.path(logo_id), 'rb') as f:
+                data = f.read()
+            self.memory.set(key, data)
+        return data
+
+    def variant(self, logo_id: str, side: int) -> Image.Image:
+        """Returns a logo resized to a square of ``side`` pixels, as an RGBA image.
+
+        The returned image shares the cached buffer and must not be modified.
+
+        Raises:
+            FileNotFoundError: If the logo does not exist.
+        """
+        key = (logo_id, side)
+        buffer: Optional[bytes] = self.memory.get(key)
+        if buffer is None:
+            try:
+                with open(self._variant_path(logo_id, side), 'rb') as f:
+                    buffer = f.read()
+            except FileNotFoundError:
+                logo = Image.open(self.path(logo_id))
+                buffer = self._resize(logo_id, logo, side)
+            self.memory.set(key, buffer)
+        # Wrap the raw pixels without copying or decoding them
+        return Image.frombuffer('RGBA', (side, side), buffer, 'raw', 'RGBA', 0, 1)
+
+    def _resize(self, logo_id: str, logo: Image.Image, side: int) -> bytes:
+        # Resample once and store the raw pixels for every later render
+        buffer = logo.convert('RGBA').resize((side, side), Image.LANCZOS).tobytes()
+        self._write(self._variant_path(logo_id, side), buffer)
+        return buffer
+
+    def _write(self, path: str, data: bytes) -> None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file then rename, so readers never see partial data
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def delete(self, logo_id: str) -> None:
+        """Removes a logo and all of its variants."""
+        shutil.rmtree(os.path.join(self.directory, logo_id), ignore_errors=True)
+        # Variants are cached per side and deletes are rare, so drop the whole tier
+        self.memory.clear()
+
+
+# Process-wide logo store used by generate_qr_code
+logo_store = LogoStore()
@@ -1,27 +1,83 @@
+import hashlib
+import secrets
+import string
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from bson.objectid import ObjectId
-from pymongo.results import InsertOneResult, DeleteResult
+from pymongo import ASCENDING, DESCENDING, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+from pymongo.results import BulkWriteResult, InsertOneResult, DeleteResult, UpdateResult
 
-# Import database connection function
-from src.db.database import get_db
+# Import database collection function
+from src.db.database import get_collection
+from src.app.qrcodes.cache import qr_code_list_cache
+from src.utils.metrics import timed
+from src.config import QR_BULK_BATCH_SIZE, SHORT_CODE_LENGTH
 
-# Get the database instance
-db = get_db()
-# Access the 'qrcodes' collection
-qrcodes_collection = db['qrcodes']
+# Access the 'qrcodes' collection from the shared database client
+qrcodes_collection = get_collection('qrcodes')
+# Logos uploaded to the logo store, one document per user and image content
+logos_collection = get_collection('logos')
 
-# Save QR code
-def save_qr_code(
+# Characters of the short codes served by the /r/<code> redirect route
+SHORT_CODE_ALPHABET = string.digits + string.ascii_letters
+# Attempts at drawing an unused short code before giving up
+SHORT_CODE_ATTEMPTS = 5
+# Fields of a QR code that bulk updates may change
+UPDATABLE_FIELDS = ("title", "foreground_color", "background_color")
+# Fields of a QR code document that list requests may project
+QR_CODE_FIELDS = (
+    "_id", "user_id", "code", "url", "title", "foreground_color", "background_color",
+    "logo_path", "logo_id", "error_correction", "created_at",
+)
+# Fields identifying the content of a QR code, for dedupe mode and idempotent retries
+DEDUPE_FIELDS = ("url", "title", "foreground_color", "background_color", "logo_id", "error_correction")
+# Longest Idempotency-Key accepted when creating a QR code
+IDEMPOTENCY_KEY_MAX_LENGTH = 255
+# Order of the QR code list, newest first; _id breaks ties between codes created together
+QR_CODE_LIST_SORT = [("created_at", DESCENDING), ("_id", DESCENDING)]
+
+class IdempotencyKeyReused(Exception):
+    """Raised when an idempotency key is sent again for a different QR code."""
+
+# Draw a short code
+def new_short_code(length: int = SHORT_CODE_LENGTH) -> str:
+    """Draws a random short code for a QR code's redirect link.
+
+    Args:
+        length: The number of characters of the code (int).
+
+    Returns:
+        A random code of letters and digits.
+    """
+    return "".join(secrets.choice(SHORT_CODE_ALPHABET) for _ in range(length))
+
+def is_short_code_conflict(error: Optional[Dict[str, Any]]) -> bool:
+    """Checks whether a write error is a duplicate short code.
+
+    Args:
+        error: The details of a DuplicateKeyError, or a bulk write error entry.
+
+    Returns:
+        True if the write failed on the unique index of the short codes.
+    """
+    return bool(error) and error.get("code") == 11000 and "code" in (error.get("keyPattern") or {})
+
+# Build a QR code document
+def qr_code_document(
     user_id: ObjectId,
     url: str,
     title: str,
     foreground_color: str,
     background_color: str,
     logo_path: Optional[str] = None,
-) -> str:
-    """Saves a QR code to the database.
+    created_at: Optional[datetime] = None,
+    code: Optional[str] = None,
+    logo_id: Optional[str] = None,
+    error_correction: str = "M",
+) -> Dict[str, Any]:
+    """Builds the document stored for a QR code.
 
     Args:
         user_id: The ID of the user who created the QR code (ObjectId).
@@ -30,48 +86,256 @@ def save_qr_code(
         foreground_color: The foreground color of the QR code (string).
         background_color: The background color of the QR code (string).
         logo_path: The path to the logo image, if any (string, optional).
+        created_at: The creation time, defaults to now (datetime, optional).
+        code: The short code of the redirect link, drawn at random by default (string, optional).
+        logo_id: The ID of the logo in the logo store, if any (string, optional).
+        error_correction: The error correction level, "L", "M", "Q" or "H" (string, default is "M").
 
     Returns:
-        The ID of the newly created QR code as a string.
+        The QR code document.
     """
-    # Define the QR code document
-    qr_code_data: Dict[str, Any] = {
+    return {
         "user_id": user_id,
+        "code": code or new_short_code(),
         "url": url,
         "title": title,
         "foreground_color": foreground_color,
         "background_color": background_color,
         "logo_path": logo_path,
-        "created_at": datetime.utcnow(), # Add creation timestamp
+        "logo_id": logo_id,
+        "error_correction": error_correction,
+        "created_at": created_at or datetime.utcnow(), # Add creation timestamp
     }
-    # Insert the new QR code document into the collection
-    result: InsertOneResult = qrcodes_collection.insert_one(qr_code_data)
-    # Return the new QR code's ID as a string
-    return str(result.inserted_id)
+
+# Create QR code
+@timed("db.create_qr_code")
+def create_qr_code(
+    user_id: ObjectId,
+    url: str,
+    title: str,
+    foreground_color: str,
+    background_color: str,
+    logo_path: Optional[str] = None,
+    logo_id: Optional[str] = None,
+    error_correction: str = "M",
+) -> Dict[str, Any]:
+    """Saves a QR code to the database with a unique short code.
+
+    Args:
+        user_id: The ID of the user who created the QR code (ObjectId).
+        url: The URL that the QR code points to (string).
+        title: The title associated with the QR code (string).
+        foreground_color: The foreground color of the QR code (string).
+        background_color: The background color of the QR code (string).
+        logo_path: The path to the logo image, if any (string, optional).
+        logo_id: The ID of the logo in the logo store, if any (string, optional).
+        error_correction: The error correction level, "L", "M", "Q" or "H" (string, default is "M").
+
+    Returns:
+        The inserted QR code document, including its _id and code.
+    """
+    # Define the QR code document
+    qr_code_data: Dict[str, Any] = qr_code_document(
+        user_id, url, title, foreground_color, background_color, logo_path,
+        logo_id=logo_id, error_correction=error_correction,
+    )
+    for attempt in range(SHORT_CODE_ATTEMPTS):
+        try:
+            # Insert the new QR code document into the collection
+            qrcodes_collection.insert_one(qr_code_data)
+            qr_code_list_cache.invalidate(user_id)
+            return qr_code_data
+        except DuplicateKeyError as e:
+            if attempt == SHORT_CODE_ATTEMPTS - 1 or not is_short_code_conflict(e.details):
+                raise
+            # The short code is taken, draw another one
+            qr_code_data["code"] = new_short_code()
+
+# Digest the content of a QR code
+def dedupe_key(qr_code: Dict[str, Any]) -> str:
+    """Returns a digest of the fields identifying the content of a QR code.
+
+    Args:
+        qr_code: The QR code document, or the fields of a requested QR code.
+
+    Returns:
+        A hex SHA-256 digest of DEDUPE_FIELDS.
+    """
+    h = hashlib.sha256()
+    for field in DEDUPE_FIELDS:
+        # Length-prefix each field so different splits can never collide
+        value = str(qr_code.get(field) or "").encode('utf-8')
+        h.update(len(value).to_bytes(4, 'big'))
+        h.update(value)
+    return h.hexdigest()
+
+def qr_code_upsert_query(
+    qr_code_data: Dict[str, Any], idempotency_key: Optional[str] = None, dedupe: bool = False
+) -> Dict[str, Any]:
+    """Tags a new QR code document for deduplication and builds the filter finding an earlier one.
+
+    The idempotency key and the dedupe key are only set when used, as the
+    unique indexes on them skip documents without the field.
+
+    Args:
+        qr_code_data: The new QR code document, updated in place.
+        idempotency_key: The Idempotency-Key of the request, if any (string, optional).
+        dedupe: Whether to match an earlier QR code with the same content (bool).
+
+    Returns:
+        The MongoDB filter of the upsert.
+    """
+    matches: List[Dict[str, Any]] = []
+    if idempotency_key is not None:
+        qr_code_data["idempotency_key"] = idempotency_key
+        matches.append({"idempotency_key": idempotency_key})
+    if dedupe:
+        qr_code_data["dedupe_key"] = dedupe_key(qr_code_data)
+        matches.append({"dedupe_key": qr_code_data["dedupe_key"]})
+    return {"user_id": qr_code_data["user_id"], "$or": matches}
+
+def check_replay(qr_code: Dict[str, Any], qr_code_data: Dict[str, Any]) -> None:
+    """Checks that an existing QR code found for a request has the requested content.
+
+    Raises:
+        IdempotencyKeyReused: If the QR code was found by an idempotency key sent with other content.
+    """
+    if dedupe_key(qr_code) != dedupe_key(qr_code_data):
+        raise IdempotencyKeyReused("Idempotency-Key was already used for a different QR code")
+
+# Create QR code unless it exists
+@timed("db.find_or_create_qr_code")
+def find_or_create_qr_code(
+    user_id: ObjectId,
+    url: str,
+    title: str,
+    foreground_color: str,
+    background_color: str,
+    logo_path: Optional[str] = None,
+    logo_id: Optional[str] = None,
+    error_correction: str = "M",
+    idempotency_key: Optional[str] = None,
+    dedupe: bool = False,
+) -> Tuple[Dict[str, Any], bool]:
+    """Saves a QR code, or returns the one an earlier request already saved.
+
+    With an idempotency key, a retry of the same request returns the QR code
+    created by the first attempt. In dedupe mode, a request for a QR code
+    with the same content (DEDUPE_FIELDS) as an earlier one returns it
+    instead of saving a copy. Both are a single upsert, which the unique
+    indexes on (user_id, idempotency_key) and (user_id, dedupe_key) keep
+    from inserting twice under concurrent requests.
+
+    Args:
+        user_id: The ID of the user who created the QR code (ObjectId).
+        url: The URL that the QR code points to (string).
+        title: The title associated with the QR code (string).
+        foreground_color: The foreground color of the QR code (string).
+        background_color: The background color of the QR code (string).
+        logo_path: The path to the logo image, if any (string, optional).
+        logo_id: The ID of the logo in the logo store, if any (string, optional).
+        error_correction: The error correction level, "L", "M", "Q" or "H" (string, default is "M").
+        idempotency_key: The Idempotency-Key of the request, if any (string, optional).
+        dedupe: Whether to return an earlier QR code with the same content (bool, default is False).
+
+    Returns:
+        A tuple of the QR code document and whether it was created by this call.
+
+    Raises:
+        IdempotencyKeyReused: If the idempotency key was used for a QR code with other content.
+    """
+    if idempotency_key is None and not dedupe:
+        return create_qr_code(
+            user_id, url, title, foreground_color, background_color, logo_path, logo_id, error_correction
+        ), True
+    qr_code_data: Dict[str, Any] = qr_code_document(
+        user_id, url, title, foreground_color, background_color, logo_path,
+        logo_id=logo_id, error_correction=error_correction,
+    )
+    # Choose the _id up front to tell an insert from a match
+    qr_code_data["_id"] = ObjectId()
+    query: Dict[str, Any] = qr_code_upsert_query(qr_code_data, idempotency_key, dedupe)
+    for attempt in range(SHORT_CODE_ATTEMPTS):
+        try:
+            qr_code: Dict[str, Any] = qrcodes_collection.find_one_and_update(
+                query, {"$setOnInsert": qr_code_data}, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        except DuplicateKeyError as e:
+            if attempt == SHORT_CODE_ATTEMPTS - 1:
+                raise
+            if is_short_code_conflict(e.details):
+                # The short code is taken, draw another one
+                qr_code_data["code"] = new_short_code()
+            # Otherwise a concurrent request inserted the same QR code first, and the next attempt finds it
+            continue
+        if qr_code["_id"] != qr_code_data["_id"]:
+            check_replay(qr_code, qr_code_data)
+            return qr_code, False
+        qr_code_list_cache.invalidate(user_id)
+        return qr_code, True
+
+# Build the filter of a page of a user's QR codes
+def qr_codes_page_query(user_id: ObjectId, after: Optional[Tuple[datetime, ObjectId]] = None) -> Dict[str, Any]:
+    """Builds the filter of a page of a user's QR codes, newest first.
+
+    Pages are addressed by keyset: ``after`` is the (created_at, _id) of the
+    last QR code of the previous page, which resumes the index scan directly
+    instead of skipping over earlier documents.
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+        after: The created_at and _id of the last QR code of the previous page (tuple, optional).
+
+    Returns:
+        The MongoDB filter.
+    """
+    query: Dict[str, Any] = {"user_id": user_id}
+    if after is not None:
+        created_at, qr_code_id = after
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": qr_code_id}},
+        ]
+    return query
+
+def qr_codes_page_projection(fields: Optional[List[str]] = None) -> Dict[str, int]:
+    """Builds the projection of a page of QR codes; created_at is always included for the next cursor.
+
+    Without fields, every field of QR_CODE_FIELDS is returned, so internal
+    fields such as the idempotency and dedupe keys never reach the response.
+    """
+    return {field: 1 for field in (*(fields or QR_CODE_FIELDS), "created_at")}
 
 # Get QR codes by User
-def get_qr_codes_by_user(user_id: ObjectId) -> List[Dict[str, Any]]:
-    """Retrieves all QR codes created by a specific user.
+@timed("db.get_qr_codes_by_user")
+def get_qr_codes_by_user(
+    user_id: ObjectId,
+    after: Optional[Tuple[datetime, ObjectId]] = None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """Retrieves a page of the QR codes created by a specific user, newest first.
 
     Args:
         user_id: The ID of the user (ObjectId).
+        after: The created_at and _id of the last QR code of the previous page (tuple, optional).
+        limit: The maximum number of QR codes to return (int, optional).
+        fields: The QR code fields to return, among QR_CODE_FIELDS; _id and
+            created_at are always included (list of strings, optional).
 
     Returns:
-        A list of dictionaries, where each dictionary represents a QR code.
+        A list of QR code documents, as stored; the app's JSON provider encodes their ObjectIds.
     """
-    # Query the database for all QR codes created by the given user_id
-    qr_codes = qrcodes_collection.find({"user_id": user_id})
-    # Transform the query results into a list of dictionaries, converting ObjectId fields into strings
-    return [
-        {
-            **qr_code,
-            "_id": str(qr_code["_id"]), # Convert ObjectId to string
-            "user_id": str(qr_code["user_id"]), # Convert ObjectId to string
-        }
-        for qr_code in qr_codes
-    ]
+    # Query the database for the QR codes created by the given user_id, in list order
+    cursor = qrcodes_collection.find(
+        qr_codes_page_query(user_id, after), qr_codes_page_projection(fields)
+    ).sort(QR_CODE_LIST_SORT)
+    if limit:
+        cursor = cursor.limit(limit)
+    return list(cursor)
 
 # Delete QR code by ID
+@timed("db.delete_qr_code_by_id")
 def delete_qr_code_by_id(qr_code_id: ObjectId, user_id: ObjectId) -> DeleteResult:
     """Deletes a QR code by its ID, ensuring the user making the request
        is the owner of the QR code.
@@ -84,6 +348,349 @@ def delete_qr_code_by_id(qr_code_id: ObjectId, user_id: ObjectId) -> DeleteResul
         The result of the delete operation as a `DeleteResult` object.
     """
     # Delete the QR code document matching both the qr_code_id and user_id, ensuring ownership
-    return qrcodes_collection.delete_one(
+    result: DeleteResult = qrcodes_collection.delete_one(
         {"_id": qr_code_id, "user_id": user_id}
-    )
\ No newline at end of file
+    )
+    qr_code_list_cache.invalidate(user_id)
+    return result
+# Build the documents of a batch of QR codes
+def qr_code_documents(user_id: ObjectId, qr_codes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Builds one QR code document per item, sharing the same creation timestamp."""
+    created_at = datetime.utcnow()
+    return [
+        qr_code_document(
+            user_id,
+            qr_code["url"],
+            qr_code.get("title", ""),
+            qr_code.get("foreground_color", "#000000"),
+            qr_code.get("background_color", "#ffffff"),
+            qr_code.get("logo_path"),
+            created_at,
+            logo_id=qr_code.get("logo_id"),
+            error_correction=qr_code.get("error_correction", "M"),
+        )
+        for qr_code in qr_codes
+    ]
+
+def short_code_conflicts(error: BulkWriteError) -> Optional[List[int]]:
+    """Returns the indexes of the documents of a failed bulk insert that hit a taken short code.
+
+    Returns:
+        The indexes, or None if any document failed for another reason.
+    """
+    write_errors = error.details.get("writeErrors", [])
+    if not all(is_short_code_conflict(write_error) for write_error in write_errors):
+        return None
+    return [write_error["index"] for write_error in write_errors]
+
+# Create a batch of QR codes
+@timed("db.create_qr_codes")
+def create_qr_codes(user_id: ObjectId, qr_codes: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Saves several QR codes to the database with a single insert.
+
+    Args:
+        user_id: The ID of the user who created the QR codes (ObjectId).
+        qr_codes: A list of dictionaries with the url, title, foreground_color,
+            background_color and optional logo_path, logo_id and
+            error_correction of each QR code.
+
+    Returns:
+        The inserted QR code documents, including their _id and code, in input order.
+    """
+    documents: List[Dict[str, Any]] = qr_code_documents(user_id, qr_codes)
+    pending: List[Dict[str, Any]] = documents
+    try:
+        for attempt in range(SHORT_CODE_ATTEMPTS):
+            if not pending:
+                break
+            try:
+                # Insert all documents in one round trip
+                qrcodes_collection.insert_many(pending, ordered=False)
+                break
+            except BulkWriteError as e:
+                conflicts = short_code_conflicts(e)
+                if attempt == SHORT_CODE_ATTEMPTS - 1 or conflicts is None:
+                    raise
+                # Only retry the documents whose short code was taken
+                pending = [pending[index] for index in conflicts]
+                for document in pending:
+                    document["code"] = new_short_code()
+    finally:
+        # Some documents may have been inserted even if the batch failed
+        qr_code_list_cache.invalidate(user_id)
+    return documents
+
+# Delete a batch of QR codes by ID
+@timed("db.delete_qr_codes_by_ids")
+def delete_qr_codes_by_ids(qr_code_ids: List[ObjectId], user_id: ObjectId) -> DeleteResult:
+    """Deletes several QR codes owned by a user.
+
+    Args:
+        qr_code_ids: The IDs of the QR codes to delete (list of ObjectId).
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+
+    Returns:
+        The result of the delete operation as a `DeleteResult` object.
+    """
+    result: DeleteResult = qrcodes_collection.delete_many(
+        {"_id": {"$in": qr_code_ids}, "user_id": user_id}
+    )
+    qr_code_list_cache.invalidate(user_id)
+    return result
+
+# Select QR codes for a bulk operation
+def qr_codes_query(
+    user_id: ObjectId,
+    qr_code_ids: Optional[List[ObjectId]] = None,
+    title: Optional[str] = None,
+    created_after: Optional[datetime] = None,
+    created_before: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Builds the filter of a bulk operation on a user's QR codes.
+
+    The owner is always part of the filter, so a bulk operation can never
+    reach the QR codes of another user.
+
+    Args:
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+        qr_code_ids: Only select these QR codes (list of ObjectId, optional).
+        title: Only select QR codes with this exact title (string, optional).
+        created_after: Only select QR codes created at or after this time (datetime, optional).
+        created_before: Only select QR codes created before this time (datetime, optional).
+
+    Returns:
+        The MongoDB filter.
+    """
+    query: Dict[str, Any] = {"user_id": user_id}
+    if qr_code_ids is not None:
+        query["_id"] = {"$in": qr_code_ids}
+    if title is not None:
+        query["title"] = title
+    created_at: Dict[str, datetime] = {}
+    if created_after is not None:
+        created_at["$gte"] = created_after
+    if created_before is not None:
+        created_at["$lt"] = created_before
+    if created_at:
+        query["created_at"] = created_at
+    return query
+
+def find_qr_code_batches(
+    query: Dict[str, Any], batch_size: int = QR_BULK_BATCH_SIZE
+) -> Iterator[List[Dict[str, Any]]]:
+    """Yields the QR codes matching a filter in batches, with their _id and code only.
+
+    Args:
+        query: The filter (see qr_codes_query).
+        batch_size: The number of QR codes per batch (int).
+
+    Yields:
+        Lists of at most ``batch_size`` QR code documents.
+    """
+    cursor = qrcodes_collection.find(query, {"code": 1}).sort("_id", ASCENDING).batch_size(batch_size)
+    batch: List[Dict[str, Any]] = []
+    for qr_code in cursor:
+        batch.append(qr_code)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+# Update a batch of QR codes by ID
+@timed("db.update_qr_codes_by_ids")
+def update_qr_codes_by_ids(qr_code_ids: List[ObjectId], user_id: ObjectId, fields: Dict[str, Any]) -> UpdateResult:
+    """Sets the same fields on several QR codes owned by a user.
+
+    Args:
+        qr_code_ids: The IDs of the QR codes to update (list of ObjectId).
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+        fields: The new values, among UPDATABLE_FIELDS (dict).
+
+    Returns:
+        The result of the update operation as an `UpdateResult` object.
+    """
+    result: UpdateResult = qrcodes_collection.update_many(
+        {"_id": {"$in": qr_code_ids}, "user_id": user_id}, qr_code_update(fields)
+    )
+    qr_code_list_cache.invalidate(user_id)
+    return result
+
+def qr_code_update(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Builds the update setting fields of a QR code.
+
+    The dedupe key is dropped when its content changes, so dedupe mode never
+    returns a QR code that no longer matches the request.
+    """
+    update: Dict[str, Any] = {"$set": fields}
+    if any(field in DEDUPE_FIELDS for field in fields):
+        update["$unset"] = {"dedupe_key": ""}
+    return update
+
+def qr_code_updates(user_id: ObjectId, updates: List[Tuple[ObjectId, Dict[str, Any]]]) -> List[UpdateOne]:
+    """Builds one update per QR code, each restricted to the user's QR codes."""
+    return [
+        UpdateOne({"_id": qr_code_id, "user_id": user_id}, qr_code_update(fields))
+        for qr_code_id, fields in updates
+    ]
+
+# Update several QR codes with different values
+@timed("db.bulk_update_qr_codes")
+def bulk_update_qr_codes(user_id: ObjectId, updates: List[Tuple[ObjectId, Dict[str, Any]]]) -> BulkWriteResult:
+    """Applies different updates to several QR codes owned by a user in one round trip.
+
+    Args:
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+        updates: (QR code ID, new values among UPDATABLE_FIELDS) pairs.
+
+    Returns:
+        The result of the bulk write as a `BulkWriteResult` object.
+    """
+    try:
+        return qrcodes_collection.bulk_write(qr_code_updates(user_id, updates), ordered=False)
+    finally:
+        # Unordered writes may partly succeed even when the bulk write raises
+        qr_code_list_cache.invalidate(user_id)
+
+# Find a QR code by ID
+@timed("db.find_qr_code")
+def find_qr_code(qr_code_id: ObjectId, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Finds a QR code owned by a user.
+
+    Args:
+        qr_code_id: The ID of the QR code (ObjectId).
+        user_id: The ID of the user who owns the QR code (ObjectId).
+
+    Returns:
+        The QR code document if found, otherwise None.
+    """
+    return qrcodes_collection.find_one({"_id": qr_code_id, "user_id": user_id})
+
+# Find a QR code by short code
+@timed("db.find_qr_code_by_code")
+def find_qr_code_by_code(code: str) -> Optional[Dict[str, Any]]:
+    """Finds the QR code behind a short code.
+
+    Args:
+        code: The short code of the redirect link (string).
+
+    Returns:
+        The QR code's _id and url if found, otherwise None.
+    """
+    return qrcodes_collection.find_one({"code": code}, {"url": 1})
+
+# Get the owners of several QR codes
+@timed("db.get_qr_code_owners")
+def get_qr_code_owners(qr_code_ids: List[ObjectId]) -> Dict[ObjectId, ObjectId]:
+    """Maps QR code IDs to the ID of the user who owns them.
+
+    Args:
+        qr_code_ids: The IDs of the QR codes (list of ObjectId).
+
+    Returns:
+        A dictionary from QR code ID to owner user ID; unknown IDs are omitted.
+    """
+    qr_codes = qrcodes_collection.find(
+        {"_id": {"$in": qr_code_ids}}, {"user_id": 1}
+    )
+    return {qr_code["_id"]: qr_code["user_id"] for qr_code in qr_codes}
+
+# Get the IDs of the QR codes owned by a user
+@timed("db.get_qr_code_ids_by_user")
+def get_qr_code_ids_by_user(user_id: ObjectId) -> List[ObjectId]:
+    """Retrieves the IDs of all QR codes created by a specific user.
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+
+    Returns:
+        A list of QR code IDs.
+    """
+    return [qr_code["_id"] for qr_code in qrcodes_collection.find({"user_id": user_id}, {"_id": 1})]
+
+# Build a logo document
+def logo_document(
+    logo_id: ObjectId, user_id: ObjectId, digest: str, path: str, width: int, height: int
+) -> Dict[str, Any]:
+    """Builds the document stored for an uploaded logo.
+
+    Args:
+        logo_id: The ID of the logo, also naming its directory in the logo store (ObjectId).
+        user_id: The ID of the user who uploaded the logo (ObjectId).
+        digest: The SHA-256 hex digest of the uploaded bytes (string).
+        path: The path of the normalized logo image (string).
+        width: The width of the normalized logo in pixels (int).
+        height: The height of the normalized logo in pixels (int).
+
+    Returns:
+        The logo document.
+    """
+    return {
+        "_id": logo_id,
+        "user_id": user_id,
+        "digest": digest,
+        "path": path,
+        "width": width,
+        "height": height,
+        "created_at": datetime.utcnow(),
+    }
+
+# Save a logo
+@timed("db.save_logo")
+def save_logo(logo: Dict[str, Any]) -> str:
+    """Saves an uploaded logo's document.
+
+    Args:
+        logo: The logo document (see logo_document).
+
+    Returns:
+        The ID of the logo as a string.
+
+    Raises:
+        DuplicateKeyError: If the user already uploaded the same image.
+    """
+    result: InsertOneResult = logos_collection.insert_one(logo)
+    return str(result.inserted_id)
+
+# Find a logo by ID
+@timed("db.find_logo")
+def find_logo(logo_id: ObjectId, user_id: ObjectId) -> Optional[Dict[str, Any]]:
+    """Finds a logo owned by a user.
+
+    Args:
+        logo_id: The ID of the logo (ObjectId).
+        user_id: The ID of the user who owns the logo (ObjectId).
+
+    Returns:
+        The logo document if found, otherwise None.
+    """
+    return logos_collection.find_one({"_id": logo_id, "user_id": user_id})
+
+# Find a logo by content
+@timed("db.find_logo_by_digest")
+def find_logo_by_digest(user_id: ObjectId, digest: str) -> Optional[Dict[str, Any]]:
+    """Finds the logo a user uploaded with the given content digest.
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+        digest: The SHA-256 hex digest of the uploaded bytes (string).
+
+    Returns:
+        The logo document if found, otherwise None.
+    """
+    return logos_collection.find_one({"user_id": user_id, "digest": digest})
+
+# Get several logos by ID
+@timed("db.get_logos")
+def get_logos(logo_ids: List[ObjectId], user_id: ObjectId) -> Dict[ObjectId, Dict[str, Any]]:
+    """Retrieves several logos owned by a user.
+
+    Args:
+        logo_ids: The IDs of the logos (list of ObjectId).
+        user_id: The ID of the user who owns the logos (ObjectId).
+
+    Returns:
+        A dictionary from logo ID to logo document; unknown IDs are omitted.
+    """
+    logos = logos_collection.find({"_id": {"$in": logo_ids}, "user_id": user_id})
+    return {logo["_id"]: logo for logo in logos}
@@ -0,0 +1,40 @@
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from src.config import RENDER_POOL_WORKERS
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    """Returns the process pool used for CPU-bound QR code rendering.
+
+    The pool is created lazily on first use so that pre-fork servers do not
+    start render processes in the master. Workers are spawned rather than
+    forked so they never inherit the parent's MongoDB client or threads.
+
+    Returns:
+        The shared ProcessPoolExecutor.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=RENDER_POOL_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+@atexit.register
+def shutdown_render_pool() -> None:
+    """Shuts down the render pool, if it was started."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
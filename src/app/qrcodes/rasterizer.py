@@ -0,0 +1,93 @@
+from typing import Sequence, Tuple
+
+import numpy as np
+from PIL import Image, ImageColor
+
+# Colors for which a 1-bit image is produced instead of a palette image
+_BLACK: Tuple[int, int, int] = (0, 0, 0)
+_WHITE: Tuple[int, int, int] = (255, 255, 255)
+# The color named "transparent", as accepted by qrcode's PIL image factory
+_TRANSPARENT: Tuple[int, int, int, int] = (0, 0, 0, 0)
+
+# An RGB color, or an RGBA color when it is not fully opaque
+Color = Tuple[int, ...]
+
+
+def parse_color(color: str) -> Color:
+    """Parses a CSS-style color (e.g. "#ff0000", "#ff000080" or "red") into a tuple.
+
+    Args:
+        color: The color to parse, or "transparent" (string).
+
+    Returns:
+        The (red, green, blue) components of an opaque color, or the
+        (red, green, blue, alpha) components of a translucent one.
+
+    Raises:
+        ValueError: If the color cannot be parsed.
+    """
+    if color.lower() == "transparent":
+        return _TRANSPARENT
+    rgb = ImageColor.getrgb(color)
+    # Drop the alpha channel of opaque colors so they keep the compact 1-bit and palette modes
+    if len(rgb) == 4 and rgb[3] < 255:
+        return tuple(rgb)
+    return tuple(rgb[:3])
+
+
+def has_alpha(color: Color) -> bool:
+    """Returns whether a color parsed by parse_color is not fully opaque."""
+    return len(color) == 4
+
+
+def rgba(color: Color) -> Tuple[int, int, int, int]:
+    """Returns the RGBA components of a color parsed by parse_color."""
+    return color if has_alpha(color) else color + (255,)
+
+
+def rasterize_matrix(
+    matrix: Sequence[Sequence[bool]],
+    box_size: int,
+    foreground_color: str = "#000000",
+    background_color: str = "#ffffff",
+) -> Image.Image:
+    """Rasterizes a QR code module matrix into an image in a single pass.
+
+    The matrix (as returned by ``QRCode.get_matrix()``, border included) is
+    scaled up with NumPy and handed to PIL as one buffer, instead of drawing
+    every dark module as a separate rectangle.
+
+    Args:
+        matrix: The QR code modules, True for dark modules (2D sequence of bool).
+        box_size: The size in pixels of each module (int).
+        foreground_color: The color of dark modules (string, default is "#000000").
+        background_color: The color of light modules (string, default is "#ffffff").
+
+    Returns:
+        A 1-bit image for black on white, an RGBA image when either color is
+        translucent, or a two-color palette image otherwise.
+    """
+    modules = np.asarray(matrix, dtype=bool)
+    # Scale every module up to a box_size x box_size block of pixels
+    pixels = np.repeat(np.repeat(modules, box_size, axis=0), box_size, axis=1)
+    height, width = pixels.shape
+
+    fill = parse_color(foreground_color)
+    back = parse_color(background_color)
+
+    if fill == _BLACK and back == _WHITE:
+        # In mode "1" a set bit is white, so pack the light modules row by row
+        packed = np.packbits(~pixels, axis=1)
+        return Image.frombuffer("1", (width, height), packed.tobytes(), "raw", "1", 0, 1)
+
+    if has_alpha(fill) or has_alpha(back):
+        # Look up each pixel's RGBA value, index 0 being the background and 1 the foreground
+        colors = np.array([rgba(back), rgba(fill)], dtype=np.uint8)
+        rgba_pixels = np.ascontiguousarray(colors[pixels.astype(np.uint8)])
+        return Image.frombuffer("RGBA", (width, height), rgba_pixels.tobytes(), "raw", "RGBA", 0, 1)
+
+    # Palette index 0 is the background, index 1 the foreground
+    indexes = np.ascontiguousarray(pixels, dtype=np.uint8)
+    img = Image.frombuffer("P", (width, height), indexes.tobytes(), "raw", "P", 0, 1)
+    img.putpalette(list(back) + list(fill))
+    return img
@@ -0,0 +1,244 @@
+import hashlib
+import io
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+# Render pool workers import this module on their own, so it must not import
+# the Flask application, the routes or the database models
+from src.app.qrcodes.cache import render_cache, render_cache_key
+from src.app.qrcodes.encoder import DEFAULT_ERROR_CORRECTION, encode_matrix
+from src.app.qrcodes.logos import logo_side, logo_store
+from src.app.qrcodes.rasterizer import rasterize_matrix
+from src.app.qrcodes.writers import iter_eps, iter_pdf, iter_svg
+from src.utils.metrics import span, timed
+
+# Supported output formats and their MIME types
+OUTPUT_FORMATS: Dict[str, str] = {
+    "png": "image/png",
+    "webp": "image/webp",
+    "svg": "image/svg+xml",
+    "eps": "application/postscript",
+    "pdf": "application/pdf",
+}
+# Formats written directly from the module matrix, without rasterizing
+VECTOR_FORMATS = {"svg", "eps", "pdf"}
+
+@timed("qr.encode")
+def build_qr_matrix(url: str, border: int = 5, error_correction: str = DEFAULT_ERROR_CORRECTION) -> np.ndarray:
+    """Encodes a URL into a QR code module matrix.
+
+    Args:
+        url: The URL to encode in the QR code (string).
+        border: The width of the quiet zone in modules (int, default is 5).
+        error_correction: The error correction level, "L", "M", "Q" or "H" (string, default is "M").
+
+    Returns:
+        The module matrix, border included, with True for dark modules.
+    """
+    # Encode at the smallest version fitting the URL, choosing the mask with NumPy
+    return encode_matrix(url, error_correction, border)
+
+def generate_qr_code(
+    url: str,
+    title: str,
+    foreground_color: str = "#000000",
+    background_color: str = "#ffffff",
+    logo: Optional[FileStorage] = None,
+    box_size: int = 10,
+    border: int = 5,
+    image_format: str = "png",
+    logo_id: Optional[str] = None,
+    error_correction: str = DEFAULT_ERROR_CORRECTION,
+) -> io.BytesIO:
+    """Generates a QR code raster image.
+
+    Rendered images are cached on a digest of every input affecting the
+    output, so repeated requests for the same code skip rendering entirely.
+
+    Args:
+        url: The URL to encode in the QR code (string).
+        title: The title of QR code (string).
+        foreground_color: The foreground color of the QR code (string, default is "#000000").
+        background_color: The background color of the QR code (string, default is "#ffffff").
+        logo: An optional logo image to be added to the center of the QR code (FileStorage, optional).
+        box_size: The size in pixels of each QR code module (int, default is 10).
+        border: The width of the quiet zone in modules (int, default is 5).
+        image_format: The raster format to encode, "png" or "webp" (string, default is "png").
+        logo_id: The ID of a logo from the logo store, used instead of ``logo`` (string, optional).
+        error_correction: The error correction level, "L", "M", "Q" or "H" (string, default is "M").
+
+    Returns:
+        A BytesIO stream containing the QR code image data.
+    """
+    # Read the logo once so it can be both hashed and decoded
+    logo_bytes: Optional[bytes] = logo.read() if logo and not logo_id else None
+    logo_digest: Optional[str] = (
+        hashlib.sha256(logo_bytes).hexdigest() if logo_bytes else None
+    )
+    if logo_id:
+        # Stored logos never change, so their ID identifies their content
+        logo_digest = f"logo:{logo_id}"
+
+    # Serve the stored PNG bytes directly on a cache hit
+    cache_key = render_cache_key(
+        url, foreground_color, background_color, box_size, border, logo_digest, image_format, error_correction
+    )
+    cached: Optional[bytes] = render_cache.get(cache_key)
+    if cached is not None:
+        return io.BytesIO(cached)
+
+    # Rasterize the module matrix with the specified colors in a single pass
+    matrix = build_qr_matrix(url, border, error_correction)
+    with span("qr.rasterize"):
+        img = rasterize_matrix(matrix, box_size, foreground_color, background_color)
+
+    if logo_id or logo_bytes:
+        with span("qr.logo"):
+            img = paste_logo(img, logo_bytes, logo_id)
+
+    # Create a BytesIO stream to store the image
+    img_io = io.BytesIO()
+    # Save the QR code image to the BytesIO stream (WebP must be lossless to stay scannable)
+    with span("qr.image_encode"):
+        img.save(img_io, image_format.upper(), **({"lossless": True} if image_format == "webp" else {}))
+    # Store the encoded image for subsequent identical requests
+    render_cache.set(cache_key, img_io.getvalue())
+    # Set the stream position to the beginning to be read later
+    img_io.seek(0)
+    # Return the BytesIO stream
+    return img_io
+
+def paste_logo(img: Image.Image, logo_bytes: Optional[bytes], logo_id: Optional[str]) -> Image.Image:
+    """Pastes a logo in the middle of a rasterized QR code.
+
+    Args:
+        img: The rasterized QR code (Image).
+        logo_bytes: The bytes of an uploaded logo image (bytes, optional).
+        logo_id: The ID of a logo from the logo store, used instead of ``logo_bytes`` (string, optional).
+
+    Returns:
+        The QR code with the logo, as an RGB image, or RGBA if its colors are translucent.
+    """
+    # Keep the alpha channel of translucent colors
+    full_color: str = 'RGBA' if img.mode == 'RGBA' else 'RGB'
+    # Paste a stored logo from its cached, already resized RGBA buffer
+    if logo_id:
+        img = img.convert(full_color)
+        logo_img = logo_store.variant(logo_id, logo_side(img.size[0]))
+        offset = (img.size[0] - logo_img.size[0]) // 2
+        img.paste(logo_img, (offset, offset), logo_img)
+    # Check if a logo is provided
+    elif logo_bytes:
+        # Switch to full color so the logo keeps its own colors
+        img = img.convert(full_color)
+        # Open the logo image
+        logo_img = Image.open(io.BytesIO(logo_bytes))
+        # Calculate logo dimensions to fit in the middle of the QR code
+        logo_width = img.size[0] // 5
+        logo_height = img.size[1] // 5
+        
+        # Resize the logo image
+        logo_img = logo_img.resize((logo_width, logo_height))
+        # Paste the resized logo in the middle of the QR code image
+        img.paste(
+            logo_img,
+            (
+                (img.size[0] - logo_img.size[0]) // 2,
+                (img.size[1] - logo_img.size[1]) // 2,
+            ),
+             # Use logo as a mask if it has an alpha channel
+            logo_img if logo_img.mode == 'RGBA' else None
+        )
+    return img
+
+def stream_qr_code(
+    url: str,
+    image_format: str = "png",
+    foreground_color: str = "#000000",
+    background_color: str = "#ffffff",
+    logo: Optional[FileStorage] = None,
+    box_size: int = 10,
+    border: int = 5,
+    logo_id: Optional[str] = None,
+    error_correction: str = DEFAULT_ERROR_CORRECTION,
+) -> Iterator[bytes]:
+    """Generates a QR code in any supported output format as a stream of chunks.
+
+    Vector formats are written row by row straight from the module matrix;
+    raster formats go through generate_qr_code and its render cache.
+
+    Args:
+        url: The URL to encode in the QR code (string).
+        image_format: One of the keys of OUTPUT_FORMATS (string, default is "png").
+        foreground_color: The foreground color of the QR code (string, default is "#000000").
+        background_color: The background color of the QR code (string, default is "#ffffff").
+        logo: An optional logo image, supported by the raster and svg formats (FileStorage, optional).
+        box_size: The size in pixels (or points) of each QR code module (int, default is 10).
+        border: The width of the quiet zone in modules (int, default is 5).
+        logo_id: The ID of a logo from the logo store, used instead of ``logo`` (string, optional).
+        error_correction: The error correction level, "L", "M", "Q" or "H" (string, default is "M").
+
+    Yields:
+        Consecutive chunks of the encoded document.
+    """
+    if image_format not in VECTOR_FORMATS:
+        img_io = generate_qr_code(
+            url, "", foreground_color, background_color, logo, box_size, border, image_format, logo_id,
+            error_correction,
+        )
+        yield img_io.getvalue()
+        return
+
+    matrix = build_qr_matrix(url, border, error_correction)
+    if image_format == "svg":
+        logo_png: Optional[bytes] = None
+        if logo_id:
+            # Stored logos are already normalized to PNG
+            logo_png = logo_store.png(logo_id)
+        elif logo:
+            # Normalize the logo to PNG so it can be embedded as a data URI
+            logo_io = io.BytesIO()
+            Image.open(logo).save(logo_io, 'PNG')
+            logo_png = logo_io.getvalue()
+        yield from iter_svg(matrix, box_size, foreground_color, background_color, logo_png)
+    elif image_format == "eps":
+        yield from iter_eps(matrix, box_size, foreground_color, background_color)
+    else:
+        yield from iter_pdf(matrix, box_size, foreground_color, background_color)
+
+def render_qr_spec(spec: Dict[str, Any]) -> Tuple[Optional[bytes], Optional[str]]:
+    """Renders a single QR code; runs inside the render process pool.
+
+    Args:
+        spec: A dictionary with the url, colors, box_size and border of the QR
+            code, and optionally its output "format" (default "png"), its
+            "error_correction" level (default "M") and either "logo" image
+            bytes or the "logo_id" of a stored logo.
+
+    Returns:
+        A tuple of (image bytes, None) on success or (None, error message) on failure.
+    """
+    try:
+        logo: Optional[bytes] = spec.get("logo")
+        document = b"".join(stream_qr_code(
+            spec["url"],
+            spec.get("format", "png"),
+            spec.get("foreground_color", "#000000"),
+            spec.get("background_color", "#ffffff"),
+            io.BytesIO(logo) if logo else None,
+            spec.get("box_size", 10),
+            spec.get("border", 5),
+            spec.get("logo_id"),
+            spec.get("error_correction", DEFAULT_ERROR_CORRECTION),
+        ))
+        return document, None
+    except Exception as e:
+        # Report the failure for this item only, the rest of the batch continues
+        return None, str(e)
+
+def render_qr_specs(specs: List[Dict[str, Any]]) -> List[Tuple[Optional[bytes], Optional[str]]]:
+    """Renders a chunk of QR codes in one pool task (see render_qr_spec)."""
+    return [render_qr_spec(spec) for spec in specs]
@@ -1,42 +1,87 @@
-from typing import Tuple, List, Dict, Any
-from flask import Blueprint, request, jsonify, send_file, Response
-from bson.objectid import ObjectId
+import json
+from datetime import datetime
+from typing import Tuple, List, Dict, Any, Iterator, Optional
+from flask import Blueprint, current_app, g, request, jsonify, send_file, Response, url_for
+from bson.objectid import ObjectId, InvalidId
 
 from werkzeug.datastructures import FileStorage
 from io import BytesIO
 
 # Import QR code related services and data models
-from src.app.qrcodes.services import generate_qr_code
+from src.app.qrcodes.services import (
+    apply_qr_code_updates,
+    batch_specs,
+    color_error,
+    delete_qr_codes,
+    image_render_key,
+    list_qr_codes_page,
+    parse_list_cursor,
+    parse_object_id,
+    qr_code_target,
+    referenced_logo_ids,
+    render_qr_batch,
+    size_error,
+    store_logo,
+    stored_image_path,
+    update_qr_codes,
+)
+from src.app.qrcodes.encoder import DEFAULT_ERROR_CORRECTION, ERROR_CORRECTION_LEVELS
+from src.app.qrcodes.rendering import OUTPUT_FORMATS, VECTOR_FORMATS, generate_qr_code, stream_qr_code
+from src.app.qrcodes.images import image_store
+from src.app.qrcodes.logos import InvalidLogo
 from src.app.qrcodes.models import (
-    delete_qr_code_by_id,
-    save_qr_code,
-    get_qr_codes_by_user,
+    IDEMPOTENCY_KEY_MAX_LENGTH,
+    QR_CODE_FIELDS,
+    UPDATABLE_FIELDS,
+    IdempotencyKeyReused,
+    create_qr_codes,
+    delete_qr_codes_by_ids,
+    find_logo,
+    find_or_create_qr_code,
+    find_qr_code,
+    get_logos,
+    qr_codes_query,
+)
+# Import the decorator authenticating requests
+from src.app.auth.decorators import token_required
+from src.config import (
+    LOGO_MAX_BYTES,
+    QR_BATCH_MAX_ITEMS,
+    QR_BULK_MAX_ITEMS,
+    QR_DEDUPE_DEFAULT,
+    QR_IMAGE_MAX_AGE,
+    QR_LIST_MAX_PAGE_SIZE,
+    QR_LIST_PAGE_SIZE,
 )
-# Import utility for decoding tokens
-from src.app.auth.utils import decode_token
-from pymongo.results import DeleteResult
+from src.utils.datetimes import parse_datetime
+from src.utils.zipstream import stream_zip
 
 # Define the blueprint for QR code related routes
 qrcodes = Blueprint('qrcodes', __name__)
 
 # Authorized CREATE QR code
 @qrcodes.route('/generate', methods=['POST'])
+@token_required
 def generate_qr() -> Tuple[Response, int]:
     """Generates and returns a QR code image.
 
-    Requires an Authorization header with a valid JWT token.
+    Requires an Authorization header with a valid JWT token. A logo is
+    referenced by the "logo_id" returned by /logos, or uploaded inline as a
+    "logo" file, in which case it is added to the logo store first. The
+    optional "error_correction" level ("L", "M", "Q" or "H", default "M")
+    trades a denser code for more tolerance to damage, e.g. under a logo.
+
+    A retry sending the same Idempotency-Key header gets the QR code of the
+    first attempt back, and with "dedupe" (default QR_DEDUPE_DEFAULT) a
+    request for a QR code identical to an earlier one gets that one back.
+    Either way the stored image is served without inserting or rendering
+    again, and the response carries an "Idempotent-Replayed: true" header.
 
     Returns:
         A tuple containing the QR code image file and the HTTP status code.
     """
-    # Extract token from the Authorization header
-    token: str = request.headers.get("Authorization").split(" ")[1]
-    # Decode token to get user id
-    user_id: Optional[ObjectId] = decode_token(token)
-
-    # Return 401 if user is not authorized
-    if not user_id:
-        return jsonify({"error": "Unauthorized"}), 401
+    # The authenticated user's ID, set by token_required
+    user_id: ObjectId = g.user_id
 
     # Get request data
     data: Dict[str, Any] = request.get_json()
@@ -45,52 +90,366 @@ def generate_qr() -> Tuple[Response, int]:
     title: str = data.get("title", "")
     foreground_color: str = data.get("foreground_color", "#000000")
     background_color: str = data.get("background_color", "#ffffff")
+    image_format: str = str(data.get("format", "png")).lower()
+    error_correction: str = str(data.get("error_correction", DEFAULT_ERROR_CORRECTION)).upper()
+    logo_id: Optional[str] = data.get("logo_id")
     logo: FileStorage = request.files.get("logo")
+    dedupe: Any = data.get("dedupe", QR_DEDUPE_DEFAULT)
+    # Only a JSON boolean, as the string "false" would otherwise turn dedupe on
+    if not isinstance(dedupe, bool):
+        return jsonify({"error": "dedupe must be true or false"}), 400
+    idempotency_key, error = idempotency_key_param(request.headers)
+    if error is not None:
+        return jsonify({"error": error}), 400
 
     # Check if url is provided
     if not url:
-        return jsonify({"Error: No URL provided"}), 400
+        return jsonify({"error": "No URL provided"}), 400
+    # Check that the output format is supported
+    if image_format not in OUTPUT_FORMATS:
+        return jsonify({"error": f"Unsupported format, expected one of {', '.join(OUTPUT_FORMATS)}"}), 400
+    # Check that the error correction level is supported
+    if error_correction not in ERROR_CORRECTION_LEVELS:
+        levels: str = ', '.join(ERROR_CORRECTION_LEVELS)
+        return jsonify({"error": f"Unsupported error_correction, expected one of {levels}"}), 400
+    if (logo or logo_id) and image_format in ("eps", "pdf"):
+        return jsonify({"error": "Logos are not supported for eps or pdf output"}), 400
+    # Reject colors the renderer could not draw, before saving anything or starting a stream
+    error = color_error("foreground_color", foreground_color, image_format) or color_error(
+        "background_color", background_color, image_format
+    )
+    if error is not None:
+        return jsonify({"error": error}), 400
+
+    # Resolve the logo from the logo store
+    logo_doc: Optional[Dict[str, Any]] = None
+    if logo_id:
+        try:
+            logo_doc = find_logo(ObjectId(logo_id), user_id)
+        except (InvalidId, TypeError):
+            logo_doc = None
+        if logo_doc is None:
+            return jsonify({"error": "Logo not found"}), 404
+    elif logo:
+        logo_bytes: bytes = logo.read(LOGO_MAX_BYTES + 1)
+        if len(logo_bytes) > LOGO_MAX_BYTES:
+            return jsonify({"error": f"Logos may be at most {LOGO_MAX_BYTES} bytes"}), 413
+        try:
+            logo_doc, _ = store_logo(user_id, logo_bytes)
+        except InvalidLogo as e:
+            return jsonify({"error": str(e)}), 400
+    logo_id = str(logo_doc["_id"]) if logo_doc else None
+
+    # Save the QR code metadata and associate it to the user ID, unless an earlier request did
+    try:
+        qr_code, created = find_or_create_qr_code(
+            user_id,
+            url,
+            title,
+            foreground_color,
+            background_color,
+            logo_doc["path"] if logo_doc else None,
+            str(logo_doc["_id"]) if logo_doc else None,
+            error_correction,
+            idempotency_key,
+            dedupe,
+        )
+    except IdempotencyKeyReused as e:
+        return jsonify({"error": str(e)}), 422
+    qr_code_id: str = str(qr_code["_id"])
+
+    # Serve the image of the existing QR code instead of rendering it again
+    if not created:
+        try:
+            path: str = stored_image_path(qr_code, image_render_key(qr_code, image_format), image_format)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        response: Response = send_file(
+            path, mimetype=OUTPUT_FORMATS[image_format], download_name=f"{qr_code_id}.{image_format}"
+        )
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+
+    # The destination URL, or the short link when redirects are enabled
+    target: str = qr_code_target(qr_code)
+
+    # Stream vector formats as they are written instead of buffering them
+    if image_format in VECTOR_FORMATS:
+        return Response(
+            stream_qr_code(
+                target, image_format, foreground_color, background_color,
+                logo_id=logo_id, error_correction=error_correction,
+            ),
+            mimetype=OUTPUT_FORMATS[image_format],
+            headers={"Content-Disposition": f"attachment; filename={qr_code_id}.{image_format}"},
+        ), 200
 
     # Generate the QR code
     img_io: BytesIO = generate_qr_code(
-        url, title, foreground_color, background_color, logo
-    )
-    # Save the QR code metadata and associate it to the user ID
-    qr_code_id: str = save_qr_code(
-        user_id, url, title, foreground_color, background_color, None
+        target, title, foreground_color, background_color,
+        image_format=image_format, logo_id=logo_id, error_correction=error_correction,
     )
+    # Keep the image so GET /qrcodes/<id>/image serves it without rendering again
+    image_store.put(qr_code_id, image_render_key(qr_code, image_format), image_format, img_io.getvalue())
 
     # Return the generated QR code image as a file response
-    return send_file(img_io, mimetype='image/png', download_name=f'{qr_code_id}.png')
+    return send_file(img_io, mimetype=OUTPUT_FORMATS[image_format], download_name=f'{qr_code_id}.{image_format}')
+
+# Authorized batch CREATE QR codes
+@qrcodes.route('/generate/batch', methods=['POST'])
+@token_required
+def generate_qr_batch() -> Tuple[Response, int]:
+    """Generates many QR codes at once and streams them back as a ZIP archive.
+
+    Requires an Authorization header with a valid JWT token. The request body
+    holds an "items" list where each item accepts the same fields as
+    /generate, except that logos are only referenced by "logo_id" and the
+    output is always PNG. Items are rendered in parallel across a process pool and their
+    metadata is saved with a single insert. Invalid or failed items are
+    reported in the archive's manifest.json instead of failing the batch.
+
+    Returns:
+        A tuple containing the streamed ZIP response and the HTTP status code.
+    """
+    # The authenticated user's ID, set by token_required
+    user_id: ObjectId = g.user_id
+
+    # Get request data
+    data: Dict[str, Any] = request.get_json(silent=True) or {}
+    items: Any = data.get("items")
+    if not isinstance(items, list) or not items:
+        return jsonify({"error": "A non-empty list of items is required"}), 400
+    if len(items) > QR_BATCH_MAX_ITEMS:
+        return jsonify({"error": f"A batch may contain at most {QR_BATCH_MAX_ITEMS} items"}), 400
+
+    # Look up every referenced logo in one query
+    logos: Dict[ObjectId, Dict[str, Any]] = get_logos(referenced_logo_ids(items), user_id)
+
+    # Split the items into valid specs and per-item validation errors
+    specs, indexes, errors = batch_specs(items, logos)
+
+    # Save the metadata of every valid item in one round trip
+    saved: List[Dict[str, Any]] = create_qr_codes(user_id, specs)
+    qr_code_ids: List[str] = [str(qr_code["_id"]) for qr_code in saved]
+    # Encode each item's short link when redirects are enabled
+    specs = [{**spec, "url": qr_code_target(qr_code)} for spec, qr_code in zip(specs, saved)]
+
+    def archive_files() -> Iterator[Tuple[str, bytes]]:
+        created: List[Dict[str, Any]] = []
+        failed_ids: List[ObjectId] = []
+        # Render results arrive in input order as the pool completes them
+        for index, qr_code_id, (png, error) in zip(indexes, qr_code_ids, render_qr_batch(specs)):
+            if error is not None:
+                errors.append({"index": index, "error": error})
+                failed_ids.append(ObjectId(qr_code_id))
+                continue
+            created.append({"index": index, "qr_code_id": qr_code_id, "file": f"{qr_code_id}.png"})
+            yield f"{qr_code_id}.png", png
+        # Remove the metadata of items that could not be rendered
+        if failed_ids:
+            delete_qr_codes_by_ids(failed_ids, user_id)
+        manifest = {"created": created, "errors": sorted(errors, key=lambda e: e["index"])}
+        yield "manifest.json", json.dumps(manifest).encode('utf-8')
+
+    # Stream the archive while the remaining items are still rendering
+    return Response(
+        stream_zip(archive_files()),
+        mimetype='application/zip',
+        headers={"Content-Disposition": "attachment; filename=qrcodes.zip"},
+    ), 200
+
+def image_params(args: Any, qr_code: Dict[str, Any]) -> Tuple[Optional[Tuple[str, int, int]], Optional[str]]:
+    """Parses and validates the query parameters of an image request.
+
+    Args:
+        args: The request query parameters (MultiDict).
+        qr_code: The QR code document the image is requested for.
+
+    Returns:
+        A tuple of ((format, box_size, border), None) on success or (None, error message).
+    """
+    image_format: str = args.get("format", "png").lower()
+    if image_format not in OUTPUT_FORMATS:
+        return None, f"Unsupported format, expected one of {', '.join(OUTPUT_FORMATS)}"
+    if qr_code.get("logo_id") and image_format in ("eps", "pdf"):
+        return None, "Logos are not supported for eps or pdf output"
+    box_size: Optional[int] = args.get("box_size", 10, type=int)
+    border: Optional[int] = args.get("border", 5, type=int)
+    # Bound the sizes so a request cannot make the server render huge images
+    error: Optional[str] = size_error(box_size, border)
+    if error is not None:
+        return None, error
+    return (image_format, box_size, border), None
+
+def image_headers(key: str) -> Dict[str, str]:
+    """Returns the caching headers sent with a stored image or a 304 response."""
+    return {
+        "ETag": f'"{key}"',
+        # Images are private to their owner and must be revalidated once stale
+        "Cache-Control": f"private, max-age={QR_IMAGE_MAX_AGE}, must-revalidate",
+    }
+
+# Authorized GET QR code image
+@qrcodes.route('/qrcodes/<qr_code_id>/image', methods=['GET'])
+@token_required
+def get_qr_code_image(qr_code_id: str) -> Tuple[Response, int]:
+    """Serves the stored image of a saved QR code.
+
+    Requires an Authorization header with a valid JWT token. The image is
+    rendered on first request with the optional "format", "box_size" and
+    "border" query parameters, stored on disk and served from there
+    afterwards. Responses carry a strong ETag derived from every render
+    input, so clients sending it back in If-None-Match get a 304.
+
+    Args:
+        qr_code_id: The ID of the QR code (string).
+
+    Returns:
+        A tuple containing the image file response and the HTTP status code.
+    """
+    object_id: Optional[ObjectId] = parse_object_id(qr_code_id)
+    qr_code: Optional[Dict[str, Any]] = find_qr_code(object_id, g.user_id) if object_id else None
+    if qr_code is None:
+        return jsonify({"error": "QR code not found or unauthorized"}), 404
+
+    params, error = image_params(request.args, qr_code)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    image_format, box_size, border = params
+    key: str = image_render_key(qr_code, image_format, box_size, border)
+
+    # Answer revalidations before touching the disk
+    if request.if_none_match.contains(key):
+        return Response(status=304, headers=image_headers(key)), 304
+
+    try:
+        path: str = stored_image_path(qr_code, key, image_format, box_size, border)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    # Serve the file from its path so the server can use sendfile
+    response: Response = send_file(
+        path,
+        mimetype=OUTPUT_FORMATS[image_format],
+        download_name=f"{qr_code_id}.{image_format}",
+        etag=key,
+        max_age=QR_IMAGE_MAX_AGE,
+    )
+    response.headers.update(image_headers(key))
+    # Keep the status set by send_file, which also answers Range requests
+    return response
+
+# Authorized logo upload
+@qrcodes.route('/logos', methods=['POST'])
+@token_required
+def upload_logo() -> Tuple[Response, int]:
+    """Uploads a logo to the logo store.
+
+    Requires an Authorization header with a valid JWT token and a "logo"
+    image file. The logo is decoded and resized once here; pass the returned
+    logo_id to /generate or /generate/batch to brand QR codes with it.
+    Uploading the same image again returns the existing logo.
+
+    Returns:
+        A tuple containing the JSON response with the logo ID and the HTTP status code.
+    """
+    logo: FileStorage = request.files.get("logo")
+    if not logo:
+        return jsonify({"error": "No logo provided"}), 400
+    logo_bytes: bytes = logo.read(LOGO_MAX_BYTES + 1)
+    if len(logo_bytes) > LOGO_MAX_BYTES:
+        return jsonify({"error": f"Logos may be at most {LOGO_MAX_BYTES} bytes"}), 413
+
+    try:
+        logo_doc, created = store_logo(g.user_id, logo_bytes)
+    except InvalidLogo as e:
+        return jsonify({"error": str(e)}), 400
+
+    return jsonify({
+        "logo_id": str(logo_doc["_id"]),
+        "width": logo_doc["width"],
+        "height": logo_doc["height"],
+    }), 201 if created else 200
 
 # Authorized GET QR code
 @qrcodes.route('/my_qrcodes', methods=['GET'])
+@token_required
 def list_qr_codes() -> Tuple[Response, int]:
-    """Retrieves a list of QR codes associated with the authenticated user.
+    """Retrieves a page of the QR codes associated with the authenticated user, newest first.
 
     Requires an Authorization header with a valid JWT token.
 
+    Query parameters:
+        after: The cursor of the previous page, from its Link header.
+        limit: The page size (defaults to QR_LIST_PAGE_SIZE).
+        fields: A comma-separated list of QR code fields to return.
+
+    When more QR codes are available, the response carries a Link header
+    with rel="next" pointing at the following page. Pages are served from
+    the per-user list cache when possible.
+
     Returns:
         A tuple containing the JSON response with the list of QR codes and
         the HTTP status code.
     """
-    # Extract token from the Authorization header
-    token: str = request.headers.get("Authorization").split(" ")[1]
-    # Decode the token to get user ID
-    user_id: Optional[ObjectId] = decode_token(token)
+    # The authenticated user's ID, set by token_required
+    user_id: ObjectId = g.user_id
+
+    params, error = list_params(request.args)
+    if error is not None:
+        return jsonify({"error": error}), 400
 
-    # Return 401 if user is not authorized
-    if not user_id:
-        return jsonify({"error": "Unauthorized"}), 401
+    # Fetch the serialized page of QR codes associated with the user ID
+    body, next_cursor = list_qr_codes_page(user_id, dumpb=current_app.json.dumpb, **params)
 
-    # Fetch the list of QR codes associated with the user ID
-    qr_codes: List[Dict[str, Any]] = get_qr_codes_by_user(user_id)
+    # Return the page as a JSON response, pointing at the next one
+    response = Response(body, mimetype="application/json")
+    if next_cursor is not None:
+        # Point at the next page, keeping the other query parameters
+        next_url = url_for(
+            request.endpoint, **{**request.args.to_dict(), "after": next_cursor, "limit": params["limit"]}
+        )
+        response.headers["Link"] = f'<{next_url}>; rel="next"'
+    return response, 200
 
-    # Return the list of QR codes as JSON response
-    return jsonify(qr_codes), 200
+def idempotency_key_param(headers: Dict[str, str]) -> Tuple[Optional[str], Optional[str]]:
+    """Validates the optional Idempotency-Key header of /generate.
+
+    Returns:
+        A tuple of (the key or None, None) on success or (None, error message).
+    """
+    key: Optional[str] = headers.get("Idempotency-Key")
+    if key is None:
+        return None, None
+    if not 0 < len(key) <= IDEMPOTENCY_KEY_MAX_LENGTH or not key.isprintable() or not key.isascii():
+        return None, f"Idempotency-Key must be 1 to {IDEMPOTENCY_KEY_MAX_LENGTH} printable ASCII characters"
+    return key, None
+
+def list_params(args: Dict[str, str]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validates the query parameters of /my_qrcodes.
+
+    Returns:
+        A tuple of (the after, limit and fields arguments of list_qr_codes_page, None)
+        on success or (None, error message).
+    """
+    after: Optional[str] = args.get("after") or None
+    try:
+        parse_list_cursor(after)
+        limit: int = int(args.get("limit") or QR_LIST_PAGE_SIZE)
+    except ValueError:
+        return None, "Invalid pagination parameters"
+    if limit < 1:
+        return None, "Invalid pagination parameters"
+    fields: Optional[List[str]] = (
+        [field for field in args["fields"].split(",") if field] if args.get("fields") else None
+    )
+    if fields and any(field not in QR_CODE_FIELDS for field in fields):
+        return None, f"Unknown fields, expected some of {', '.join(QR_CODE_FIELDS)}"
+    return {"after": after, "limit": min(limit, QR_LIST_MAX_PAGE_SIZE), "fields": fields}, None
 
 # Authorized DELETE QR code
 @qrcodes.route('/qrcodes/<qr_code_id>', methods=['DELETE'])
+@token_required
 def delete_qr_code(qr_code_id: str) -> Tuple[Response, int]:
     """Deletes a specific QR code.
 
@@ -103,20 +462,136 @@ def delete_qr_code(qr_code_id: str) -> Tuple[Response, int]:
     Returns:
         A tuple containing the JSON response and the HTTP status code.
     """
-    # Extract token from the Authorization header
-    token: str = request.headers.get("Authorization").split(" ")[1]
-    # Decode the token to get user ID
-    user_id: Optional[ObjectId] = decode_token(token)
-
-    # Return 401 if user is not authorized
-    if not user_id:
-        return jsonify({"error": "Unauthorized"}), 401
+    # The authenticated user's ID, set by token_required
+    user_id: ObjectId = g.user_id
 
-    # Delete the QR code by ID, checking user ownership
-    result: DeleteResult = delete_qr_code_by_id(ObjectId(qr_code_id), user_id)
+    # Delete the QR code by ID with its scans and images, checking user ownership
+    object_id: Optional[ObjectId] = parse_object_id(qr_code_id)
+    result: Dict[str, int] = delete_qr_codes(user_id, qr_codes_query(user_id, [object_id])) if object_id else {}
     # Return 404 if QR code was not found or user is not authorized
-    if result.deleted_count == 0:
+    if not result.get("deleted"):
         return jsonify({"error": "QR code not found or unauthorized"}), 404
 
     # Return a success message upon successful deletion
-    return jsonify({"message": "QR code deleted successfully"}), 200
\ No newline at end of file
+    return jsonify({"message": "QR code deleted successfully"}), 200
+
+# Authorized bulk DELETE QR codes
+@qrcodes.route('/bulk_delete', methods=['POST'])
+@token_required
+def bulk_delete_qr_codes() -> Tuple[Response, int]:
+    """Deletes many QR codes at once, with their scans and stored images.
+
+    Requires an Authorization header with a valid JWT token. The request body
+    selects the user's QR codes by "qr_code_ids", exact "title" and/or a
+    "created_after"/"created_before" ISO 8601 range (see bulk_query). Only
+    the user's own QR codes are ever deleted.
+
+    Returns:
+        A tuple containing the JSON response with the deleted counts and the HTTP status code.
+    """
+    user_id: ObjectId = g.user_id
+    data: Dict[str, Any] = request.get_json(silent=True) or {}
+    query, error = bulk_query(data, user_id)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    return jsonify(delete_qr_codes(user_id, query)), 200
+
+# Authorized bulk UPDATE QR codes
+@qrcodes.route('/bulk_update', methods=['POST'])
+@token_required
+def bulk_update_qr_codes() -> Tuple[Response, int]:
+    """Updates the title or colors of many QR codes at once.
+
+    Requires an Authorization header with a valid JWT token. The request body
+    either holds "updates", a list of {"qr_code_id", <fields>} objects
+    applied with one bulk write per batch, or selects QR codes like
+    /bulk_delete and sets the same "set" fields on all of them.
+
+    Returns:
+        A tuple containing the JSON response with the matched and modified
+        counts and the HTTP status code.
+    """
+    user_id: ObjectId = g.user_id
+    data: Dict[str, Any] = request.get_json(silent=True) or {}
+    if "updates" in data:
+        updates, error = parse_updates(data["updates"])
+        if error is not None:
+            return jsonify({"error": error}), 400
+        return jsonify(apply_qr_code_updates(user_id, updates)), 200
+
+    fields, error = update_fields(data.get("set"))
+    if error is None:
+        query, error = bulk_query(data, user_id)
+    if error is not None:
+        return jsonify({"error": error}), 400
+    return jsonify(update_qr_codes(user_id, query, fields)), 200
+
+def bulk_query(data: Dict[str, Any], user_id: ObjectId) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validates the selection of a bulk request and builds its filter.
+
+    Returns:
+        A tuple of (filter, None) on success or (None, error message).
+    """
+    qr_code_ids: Optional[List[ObjectId]] = None
+    if "qr_code_ids" in data:
+        values: Any = data["qr_code_ids"]
+        if not isinstance(values, list) or len(values) > QR_BULK_MAX_ITEMS:
+            return None, f"qr_code_ids must be a list of at most {QR_BULK_MAX_ITEMS} IDs"
+        qr_code_ids = [parse_object_id(value) for value in values]
+        if None in qr_code_ids:
+            return None, "Invalid QR Code ID"
+    title: Any = data.get("title")
+    if title is not None and not isinstance(title, str):
+        return None, "title must be a string"
+    try:
+        created_after: Optional[datetime] = parse_datetime(data.get("created_after"))
+        created_before: Optional[datetime] = parse_datetime(data.get("created_before"))
+    except (TypeError, ValueError):
+        return None, "Invalid created_after or created_before"
+    # Refuse to select every QR code of the user by accident
+    if qr_code_ids is None and title is None and created_after is None and created_before is None:
+        return None, "Select QR codes by qr_code_ids, title, created_after or created_before"
+    return qr_codes_query(user_id, qr_code_ids, title, created_after, created_before), None
+
+def update_fields(values: Any) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """Validates the new values of a bulk update.
+
+    Returns:
+        A tuple of (fields to set, None) on success or (None, error message).
+    """
+    if not isinstance(values, dict) or not values:
+        return None, f"Set at least one of {', '.join(UPDATABLE_FIELDS)}"
+    fields: Dict[str, Any] = {}
+    for field, value in values.items():
+        if field not in UPDATABLE_FIELDS:
+            return None, f"Only {', '.join(UPDATABLE_FIELDS)} can be updated"
+        if not isinstance(value, str):
+            return None, f"{field} must be a string"
+        if field != "title":
+            # Reject colors the renderer could not draw later
+            error = color_error(field, value)
+            if error is not None:
+                return None, error
+        fields[field] = value
+    return fields, None
+
+def parse_updates(values: Any) -> Tuple[Optional[List[Tuple[ObjectId, Dict[str, Any]]]], Optional[str]]:
+    """Validates the per QR code updates of a bulk update.
+
+    Returns:
+        A tuple of ((QR code ID, fields) pairs, None) on success or (None, error message).
+    """
+    if not isinstance(values, list) or not values or len(values) > QR_BULK_MAX_ITEMS:
+        return None, f"updates must be a non-empty list of at most {QR_BULK_MAX_ITEMS} items"
+    updates: List[Tuple[ObjectId, Dict[str, Any]]] = []
+    for index, value in enumerate(values):
+        if not isinstance(value, dict):
+            return None, f"updates[{index}] must be an object"
+        qr_code_id: Optional[ObjectId] = parse_object_id(value.get("qr_code_id"))
+        if qr_code_id is None:
+            return None, f"updates[{index}]: Invalid QR Code ID"
+        fields, error = update_fields({key: item for key, item in value.items() if key != "qr_code_id"})
+        if error is not None:
+            return None, f"updates[{index}]: {error}"
+        updates.append((qr_code_id, fields))
+    return updates, None
@@ -1,64 +1,551 @@
-import qrcode
-from PIL import Image
-import io
-from typing import Optional
-from werkzeug.datastructures import FileStorage
-
-def generate_qr_code(
-    url: str,
-    title: str,
-    foreground_color: str = "#000000",
-    background_color: str = "#ffffff",
-    logo: Optional[FileStorage] = None,
-) -> io.BytesIO:
-    """Generates a QR code image.
+import asyncio
+import hashlib
+from datetime import datetime, timedelta
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Tuple
+from bson.objectid import InvalidId, ObjectId
+from pymongo.errors import DuplicateKeyError
+
+from src.app.analytics import async_models as analytics_async_models
+from src.app.analytics.models import delete_scans_of_qr_codes
+from src.app.qrcodes import async_models
+
+from src.app.qrcodes.cache import ListPage, qr_code_list_cache, render_cache_key
+from src.app.qrcodes.encoder import DEFAULT_ERROR_CORRECTION, ERROR_CORRECTION_LEVELS
+from src.app.qrcodes.images import image_store
+from src.app.qrcodes.logos import logo_store
+from src.app.qrcodes.models import (
+    bulk_update_qr_codes,
+    delete_qr_codes_by_ids,
+    find_logo_by_digest,
+    find_qr_code_batches,
+    get_qr_code_owners,
+    get_qr_codes_by_user,
+    logo_document,
+    save_logo,
+    update_qr_codes_by_ids,
+)
+from src.app.qrcodes.pool import get_render_pool
+from src.app.qrcodes.rendering import render_qr_spec, render_qr_specs
+from src.app.qrcodes.rasterizer import has_alpha, parse_color
+from src.app.redirects.services import redirect_cache
+from src.config import QR_BULK_BATCH_SIZE, REDIRECT_BASE_URL, RENDER_POOL_WORKERS
+
+def qr_code_target(qr_code: Dict[str, Any]) -> str:
+    """Returns the text encoded in a saved QR code.
+
+    When REDIRECT_BASE_URL is set, QR codes encode their short link so that
+    scans go through the redirect route (and are recorded there) and the
+    destination can change without reprinting; otherwise they encode the
+    destination URL itself.
+
+    Args:
+        qr_code: The QR code document, with its url and code.
+
+    Returns:
+        The URL to encode.
+    """
+    if REDIRECT_BASE_URL and qr_code.get("code"):
+        return f"{REDIRECT_BASE_URL}/r/{qr_code['code']}"
+    return qr_code["url"]
+
+def parse_object_id(value: Any) -> Optional[ObjectId]:
+    """Parses an ObjectId from a request value, or returns None if it is invalid."""
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+# Bounds of the module size and border, so a request cannot make the server render huge images
+BOX_SIZE_RANGE: Tuple[int, int] = (1, 50)
+BORDER_RANGE: Tuple[int, int] = (0, 20)
+
+def size_error(box_size: Any, border: Any) -> Optional[str]:
+    """Checks that a requested module size and border are within BOX_SIZE_RANGE and BORDER_RANGE.
+
+    Returns:
+        An error message, or None if both are valid.
+    """
+    # JSON booleans are ints in Python, and are not sizes
+    if type(box_size) is not int or not BOX_SIZE_RANGE[0] <= box_size <= BOX_SIZE_RANGE[1]:
+        return "box_size must be an integer between %d and %d" % BOX_SIZE_RANGE
+    if type(border) is not int or not BORDER_RANGE[0] <= border <= BORDER_RANGE[1]:
+        return "border must be an integer between %d and %d" % BORDER_RANGE
+    return None
+
+def color_error(field: str, value: Any, image_format: str = "png") -> Optional[str]:
+    """Checks that a requested color can be rendered in an output format.
+
+    Args:
+        field: The name of the color field, for the error message (string).
+        value: The requested color.
+        image_format: The output format (string, default is "png").
+
+    Returns:
+        An error message, or None if the color is valid.
+    """
+    if not isinstance(value, str):
+        return f"{field} must be a string"
+    try:
+        color = parse_color(value)
+    except ValueError:
+        return f"Invalid {field}"
+    if has_alpha(color) and image_format in ("eps", "pdf"):
+        return f"Transparent colors are not supported for {image_format} output"
+    return None
+
+def referenced_logo_ids(items: List[Any]) -> List[ObjectId]:
+    """Returns the distinct valid logo IDs referenced by batch items."""
+    logo_ids = {
+        parse_object_id(item["logo_id"]) for item in items if isinstance(item, dict) and item.get("logo_id")
+    }
+    logo_ids.discard(None)
+    return list(logo_ids)
+
+def batch_specs(
+    items: List[Any], logos: Dict[ObjectId, Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[int], List[Dict[str, Any]]]:
+    """Splits batch items into render specifications and validation errors.
 
     Args:
-        url: The URL to encode in the QR code (string).
-        title: The title of QR code (string).
-        foreground_color: The foreground color of the QR code (string, default is "#000000").
-        background_color: The background color of the QR code (string, default is "#ffffff").
-        logo: An optional logo image to be added to the center of the QR code (FileStorage, optional).
+        items: The requested QR codes, each accepting the fields of /generate (list).
+        logos: The user's logos referenced by the items, by ID (see referenced_logo_ids).
 
     Returns:
-        A BytesIO stream containing the QR code image data.
-    """
-    # Initialize QR code generator with version 1, box size 10 and border 5
-    qr = qrcode.QRCode(version=1, box_size=10, border=5)
-    # Add data (URL) to the QR code generator
-    qr.add_data(url)
-    # Generate the QR code
-    qr.make(fit=True)
-
-    # Create the QR code image with the specified colors
-    img = qr.make_image(fill_color=foreground_color, back_color=background_color)
-
-    # Check if a logo is provided
-    if logo:
-        # Open the logo image
-        logo_img = Image.open(logo)
-        # Calculate logo dimensions to fit in the middle of the QR code
-        logo_width = img.size[0] // 5
-        logo_height = img.size[1] // 5
-        
-        # Resize the logo image
-        logo_img = logo_img.resize((logo_width, logo_height))
-        # Paste the resized logo in the middle of the QR code image
-        img.paste(
-            logo_img,
-            (
-                (img.size[0] - logo_img.size[0]) // 2,
-                (img.size[1] - logo_img.size[1]) // 2,
-            ),
-             # Use logo as a mask if it has an alpha channel
-            logo_img if logo_img.mode == 'RGBA' else None
+        A tuple of (valid specs, their indexes in ``items``, per-item errors).
+    """
+    specs: List[Dict[str, Any]] = []
+    indexes: List[int] = []
+    errors: List[Dict[str, Any]] = []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not isinstance(item.get("url"), str) or not item["url"]:
+            errors.append({"index": index, "error": "No URL provided"})
+            continue
+        error_correction = str(item.get("error_correction", DEFAULT_ERROR_CORRECTION)).upper()
+        if error_correction not in ERROR_CORRECTION_LEVELS:
+            errors.append({"index": index, "error": "Unsupported error_correction"})
+            continue
+        # Check every value the render pool would otherwise fail on, or spend its memory on
+        box_size, border = item.get("box_size", 10), item.get("border", 5)
+        error = (
+            size_error(box_size, border)
+            or color_error("foreground_color", item.get("foreground_color", "#000000"))
+            or color_error("background_color", item.get("background_color", "#ffffff"))
         )
+        if error is None and not isinstance(item.get("title", ""), str):
+            error = "title must be a string"
+        if error is not None:
+            errors.append({"index": index, "error": error})
+            continue
+        logo_doc: Optional[Dict[str, Any]] = None
+        if item.get("logo_id"):
+            logo_doc = logos.get(parse_object_id(item["logo_id"]))
+            if logo_doc is None:
+                errors.append({"index": index, "error": "Logo not found"})
+                continue
+        # Batches are always rendered as PNG, with stored logos only
+        specs.append({
+            **item,
+            "format": "png",
+            "box_size": box_size,
+            "border": border,
+            "error_correction": error_correction,
+            "logo": None,
+            "logo_id": str(logo_doc["_id"]) if logo_doc else None,
+            "logo_path": logo_doc["path"] if logo_doc else None,
+        })
+        indexes.append(index)
+    return specs, indexes, errors
+
+def render_qr_batch(specs: List[Dict[str, Any]]) -> Iterator[Tuple[Optional[bytes], Optional[str]]]:
+    """Renders a batch of QR codes in parallel across the render process pool.
+
+    Args:
+        specs: A list of QR code specifications (see render_qr_spec).
+
+    Yields:
+        A (PNG bytes, error) tuple for each spec, in input order.
+    """
+    pool = get_render_pool()
+    # Send items in chunks to amortize inter-process communication
+    chunksize = max(1, len(specs) // (RENDER_POOL_WORKERS * 4))
+    yield from pool.map(render_qr_spec, specs, chunksize=chunksize)
+
+async def render_qr_spec_async(spec: Dict[str, Any]) -> Tuple[Optional[bytes], Optional[str]]:
+    """Renders a single QR code on the render process pool without blocking the event loop.
+
+    Args:
+        spec: A QR code specification (see render_qr_spec).
+
+    Returns:
+        A tuple of (image bytes, None) on success or (None, error message) on failure.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_render_pool(), render_qr_spec, spec)
+
+async def render_qr_batch_async(specs: List[Dict[str, Any]]) -> AsyncIterator[Tuple[Optional[bytes], Optional[str]]]:
+    """Renders a batch of QR codes on the render process pool from an event loop.
+
+    Args:
+        specs: A list of QR code specifications (see render_qr_spec).
+
+    Yields:
+        A (PNG bytes, error) tuple for each spec, in input order.
+    """
+    loop = asyncio.get_running_loop()
+    pool = get_render_pool()
+    # Send items in chunks to amortize inter-process communication
+    chunksize = max(1, len(specs) // (RENDER_POOL_WORKERS * 4))
+    chunks = [
+        loop.run_in_executor(pool, render_qr_specs, specs[start:start + chunksize])
+        for start in range(0, len(specs), chunksize)
+    ]
+    for chunk in chunks:
+        for result in await chunk:
+            yield result
+
+def store_logo(user_id: ObjectId, data: bytes) -> Tuple[Dict[str, Any], bool]:
+    """Stores an uploaded logo in the logo store, once per user and content.
+
+    The image is decoded, normalized and resized to its preset variants once
+    here; QR codes then reference it by ID.
+
+    Args:
+        user_id: The ID of the user uploading the logo (ObjectId).
+        data: The uploaded image bytes (bytes).
+
+    Returns:
+        A tuple of (logo document, True if it was newly stored).
+
+    Raises:
+        InvalidLogo: If the data is not a decodable image.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    existing = find_logo_by_digest(user_id, digest)
+    if existing is not None:
+        return existing, False
+
+    logo_id = ObjectId()
+    path, width, height = logo_store.save(str(logo_id), data)
+    logo = logo_document(logo_id, user_id, digest, path, width, height)
+    try:
+        save_logo(logo)
+    except DuplicateKeyError:
+        # A concurrent upload of the same image won, keep only its copy
+        logo_store.delete(str(logo_id))
+        return find_logo_by_digest(user_id, digest), False
+    return logo, True
+
+async def store_logo_async(user_id: ObjectId, data: bytes) -> Tuple[Dict[str, Any], bool]:
+    """Stores an uploaded logo like store_logo, from an event loop.
+
+    Decoding and resizing run on the default thread pool.
+    """
+    digest = hashlib.sha256(data).hexdigest()
+    existing = await async_models.find_logo_by_digest(user_id, digest)
+    if existing is not None:
+        return existing, False
+
+    logo_id = ObjectId()
+    loop = asyncio.get_running_loop()
+    path, width, height = await loop.run_in_executor(None, logo_store.save, str(logo_id), data)
+    logo = logo_document(logo_id, user_id, digest, path, width, height)
+    try:
+        await async_models.save_logo(logo)
+    except DuplicateKeyError:
+        logo_store.delete(str(logo_id))
+        return await async_models.find_logo_by_digest(user_id, digest), False
+    return logo, True
+
+def image_render_key(qr_code: Dict[str, Any], image_format: str, box_size: int = 10, border: int = 5) -> str:
+    """Returns the render key of a saved QR code's image, also used as its ETag.
+
+    Args:
+        qr_code: The QR code document.
+        image_format: One of the keys of OUTPUT_FORMATS (string).
+        box_size: The size in pixels (or points) of each module (int, default is 10).
+        border: The width of the quiet zone in modules (int, default is 5).
+
+    Returns:
+        A hex digest identifying the rendered image.
+    """
+    logo_digest: Optional[str] = f"logo:{qr_code['logo_id']}" if qr_code.get("logo_id") else None
+    return render_cache_key(
+        qr_code_target(qr_code),
+        qr_code["foreground_color"],
+        qr_code["background_color"],
+        box_size,
+        border,
+        logo_digest,
+        image_format,
+        qr_code.get("error_correction", DEFAULT_ERROR_CORRECTION),
+    )
+
+def image_spec(qr_code: Dict[str, Any], image_format: str, box_size: int = 10, border: int = 5) -> Dict[str, Any]:
+    """Returns the render specification of a saved QR code's image (see render_qr_spec)."""
+    return {
+        "url": qr_code_target(qr_code),
+        "format": image_format,
+        "foreground_color": qr_code["foreground_color"],
+        "background_color": qr_code["background_color"],
+        "box_size": box_size,
+        "border": border,
+        "logo_id": qr_code.get("logo_id"),
+        "error_correction": qr_code.get("error_correction", DEFAULT_ERROR_CORRECTION),
+    }
+
+def stored_image_path(
+    qr_code: Dict[str, Any], key: str, image_format: str, box_size: int = 10, border: int = 5
+) -> str:
+    """Returns the path of a saved QR code's stored image, rendering it on first use.
+
+    Args:
+        qr_code: The QR code document.
+        key: The render key of the image (see image_render_key).
+        image_format: One of the keys of OUTPUT_FORMATS (string).
+        box_size: The size in pixels (or points) of each module (int, default is 10).
+        border: The width of the quiet zone in modules (int, default is 5).
+
+    Returns:
+        The path of the image file.
+
+    Raises:
+        ValueError: If the image could not be rendered.
+    """
+    qr_code_id = str(qr_code["_id"])
+    path: Optional[str] = image_store.get(qr_code_id, key, image_format)
+    if path is None:
+        document, error = render_qr_spec(image_spec(qr_code, image_format, box_size, border))
+        if error is not None:
+            raise ValueError(error)
+        path = image_store.put(qr_code_id, key, image_format, document)
+    return path
+
+async def stored_image_path_async(
+    qr_code: Dict[str, Any], key: str, image_format: str, box_size: int = 10, border: int = 5
+) -> str:
+    """Returns the path of a stored image like stored_image_path, rendering on the render pool."""
+    qr_code_id = str(qr_code["_id"])
+    path: Optional[str] = image_store.get(qr_code_id, key, image_format)
+    if path is None:
+        document, error = await render_qr_spec_async(image_spec(qr_code, image_format, box_size, border))
+        if error is not None:
+            raise ValueError(error)
+        loop = asyncio.get_running_loop()
+        path = await loop.run_in_executor(None, image_store.put, qr_code_id, key, image_format, document)
+    return path
+
+# Fields of a QR code that change its rendered images
+IMAGE_FIELDS = ("foreground_color", "background_color")
+
+def delete_images(qr_code_ids: List[ObjectId]) -> None:
+    """Removes the stored images of several QR codes."""
+    for qr_code_id in qr_code_ids:
+        image_store.delete(str(qr_code_id))
+
+def forget_qr_codes(qr_codes: List[Dict[str, Any]]) -> None:
+    """Removes the stored images and cached redirects of deleted QR codes."""
+    delete_images([qr_code["_id"] for qr_code in qr_codes])
+    for qr_code in qr_codes:
+        if qr_code.get("code"):
+            redirect_cache.delete(qr_code["code"])
+
+def owned_ids(qr_code_ids: List[ObjectId], owners: Dict[ObjectId, ObjectId], user_id: ObjectId) -> List[ObjectId]:
+    """Returns the IDs of the QR codes owned by a user, given the owners of some IDs."""
+    return [qr_code_id for qr_code_id in qr_code_ids if owners.get(qr_code_id) == user_id]
+
+def delete_qr_codes(user_id: ObjectId, query: Dict[str, Any]) -> Dict[str, int]:
+    """Deletes the QR codes matching a filter, with everything derived from them.
+
+    QR codes are deleted QR_BULK_BATCH_SIZE at a time with one delete_many
+    each, followed by their scans and rollups, their stored images and their
+    cached redirects, so a large cleanup never loads every ID at once.
+
+    Args:
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+        query: The filter selecting the QR codes (see qr_codes_query).
+
+    Returns:
+        The number of deleted QR codes and scans.
+    """
+    deleted = scans_deleted = 0
+    for batch in find_qr_code_batches(query):
+        qr_code_ids: List[ObjectId] = [qr_code["_id"] for qr_code in batch]
+        deleted += delete_qr_codes_by_ids(qr_code_ids, user_id).deleted_count
+        scans_deleted += delete_scans_of_qr_codes(qr_code_ids, user_id)
+        forget_qr_codes(batch)
+    return {"deleted": deleted, "scans_deleted": scans_deleted}
+
+async def delete_qr_codes_async(user_id: ObjectId, query: Dict[str, Any]) -> Dict[str, int]:
+    """Deletes the QR codes matching a filter like delete_qr_codes, with the async client."""
+    loop = asyncio.get_running_loop()
+    deleted = scans_deleted = 0
+    async for batch in async_models.find_qr_code_batches(query):
+        qr_code_ids: List[ObjectId] = [qr_code["_id"] for qr_code in batch]
+        deleted += (await async_models.delete_qr_codes_by_ids(qr_code_ids, user_id)).deleted_count
+        scans_deleted += await analytics_async_models.delete_scans_of_qr_codes(qr_code_ids, user_id)
+        # Removing directories blocks, so keep it off the event loop
+        await loop.run_in_executor(None, forget_qr_codes, batch)
+    return {"deleted": deleted, "scans_deleted": scans_deleted}
+
+def update_qr_codes(user_id: ObjectId, query: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, int]:
+    """Sets the same fields on the QR codes matching a filter, a batch at a time.
+
+    Args:
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+        query: The filter selecting the QR codes (see qr_codes_query).
+        fields: The new values, among UPDATABLE_FIELDS (dict).
+
+    Returns:
+        The number of matched and modified QR codes.
+    """
+    matched = modified = 0
+    for batch in find_qr_code_batches(query):
+        qr_code_ids: List[ObjectId] = [qr_code["_id"] for qr_code in batch]
+        result = update_qr_codes_by_ids(qr_code_ids, user_id, fields)
+        matched += result.matched_count
+        modified += result.modified_count
+        if any(field in fields for field in IMAGE_FIELDS):
+            # The batch only holds the user's QR codes, so drop their images directly
+            delete_images(qr_code_ids)
+    return {"matched": matched, "modified": modified}
+
+async def update_qr_codes_async(user_id: ObjectId, query: Dict[str, Any], fields: Dict[str, Any]) -> Dict[str, int]:
+    """Sets the same fields on the QR codes matching a filter like update_qr_codes, with the async client."""
+    loop = asyncio.get_running_loop()
+    matched = modified = 0
+    async for batch in async_models.find_qr_code_batches(query):
+        qr_code_ids: List[ObjectId] = [qr_code["_id"] for qr_code in batch]
+        result = await async_models.update_qr_codes_by_ids(qr_code_ids, user_id, fields)
+        matched += result.matched_count
+        modified += result.modified_count
+        if any(field in fields for field in IMAGE_FIELDS):
+            # Removing directories blocks, so keep it off the event loop
+            await loop.run_in_executor(None, delete_images, qr_code_ids)
+    return {"matched": matched, "modified": modified}
+
+def apply_qr_code_updates(user_id: ObjectId, updates: List[Tuple[ObjectId, Dict[str, Any]]]) -> Dict[str, int]:
+    """Applies different updates to several QR codes with one bulk_write per batch.
+
+    Args:
+        user_id: The ID of the user who owns the QR codes (ObjectId).
+        updates: (QR code ID, new values among UPDATABLE_FIELDS) pairs.
+
+    Returns:
+        The number of matched and modified QR codes.
+    """
+    matched = modified = 0
+    for start in range(0, len(updates), QR_BULK_BATCH_SIZE):
+        chunk = updates[start:start + QR_BULK_BATCH_SIZE]
+        result = bulk_update_qr_codes(user_id, chunk)
+        matched += result.matched_count
+        modified += result.modified_count
+        recolored: List[ObjectId] = [
+            qr_code_id for qr_code_id, fields in chunk if any(field in fields for field in IMAGE_FIELDS)
+        ]
+        if recolored:
+            # Never touch the images of another user's QR code
+            delete_images(owned_ids(recolored, get_qr_code_owners(recolored), user_id))
+    return {"matched": matched, "modified": modified}
+
+async def apply_qr_code_updates_async(
+    user_id: ObjectId, updates: List[Tuple[ObjectId, Dict[str, Any]]]
+) -> Dict[str, int]:
+    """Applies different updates to several QR codes like apply_qr_code_updates, with the async client."""
+    loop = asyncio.get_running_loop()
+    matched = modified = 0
+    for start in range(0, len(updates), QR_BULK_BATCH_SIZE):
+        chunk = updates[start:start + QR_BULK_BATCH_SIZE]
+        result = await async_models.bulk_update_qr_codes(user_id, chunk)
+        matched += result.matched_count
+        modified += result.modified_count
+        recolored: List[ObjectId] = [
+            qr_code_id for qr_code_id, fields in chunk if any(field in fields for field in IMAGE_FIELDS)
+        ]
+        if recolored:
+            # Never touch the images of another user's QR code
+            owners: Dict[ObjectId, ObjectId] = await async_models.get_qr_code_owners(recolored)
+            await loop.run_in_executor(None, delete_images, owned_ids(recolored, owners, user_id))
+    return {"matched": matched, "modified": modified}
+
+# Origin of the creation times encoded in list cursors
+CURSOR_EPOCH = datetime(1970, 1, 1)
+
+def encode_list_cursor(qr_code: Dict[str, Any]) -> str:
+    """Encodes the position of a QR code in the list as an opaque cursor.
+
+    The cursor holds the creation time in milliseconds, the precision
+    MongoDB stores, and the _id breaking ties between QR codes created
+    together: "<milliseconds>-<_id>".
+    """
+    millis: int = (qr_code["created_at"] - CURSOR_EPOCH) // timedelta(milliseconds=1)
+    return f"{millis}-{qr_code['_id']}"
+
+def parse_list_cursor(value: Optional[str]) -> Optional[Tuple[datetime, ObjectId]]:
+    """Decodes a cursor of encode_list_cursor into the created_at and _id it points after.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    if not value:
+        return None
+    millis, _, qr_code_id = value.partition("-")
+    try:
+        return CURSOR_EPOCH + timedelta(milliseconds=int(millis)), ObjectId(qr_code_id)
+    except (InvalidId, OverflowError) as e:
+        raise ValueError(f"Invalid cursor: {value}") from e
+
+def list_page(qr_codes: List[Dict[str, Any]], limit: int, dumpb: Callable[[Any], bytes]) -> ListPage:
+    """Serializes a page of QR codes once, with the cursor of the next page if it is full."""
+    next_cursor: Optional[str] = encode_list_cursor(qr_codes[-1]) if len(qr_codes) == limit else None
+    return dumpb(qr_codes), next_cursor
+
+def list_qr_codes_page(
+    user_id: ObjectId,
+    after: Optional[str],
+    limit: int,
+    fields: Optional[List[str]],
+    dumpb: Callable[[Any], bytes],
+) -> ListPage:
+    """Returns a page of a user's QR codes as JSON, from the list cache when possible.
+
+    Cache hits skip both MongoDB and serialization; writes to the user's QR
+    codes invalidate the cached pages (see QRCodeListCache).
+
+    Args:
+        user_id: The ID of the user (ObjectId).
+        after: The cursor of the previous page, if any (string, optional).
+        limit: The maximum number of QR codes on the page (int).
+        fields: The QR code fields to return (list of strings, optional).
+        dumpb: Serializes the page to JSON bytes, e.g. the dumpb of the app's JSON provider.
+
+    Returns:
+        A tuple of the JSON body and the cursor of the next page, or None on the last page.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    key = (after, limit, tuple(fields) if fields else None)
+    bucket = qr_code_list_cache.bucket(user_id)
+    page: Optional[ListPage] = bucket.get(key)
+    if page is None:
+        qr_codes = get_qr_codes_by_user(user_id, parse_list_cursor(after), limit, fields)
+        page = list_page(qr_codes, limit, dumpb)
+        qr_code_list_cache.store(bucket, key, page)
+    return page
 
-    # Create a BytesIO stream to store the image
-    img_io = io.BytesIO()
-    # Save the QR code image to the BytesIO stream
-    img.save(img_io, 'PNG')
-    # Set the stream position to the beginning to be read later
-    img_io.seek(0)
-    # Return the BytesIO stream
-    return img_io
\ No newline at end of file
+async def list_qr_codes_page_async(
+    user_id: ObjectId,
+    after: Optional[str],
+    limit: int,
+    fields: Optional[List[str]],
+    dumpb: Callable[[Any], bytes],
+) -> ListPage:
+    """Returns a page of a user's QR codes like list_qr_codes_page, querying the async client on a miss."""
+    key = (after, limit, tuple(fields) if fields else None)
+    bucket = qr_code_list_cache.bucket(user_id)
+    page: Optional[ListPage] = bucket.get(key)
+    if page is None:
+        qr_codes = await async_models.get_qr_codes_by_user(user_id, parse_list_cursor(after), limit, fields)
+        page = list_page(qr_codes, limit, dumpb)
+        qr_code_list_cache.store(bucket, key, page)
+    return page
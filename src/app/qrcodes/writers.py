@@ -0,0 +1,201 @@
+import base64
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.app.qrcodes.rasterizer import Color, has_alpha, parse_color
+
+
+def row_runs(matrix: Sequence[Sequence[bool]]) -> Iterator[Tuple[int, List[Tuple[int, int]]]]:
+    """Merges the dark modules of each matrix row into horizontal runs.
+
+    Args:
+        matrix: The QR code modules, True for dark modules (2D sequence of bool).
+
+    Yields:
+        (row index, [(start column, run length), ...]) for every row with dark modules.
+    """
+    modules = np.asarray(matrix, dtype=np.int8)
+    # Pad each row with light modules so every run has a start and an end edge
+    padded = np.pad(modules, ((0, 0), (1, 1)))
+    edges = np.diff(padded, axis=1)
+    for y in range(modules.shape[0]):
+        starts = np.flatnonzero(edges[y] == 1)
+        if starts.size == 0:
+            continue
+        ends = np.flatnonzero(edges[y] == -1)
+        yield y, list(zip(starts.tolist(), (ends - starts).tolist()))
+
+
+def svg_paint(color: Color) -> str:
+    """Formats a parsed color as SVG fill attributes, with an opacity when it is translucent."""
+    paint = 'fill="#%02x%02x%02x"' % color[:3]
+    if has_alpha(color):
+        paint += f' fill-opacity="{color[3] / 255:.3f}"'
+    return paint
+
+
+def opaque_rgb(color: str, image_format: str) -> Color:
+    """Parses a color for a format without transparency support.
+
+    Raises:
+        ValueError: If the color is translucent.
+    """
+    parsed = parse_color(color)
+    if has_alpha(parsed):
+        raise ValueError(f"Transparent colors are not supported for {image_format} output")
+    return parsed
+
+
+def iter_svg(
+    matrix: Sequence[Sequence[bool]],
+    box_size: int,
+    foreground_color: str = "#000000",
+    background_color: str = "#ffffff",
+    logo_png: Optional[bytes] = None,
+) -> Iterator[bytes]:
+    """Streams a QR code as an SVG document.
+
+    All dark modules are drawn by a single path made of one subpath per
+    horizontal run, in module units scaled by the viewBox.
+
+    Args:
+        matrix: The QR code modules, border included (2D sequence of bool).
+        box_size: The size in pixels of each module (int).
+        foreground_color: The color of dark modules (string, default is "#000000").
+        background_color: The color of light modules (string, default is "#ffffff").
+        logo_png: An optional PNG logo drawn in the center of the code (bytes, optional).
+
+    Yields:
+        Consecutive chunks of the SVG document.
+    """
+    size = len(matrix)
+    pixels = size * box_size
+    fill = svg_paint(parse_color(foreground_color))
+    back = svg_paint(parse_color(background_color))
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{pixels}" height="{pixels}" '
+        f'viewBox="0 0 {size} {size}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" {back}/>'
+        f'<path {fill} d="'
+    ).encode('utf-8')
+    for y, runs in row_runs(matrix):
+        # One rectangle subpath per run of dark modules
+        yield "".join(f"M{x} {y}h{length}v1h-{length}z" for x, length in runs).encode('utf-8')
+    yield b'"/>'
+    if logo_png:
+        # Embed the logo at a fifth of the code's size, like the raster output
+        logo_size = size / 5
+        offset = (size - logo_size) / 2
+        href = base64.b64encode(logo_png).decode('ascii')
+        yield (
+            f'<image x="{offset}" y="{offset}" width="{logo_size}" height="{logo_size}" '
+            f'href="data:image/png;base64,{href}"/>'
+        ).encode('utf-8')
+    yield b'</svg>\n'
+
+
+def iter_eps(
+    matrix: Sequence[Sequence[bool]],
+    box_size: int,
+    foreground_color: str = "#000000",
+    background_color: str = "#ffffff",
+) -> Iterator[bytes]:
+    """Streams a QR code as an Encapsulated PostScript document.
+
+    Args:
+        matrix: The QR code modules, border included (2D sequence of bool).
+        box_size: The size in points of each module (int).
+        foreground_color: The color of dark modules (string, default is "#000000").
+        background_color: The color of light modules (string, default is "#ffffff").
+
+    Yields:
+        Consecutive chunks of the EPS document.
+    """
+    size = len(matrix)
+    points = size * box_size
+    fill = " ".join(f"{c / 255:.3f}" for c in opaque_rgb(foreground_color, "eps"))
+    back = " ".join(f"{c / 255:.3f}" for c in opaque_rgb(background_color, "eps"))
+    yield (
+        "%!PS-Adobe-3.0 EPSF-3.0\n"
+        f"%%BoundingBox: 0 0 {points} {points}\n"
+        "%%EndComments\n"
+        # Work in module units with the origin at the top-left corner
+        f"{box_size} {box_size} scale\n"
+        f"{back} setrgbcolor 0 0 {size} {size} rectfill\n"
+        f"{fill} setrgbcolor\n"
+    ).encode('ascii')
+    for y, runs in row_runs(matrix):
+        row = size - y - 1
+        yield "".join(f"{x} {row} {length} 1 rectfill\n" for x, length in runs).encode('ascii')
+    yield b"showpage\n%%EOF\n"
+
+
+def iter_pdf(
+    matrix: Sequence[Sequence[bool]],
+    box_size: int,
+    foreground_color: str = "#000000",
+    background_color: str = "#ffffff",
+) -> Iterator[bytes]:
+    """Streams a QR code as a single-page vector PDF document.
+
+    The page content is written as it is generated; the stream length and
+    the cross-reference table are emitted at the end, once all object
+    offsets are known.
+
+    Args:
+        matrix: The QR code modules, border included (2D sequence of bool).
+        box_size: The size in points of each module (int).
+        foreground_color: The color of dark modules (string, default is "#000000").
+        background_color: The color of light modules (string, default is "#ffffff").
+
+    Yields:
+        Consecutive chunks of the PDF document.
+    """
+    size = len(matrix)
+    points = size * box_size
+    fill = " ".join(f"{c / 255:.3f}" for c in opaque_rgb(foreground_color, "pdf"))
+    back = " ".join(f"{c / 255:.3f}" for c in opaque_rgb(background_color, "pdf"))
+    offsets: List[int] = []
+    position = 0
+
+    def emit(data: str) -> bytes:
+        nonlocal position
+        encoded = data.encode('ascii')
+        position += len(encoded)
+        return encoded
+
+    def start_object(text: str) -> bytes:
+        offsets.append(position)
+        return emit(text)
+
+    yield emit("%PDF-1.4\n")
+    yield start_object("1 0 obj\n<< /Type /Catalog /Pages 2 0 R >>\nendobj\n")
+    yield start_object("2 0 obj\n<< /Type /Pages /Kids [3 0 R] /Count 1 >>\nendobj\n")
+    yield start_object(
+        f"3 0 obj\n<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {points} {points}] "
+        "/Contents 4 0 R >>\nendobj\n"
+    )
+    # The content stream length is an indirect object written after the stream
+    yield start_object("4 0 obj\n<< /Length 5 0 R >>\nstream\n")
+    content_start = position
+    yield emit(
+        f"{box_size} 0 0 {box_size} 0 0 cm\n"
+        f"{back} rg 0 0 {size} {size} re f\n"
+        f"{fill} rg\n"
+    )
+    for y, runs in row_runs(matrix):
+        row = size - y - 1
+        yield emit("".join(f"{x} {row} {length} 1 re\n" for x, length in runs) + "f\n")
+    content_length = position - content_start
+    yield emit("endstream\nendobj\n")
+    yield start_object(f"5 0 obj\n{content_length}\nendobj\n")
+
+    xref_offset = position
+    xref = "".join(f"{offset:010d} 00000 n \n" for offset in offsets)
+    yield emit(
+        f"xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n{xref}"
+        f"trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    )
@@ -0,0 +1,38 @@
+from typing import Optional, Tuple
+
+from quart import Blueprint, jsonify, redirect, request, Response
+
+from src.app.analytics.ingest import IngestQueueFull, scan_ingestor
+from src.app.analytics.services import scan_event
+from src.app.redirects.services import SHORT_CODE_PATTERN, Target, resolve_short_code_async
+
+# Async variant of the short link redirects, served by src.asgi
+redirects = Blueprint('redirects', __name__)
+
+@redirects.route('/<code>', methods=['GET'])
+async def follow_short_link(code: str) -> Tuple[Response, int]:
+    """Redirects a scanned short link to the destination of its QR code.
+
+    See the synchronous route; cache misses are resolved with the async client.
+
+    Args:
+        code: The short code of the QR code (string).
+
+    Returns:
+        A 302 redirect to the destination URL, or a 404 JSON response.
+    """
+    target: Optional[Target] = await resolve_short_code_async(code) if SHORT_CODE_PATTERN.match(code) else None
+    if target is None:
+        return jsonify({"error": "QR code not found"}), 404
+    qr_code_id, url = target
+
+    try:
+        scan_ingestor.submit(scan_event(qr_code_id, request.headers.get("User-Agent"), request.remote_addr), timeout=0)
+    except IngestQueueFull:
+        # Counted in the ingestor's rejected scans
+        pass
+
+    response = redirect(url, 302)
+    # Every scan must reach the server to be counted
+    response.headers["Cache-Control"] = "no-store"
+    return response, 302
@@ -0,0 +1,41 @@
+from typing import Optional, Tuple
+
+from flask import Blueprint, jsonify, redirect, request, Response
+
+from src.app.analytics.ingest import IngestQueueFull, scan_ingestor
+from src.app.analytics.services import scan_event
+from src.app.redirects.services import SHORT_CODE_PATTERN, Target, resolve_short_code
+
+# Define the blueprint of the short link redirects
+redirects = Blueprint('redirects', __name__)
+
+@redirects.route('/<code>', methods=['GET'])
+def follow_short_link(code: str) -> Tuple[Response, int]:
+    """Redirects a scanned short link to the destination of its QR code.
+
+    The short code is resolved from the redirect cache, so MongoDB is only
+    queried the first time a worker sees a code (or after its entry
+    expired). The scan is recorded by the background scan ingestor; a full
+    scan buffer drops the scan rather than delay the redirect.
+
+    Args:
+        code: The short code of the QR code (string).
+
+    Returns:
+        A 302 redirect to the destination URL, or a 404 JSON response.
+    """
+    target: Optional[Target] = resolve_short_code(code) if SHORT_CODE_PATTERN.match(code) else None
+    if target is None:
+        return jsonify({"error": "QR code not found"}), 404
+    qr_code_id, url = target
+
+    try:
+        scan_ingestor.submit(scan_event(qr_code_id, request.headers.get("User-Agent"), request.remote_addr), timeout=0)
+    except IngestQueueFull:
+        # Counted in the ingestor's rejected scans
+        pass
+
+    response = redirect(url, 302)
+    # Every scan must reach the server to be counted
+    response.headers["Cache-Control"] = "no-store"
+    return response, 302
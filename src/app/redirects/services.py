@@ -0,0 +1,127 @@
+import json
+import re
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from bson.objectid import ObjectId
+
+from src.app.qrcodes import async_models
+from src.app.qrcodes.models import find_qr_code_by_code
+from src.config import (
+    REDIRECT_CACHE_DIR,
+    REDIRECT_CACHE_DIR_MAX_BYTES,
+    REDIRECT_CACHE_MAX_ENTRIES,
+    REDIRECT_CACHE_NEGATIVE_TTL,
+    REDIRECT_CACHE_TTL,
+)
+from src.utils.cache import DiskCache, TTLCache
+
+# Short codes are letters and digits; anything else never reaches the cache or MongoDB
+SHORT_CODE_PATTERN = re.compile(r"^[0-9A-Za-z]{1,32}$")
+
+# A redirect target: the ID of the QR code and its destination URL
+Target = Tuple[ObjectId, str]
+
+# Cached in place of a target for codes that do not exist
+NOT_FOUND = object()
+
+
+class RedirectCache:
+    """Two-tier cache of short code to redirect target.
+
+    The first tier is an in-process LRU; the optional second tier is a
+    directory shared by the workers, so a code looked up by one worker is
+    served by the others without a query. Entries expire after ``ttl``
+    seconds in both tiers, which bounds how long a deleted or changed QR
+    code keeps redirecting to its old URL. Unknown codes are remembered in
+    memory for ``negative_ttl`` seconds so that probing them does not reach
+    MongoDB either.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = REDIRECT_CACHE_MAX_ENTRIES,
+        ttl: float = REDIRECT_CACHE_TTL,
+        negative_ttl: float = REDIRECT_CACHE_NEGATIVE_TTL,
+        directory: Optional[str] = REDIRECT_CACHE_DIR,
+        directory_max_bytes: int = REDIRECT_CACHE_DIR_MAX_BYTES,
+    ) -> None:
+        self.memory = TTLCache(max_entries=max_entries, ttl=ttl)
+        self.negative_ttl = negative_ttl
+        self.disk: Optional[DiskCache] = (
+            DiskCache(directory, max_bytes=directory_max_bytes) if directory else None
+        )
+
+    def get(self, code: str) -> Any:
+        """Returns the cached target of a code, NOT_FOUND, or None on a miss."""
+        target = self.memory.get(code)
+        if target is None and self.disk is not None:
+            data = self.disk.get(code)
+            if data is not None:
+                entry = json.loads(data)
+                if entry["expires_at"] > time.time():
+                    target = (ObjectId(entry["qr_code_id"]), entry["url"])
+                    # Promote disk hits into the memory tier, until the disk entry expires
+                    self.memory.set(code, target, entry["expires_at"])
+        return target
+
+    def set(self, code: str, qr_code: Optional[Dict[str, Any]]) -> Optional[Target]:
+        """Caches the result of looking a code up in MongoDB.
+
+        Args:
+            code: The short code (string).
+            qr_code: The QR code found for the code, with its _id and url, or None.
+
+        Returns:
+            The target of the code, or None if it does not exist.
+        """
+        if qr_code is None:
+            self.memory.set(code, NOT_FOUND, time.time() + self.negative_ttl)
+            return None
+        target: Target = (qr_code["_id"], qr_code["url"])
+        expires_at = time.time() + self.memory.ttl
+        self.memory.set(code, target, expires_at)
+        if self.disk is not None:
+            entry = {"qr_code_id": str(qr_code["_id"]), "url": qr_code["url"], "expires_at": expires_at}
+            self.disk.set(code, json.dumps(entry).encode('utf-8'))
+        return target
+
+    def delete(self, code: str) -> None:
+        """Forgets a code in every tier, e.g. after its QR code was deleted."""
+        self.memory.delete(code)
+        if self.disk is not None:
+            self.disk.delete(code)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Returns the counters of each tier."""
+        stats = {"memory": self.memory.stats()}
+        if self.disk is not None:
+            stats["disk"] = self.disk.stats()
+        return stats
+
+
+# Process-wide cache used by the redirect route
+redirect_cache = RedirectCache()
+
+
+def resolve_short_code(code: str) -> Optional[Target]:
+    """Resolves a short code to its redirect target, from the cache when possible.
+
+    Args:
+        code: The short code (string).
+
+    Returns:
+        A (QR code ID, destination URL) tuple, or None if the code does not exist.
+    """
+    target = redirect_cache.get(code)
+    if target is not None:
+        return None if target is NOT_FOUND else target
+    return redirect_cache.set(code, find_qr_code_by_code(code))
+
+
+async def resolve_short_code_async(code: str) -> Optional[Target]:
+    """Resolves a short code like resolve_short_code, querying the async client on a miss."""
+    target = redirect_cache.get(code)
+    if target is not None:
+        return None if target is NOT_FOUND else target
+    return redirect_cache.set(code, await async_models.find_qr_code_by_code(code))
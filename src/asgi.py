@@ -0,0 +1,91 @@
+from typing import Optional
+
+from quart import Quart, Response, jsonify, render_template, request
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
+
+# Async variants of the blueprints, backed by the async MongoDB client
+from src.app.auth.async_routes import auth
+from src.app.qrcodes.async_routes import qrcodes
+from src.app.analytics.async_routes import analytics
+from src.app.redirects.async_routes import redirects
+from src.app.jobs.async_routes import jobs
+
+from src.config import ENSURE_INDEXES_ON_STARTUP, METRICS_ENABLED, SERVER_TIMING_ENABLED
+from src.db.async_database import close_async_client
+from src.app.auth.utils import token_cache_stats
+from src.db.database import get_pool_stats
+from src.db.indexes import ensure_indexes
+from src.utils.json_provider import BSONJSONMixin
+from src.utils.metrics import RequestTrace, current_trace, render_metrics, request_duration
+
+class AsyncBSONJSONProvider(BSONJSONMixin, DefaultJSONProvider):
+    """The JSON provider of the Quart app (see BSONJSONMixin)."""
+
+# Initialize the Quart application, served by an ASGI server:
+#   uvicorn src.asgi:app
+#   gunicorn src.asgi:app -k uvicorn.workers.UvicornWorker
+app = Quart(__name__)
+# Serialize ObjectIds natively, with orjson when installed
+app.json = AsyncBSONJSONProvider(app)
+# Enable Cross-Origin Resource Sharing (CORS) for all routes
+app = cors(app)
+
+# Register blueprints for authentication, QR codes, analytics, short link redirects and background jobs
+app.register_blueprint(auth, url_prefix='/auth')
+app.register_blueprint(qrcodes, url_prefix='/qrcodes')
+app.register_blueprint(analytics, url_prefix='/')
+app.register_blueprint(redirects, url_prefix='/r')
+app.register_blueprint(jobs, url_prefix='/jobs')
+
+if METRICS_ENABLED:
+    # Time every request, with its phases and MongoDB commands; requests share
+    # the event loop thread, so the sampling profiler is only available under WSGI
+    @app.before_request
+    async def start_request_trace() -> None:
+        current_trace.set(RequestTrace())
+
+    @app.after_request
+    async def record_request_trace(response: Response) -> Response:
+        trace: Optional[RequestTrace] = current_trace.get()
+        if trace is not None:
+            route = request.url_rule.rule if request.url_rule else "unmatched"
+            request_duration.observe(
+                trace.elapsed(), method=request.method, route=route, status=str(response.status_code)
+            )
+            if SERVER_TIMING_ENABLED and trace.phases:
+                response.headers["Server-Timing"] = trace.server_timing()
+        return response
+
+    # Define the route exposing the metrics of this worker to Prometheus
+    @app.route('/metrics')
+    async def metrics():
+        """Returns the request, phase and MongoDB command metrics of this worker."""
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Provision the MongoDB indexes on startup when enabled
+if ENSURE_INDEXES_ON_STARTUP:
+    ensure_indexes()
+
+# Close the async MongoDB client of this worker on shutdown
+@app.after_serving
+async def shutdown() -> None:
+    await close_async_client()
+
+# Define the route for the index page
+@app.route('/')
+async def index():
+    """Renders the index.html template."""
+    return await render_template('index.html')
+
+# Define the route exposing database connection pool statistics
+@app.route('/stats/db')
+async def db_stats():
+    """Returns the MongoDB connection pool statistics of this worker."""
+    return jsonify(get_pool_stats())
+
+# Define the route exposing the token verification cache statistics
+@app.route('/stats/tokens')
+async def token_stats():
+    """Returns the hit/miss counters of the token caches of this worker."""
+    return jsonify(token_cache_stats())
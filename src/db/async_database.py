@@ -0,0 +1,88 @@
+import asyncio
+import os
+from typing import Any, Dict, Optional
+
+from pymongo import AsyncMongoClient
+from pymongo.asynchronous.collection import AsyncCollection
+from pymongo.asynchronous.database import AsyncDatabase
+
+from src.config import (
+    METRICS_ENABLED,
+    MONGODB_URI,
+    MONGO_COMPRESSORS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+)
+from src.db.database import DATABASE_NAME, pool_stats
+from src.utils.metrics import command_timings
+
+# Process-wide async client state, created lazily by get_async_client()
+_client: Optional[AsyncMongoClient] = None
+_client_key: Optional[tuple] = None
+
+
+def get_async_client() -> AsyncMongoClient:
+    """Returns the async MongoDB client of the current process and event loop.
+
+    Uses pymongo's native asyncio driver with the same pool settings as the
+    synchronous client. An async client is bound to the event loop it was
+    created in, so a new one is created for each process and loop.
+
+    Returns:
+        The shared AsyncMongoClient.
+    """
+    global _client, _client_key
+    key = (os.getpid(), id(asyncio.get_running_loop()))
+    if _client is None or _client_key != key:
+        options: Dict[str, Any] = {
+            "maxPoolSize": MONGO_MAX_POOL_SIZE,
+            "minPoolSize": MONGO_MIN_POOL_SIZE,
+            "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+            "event_listeners": [pool_stats, command_timings] if METRICS_ENABLED else [pool_stats],
+            "connect": False,
+        }
+        if MONGO_COMPRESSORS:
+            options["compressors"] = MONGO_COMPRESSORS
+        _client = AsyncMongoClient(MONGODB_URI, **options)
+        _client_key = key
+    return _client
+
+
+async def close_async_client() -> None:
+    """Closes the async client, e.g. when the ASGI server shuts down."""
+    global _client, _client_key
+    if _client is not None:
+        await _client.close()
+        _client = None
+        _client_key = None
+
+
+def get_async_db() -> AsyncDatabase:
+    """Returns the application's MongoDB database from the async client."""
+    return get_async_client().get_database(DATABASE_NAME)
+
+
+class AsyncLazyCollection:
+    """An async collection handle resolved against the current event loop's client."""
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def _collection(self) -> AsyncCollection:
+        return get_async_db()[self._name]
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._collection(), attr)
+
+
+def get_async_collection(name: str) -> AsyncLazyCollection:
+    """Returns a handle to a collection of the application database on the async client.
+
+    Args:
+        name: The name of the collection (string).
+
+    Returns:
+        An AsyncLazyCollection proxying to the collection.
+    """
+    return AsyncLazyCollection(name)
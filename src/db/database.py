@@ -1,9 +1,192 @@
 import os
-from pymongo import MongoClient
-
-   
-def get_db():
-       """Returns a MongoDB database client."""
-       uri = os.getenv("MONGODB_URI")
-       client = MongoClient(uri)
-       return client.get_database("qr_code_app")
\ No newline at end of file
+import threading
+from typing import Any, Dict, Optional
+
+from pymongo import MongoClient, monitoring
+from pymongo.collection import Collection
+from pymongo.database import Database
+
+from src.config import (
+    METRICS_ENABLED,
+    MONGODB_URI,
+    MONGO_COMPRESSORS,
+    MONGO_MAX_POOL_SIZE,
+    MONGO_MIN_POOL_SIZE,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS,
+)
+from src.utils.metrics import command_timings
+
+DATABASE_NAME = "qr_code_app"
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Collects connection pool statistics from pymongo's pool events."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Resets every counter to zero."""
+        with self._lock:
+            self.checked_out = 0
+            self.open_connections = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.wait_time_total = 0.0
+            self.wait_time_max = 0.0
+            self.pool_clears = 0
+
+    def _record_wait(self, duration: Optional[float]) -> None:
+        if duration is not None:
+            self.wait_time_total += duration
+            self.wait_time_max = max(self.wait_time_max, duration)
+
+    def connection_checked_out(self, event: monitoring.ConnectionCheckedOutEvent) -> None:
+        with self._lock:
+            self.checked_out += 1
+            self.checkouts += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_check_out_failed(self, event: monitoring.ConnectionCheckOutFailedEvent) -> None:
+        with self._lock:
+            self.checkout_failures += 1
+            self._record_wait(getattr(event, "duration", None))
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        with self._lock:
+            self.checked_out -= 1
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        with self._lock:
+            self.open_connections -= 1
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_check_out_started(self, event: monitoring.ConnectionCheckOutStartedEvent) -> None:
+        pass
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns a snapshot of the pool statistics."""
+        with self._lock:
+            return {
+                "checked_out": self.checked_out,
+                "open_connections": self.open_connections,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "wait_time_total_seconds": self.wait_time_total,
+                "wait_time_avg_seconds": self.wait_time_total / self.checkouts if self.checkouts else 0.0,
+                "wait_time_max_seconds": self.wait_time_max,
+                "pool_clears": self.pool_clears,
+                "max_pool_size": MONGO_MAX_POOL_SIZE,
+            }
+
+
+# Process-wide client state, created lazily by get_client()
+_client: Optional[MongoClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+pool_stats = PoolStatsListener()
+
+
+def get_client() -> MongoClient:
+    """Returns the process-wide MongoDB client, creating it on first use.
+
+    The client is created lazily and without connecting, so a pre-fork server
+    (e.g. gunicorn) can import the application in its master process safely.
+    Each forked worker gets its own client and connection pool.
+
+    Returns:
+        The shared MongoClient for the current process.
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is not None and _client_pid == pid:
+        return _client
+    with _client_lock:
+        if _client is None or _client_pid != pid:
+            options: Dict[str, Any] = {
+                "maxPoolSize": MONGO_MAX_POOL_SIZE,
+                "minPoolSize": MONGO_MIN_POOL_SIZE,
+                "waitQueueTimeoutMS": MONGO_WAIT_QUEUE_TIMEOUT_MS,
+                # Time every command for /metrics only when instrumentation is enabled
+                "event_listeners": [pool_stats, command_timings] if METRICS_ENABLED else [pool_stats],
+                # Defer connecting (and starting monitor threads) until first use
+                "connect": False,
+            }
+            if MONGO_COMPRESSORS:
+                options["compressors"] = MONGO_COMPRESSORS
+            _client = MongoClient(MONGODB_URI, **options)
+            _client_pid = pid
+        return _client
+
+
+def _reset_client_after_fork() -> None:
+    # Drop the parent's client in the child; sockets and locks are not fork-safe
+    global _client, _client_pid, _client_lock
+    _client = None
+    _client_pid = None
+    _client_lock = threading.Lock()
+    # Start the child's statistics from scratch, with a fresh lock
+    pool_stats.__init__()
+
+
+os.register_at_fork(after_in_child=_reset_client_after_fork)
+
+
+def get_db() -> Database:
+    """Returns the application's MongoDB database from the shared client."""
+    return get_client().get_database(DATABASE_NAME)
+
+
+class LazyCollection:
+    """A collection handle resolved against the current process's client.
+
+    Models keep module-level collection objects; resolving them on each
+    access means a worker forked after import never talks through the
+    parent's connection pool.
+    """
+
+    def __init__(self, name: str) -> None:
+        self._name = name
+
+    def _collection(self) -> Collection:
+        return get_db()[self._name]
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._collection(), attr)
+
+
+def get_collection(name: str) -> LazyCollection:
+    """Returns a fork-safe handle to a collection of the application database.
+
+    Args:
+        name: The name of the collection (string).
+
+    Returns:
+        A LazyCollection proxying to the collection on the shared client.
+    """
+    return LazyCollection(name)
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Returns the connection pool statistics of the current process."""
+    return pool_stats.stats()
@@ -0,0 +1,115 @@
+from typing import Dict, List, Optional
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.database import Database
+from pymongo.errors import OperationFailure
+
+from src.config import SCANS_TTL_SECONDS
+from src.db.database import get_db
+
+# Server error codes raised when an index exists with different options
+INDEX_OPTIONS_CONFLICT = 85
+INDEX_KEY_SPECS_CONFLICT = 86
+
+
+def declared_indexes(scans_ttl_seconds: Optional[int] = SCANS_TTL_SECONDS) -> Dict[str, List[IndexModel]]:
+    """Returns the indexes required by the application's queries, per collection.
+
+    Args:
+        scans_ttl_seconds: Expire raw scans after this many seconds, if set (int, optional).
+
+    Returns:
+        A dictionary from collection name to the list of its indexes.
+    """
+    indexes: Dict[str, List[IndexModel]] = {
+        # find_user_by_email, and uniqueness of registered emails
+        "users": [
+            IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
+        ],
+        # get_qr_codes_by_user, newest first and paged by (created_at, _id)
+        "qrcodes": [
+            IndexModel(
+                [("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                name="user_id_created_at_id",
+            ),
+            # Short code lookups of the redirect route; codes created before them are skipped
+            IndexModel([("code", ASCENDING)], unique=True, sparse=True, name="code_unique"),
+            # Retries with an Idempotency-Key, and dedupe mode, of find_or_create_qr_code
+            IndexModel(
+                [("user_id", ASCENDING), ("idempotency_key", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"idempotency_key": {"$exists": True}},
+                name="user_id_idempotency_key",
+            ),
+            IndexModel(
+                [("user_id", ASCENDING), ("dedupe_key", ASCENDING)],
+                unique=True,
+                partialFilterExpression={"dedupe_key": {"$exists": True}},
+                name="user_id_dedupe_key",
+            ),
+        ],
+        # Logo lookups by content, so each user stores an image only once
+        "logos": [
+            IndexModel([("user_id", ASCENDING), ("digest", ASCENDING)], unique=True, name="user_id_digest"),
+        ],
+        # Scans of a QR code restricted to a time range, and paged by _id; the enriched fields
+        # let field histograms group from the index entries
+        "scans": [
+            IndexModel(
+                [
+                    ("qr_code_id", ASCENDING), ("timestamp", ASCENDING),
+                    ("device", ASCENDING), ("os", ASCENDING), ("browser", ASCENDING), ("region", ASCENDING),
+                ],
+                name="qr_code_id_timestamp_enriched",
+            ),
+            IndexModel([("qr_code_id", ASCENDING), ("_id", ASCENDING)], name="qr_code_id_id"),
+        ],
+        # Rollup upserts and reads
+        "scan_rollups": [
+            IndexModel(
+                [("scope", ASCENDING), ("key", ASCENDING), ("granularity", ASCENDING), ("bucket", ASCENDING)],
+                unique=True,
+                name="scope_key_granularity_bucket",
+            ),
+        ],
+    }
+    if scans_ttl_seconds:
+        indexes["scans"].append(
+            IndexModel([("timestamp", ASCENDING)], expireAfterSeconds=scans_ttl_seconds, name="timestamp_ttl")
+        )
+    return indexes
+
+
+def ensure_indexes(db: Optional[Database] = None, scans_ttl_seconds: Optional[int] = SCANS_TTL_SECONDS) -> Dict[str, List[str]]:
+    """Creates every declared index that does not exist yet.
+
+    Creating an index that already exists with the same options is a no-op,
+    so this is safe to run on every start. A TTL index whose expiry changed
+    is updated in place with collMod.
+
+    Args:
+        db: The database to provision (Database, defaults to the application database).
+        scans_ttl_seconds: Expire raw scans after this many seconds, if set (int, optional).
+
+    Returns:
+        A dictionary from collection name to the names of its declared indexes.
+    """
+    db = db if db is not None else get_db()
+    created: Dict[str, List[str]] = {}
+    for collection_name, indexes in declared_indexes(scans_ttl_seconds).items():
+        collection = db[collection_name]
+        for index in indexes:
+            try:
+                collection.create_indexes([index])
+            except OperationFailure as e:
+                expire_after = index.document.get("expireAfterSeconds")
+                if e.code not in (INDEX_OPTIONS_CONFLICT, INDEX_KEY_SPECS_CONFLICT) or expire_after is None:
+                    raise
+                # Only the TTL changed: update the existing index instead of recreating it
+                db.command(
+                    "collMod",
+                    collection_name,
+                    index={"name": index.document["name"], "expireAfterSeconds": expire_after},
+                )
+        created[collection_name] = [index.document["name"] for index in indexes]
+    return created
@@ -0,0 +1,248 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class LRUCache:
+    """A thread-safe, bounded least-recently-used cache.
+
+    Entries are evicted once either the entry count or (optionally) the total
+    size in bytes of the stored values exceeds its limit.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: Optional[int] = None) -> None:
+        """Initializes the cache.
+
+        Args:
+            max_entries: The maximum number of entries to keep (int).
+            max_bytes: The maximum total size of the stored bytes values, if any (int, optional).
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+        # Counters exposed through stats()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value for a key, or None on a miss."""
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            # Mark the entry as most recently used
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Stores a value, evicting the least recently used entries if needed."""
+        size = len(value) if isinstance(value, (bytes, bytearray)) else 0
+        # Never cache a single value larger than the whole byte budget
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._total_bytes -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self._total_bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable) -> None:
+        """Removes a key from the cache if present."""
+        with self._lock:
+            if key in self._data:
+                del self._data[key]
+                self._total_bytes -= self._sizes.pop(key)
+
+    def clear(self) -> None:
+        """Removes every entry from the cache (counters are kept)."""
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._total_bytes = 0
+
+    def _evict(self) -> None:
+        # Pop from the least recently used end until both limits are satisfied
+        while self._data and (
+            len(self._data) > self.max_entries
+            or (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            key, _ = self._data.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(key)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction counters and the current size."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._data),
+            "bytes": self._total_bytes,
+        }
+
+
+class TTLCache(LRUCache):
+    """A bounded LRU cache whose entries also expire at a given time."""
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 60.0) -> None:
+        """Initializes the cache.
+
+        Args:
+            max_entries: The maximum number of entries to keep (int).
+            ttl: The default lifetime of an entry in seconds (float).
+        """
+        super().__init__(max_entries=max_entries)
+        self.ttl = ttl
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value for a key, or None on a miss or if it expired."""
+        with self._lock:
+            entry = super().get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at <= time.time():
+                # Count an expired entry as a miss
+                self.delete(key)
+                self.hits -= 1
+                self.misses += 1
+                self.expirations += 1
+                return None
+            return value
+
+    def set(self, key: Hashable, value: Any, expires_at: Optional[float] = None) -> None:
+        """Stores a value until ``expires_at`` (a UNIX timestamp), or for the default TTL."""
+        if expires_at is None:
+            expires_at = time.time() + self.ttl
+        super().set(key, (value, expires_at))
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction/expiration counters and the current size."""
+        stats = super().stats()
+        stats["expirations"] = self.expirations
+        return stats
+
+
+class DiskCache:
+    """A bytes cache stored as files in a directory, bounded by total size.
+
+    The directory may be shared between worker processes (or hosts, on a
+    shared volume). When the total size exceeds ``max_bytes`` the least
+    recently accessed files are removed first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024) -> None:
+        """Initializes the cache.
+
+        Args:
+            directory: The directory in which entries are stored (string).
+            max_bytes: The maximum total size of the stored files (int).
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        # Running estimate of the directory size; other processes may also write
+        # to it, so the real size is only recomputed when the estimate overflows.
+        self._approx_bytes = self._scan()[1]
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> str:
+        # Shard by the first two characters to keep directories small
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Returns the cached bytes for a key, or None on a miss."""
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            self.misses += 1
+            return None
+        # Touch the file so eviction treats it as recently used
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return data
+
+    def set(self, key: str, value: bytes) -> None:
+        """Stores bytes under a key, evicting old entries if over budget."""
+        if len(value) > self.max_bytes:
+            return
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file then rename, so readers never see partial data
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(value)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._approx_bytes += len(value)
+            if self._approx_bytes > self.max_bytes:
+                self._evict()
+
+    def delete(self, key: str) -> None:
+        """Removes a key if present."""
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def _scan(self) -> Tuple[List[Tuple[float, int, str]], int]:
+        # Collect (mtime, size, path) for every stored entry and the total size
+        entries = []
+        total = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+        return entries, total
+
+    def _evict(self) -> None:
+        # Called with the lock held
+        entries, total = self._scan()
+        if total > self.max_bytes:
+            # Remove the oldest files until we are back under budget
+            entries.sort()
+            for _, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    continue
+                total -= size
+                self.evictions += 1
+        self._approx_bytes = total
+
+    def stats(self) -> Dict[str, int]:
+        """Returns hit/miss/eviction counters."""
+        return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions}
@@ -0,0 +1,17 @@
+from datetime import datetime, timezone
+from typing import Optional
+
+
+def parse_datetime(value: Optional[str]) -> Optional[datetime]:
+    """Parses an optional ISO 8601 request parameter into a naive UTC datetime.
+
+    Raises:
+        ValueError: If the value is not a valid ISO 8601 date or time.
+    """
+    if not value:
+        return None
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is not None:
+        # Timestamps are stored in MongoDB as naive UTC datetimes
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
@@ -0,0 +1,240 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from pymongo import monitoring
+
+# Upper bounds in seconds of the latency histogram buckets, from sub-millisecond
+# Mongo commands to multi-second batch renders
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class Histogram:
+    """A Prometheus-style histogram of observed durations, by label values."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        # Per label set: a count per bucket (the last one being +Inf), and the sum
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Records one observation for the given label values."""
+        key: Labels = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    def render(self) -> Iterator[str]:
+        """Yields the lines of the histogram in the Prometheus text format."""
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = [(key, list(counts), total[0]) for key, (counts, total) in sorted(self._series.items())]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket{format_labels(key + (('le', le),))} {cumulative}"
+            yield f"{self.name}_sum{format_labels(key)} {total}"
+            yield f"{self.name}_count{format_labels(key)} {cumulative}"
+
+    def reset(self) -> None:
+        """Drops every recorded observation."""
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    """A Prometheus-style monotonic counter, by label values."""
+
+    def __init__(self, name: str, help_text: str) -> None:
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        """Adds to the counter of the given label values."""
+        key: Labels = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> Iterator[str]:
+        """Yields the lines of the counter in the Prometheus text format."""
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{format_labels(key)} {value}"
+
+    def reset(self) -> None:
+        """Resets every value to zero."""
+        with self._lock:
+            self._values.clear()
+
+
+def format_labels(labels: Labels) -> str:
+    """Formats label pairs as ``{name="value",...}``, escaped for the text format."""
+    if not labels:
+        return ""
+    pairs = []
+    for name, value in labels:
+        value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        pairs.append(f'{name}="{value}"')
+    return "{" + ",".join(pairs) + "}"
+
+
+# Process-wide metrics, exposed on /metrics
+request_duration = Histogram(
+    "http_request_duration_seconds", "Time spent handling HTTP requests, by route."
+)
+phase_duration = Histogram(
+    "app_phase_duration_seconds", "Time spent in instrumented phases of a request, by phase."
+)
+mongo_command_duration = Histogram(
+    "mongodb_command_duration_seconds", "Round-trip time of MongoDB commands, by command and collection."
+)
+mongo_command_failures = Counter(
+    "mongodb_command_failures_total", "MongoDB commands that returned an error, by command."
+)
+METRICS = (request_duration, phase_duration, mongo_command_duration, mongo_command_failures)
+
+
+def render_metrics() -> str:
+    """Returns every metric of this process in the Prometheus text exposition format."""
+    return "\n".join(line for metric in METRICS for line in metric.render()) + "\n"
+
+
+def reset_metrics() -> None:
+    """Drops every recorded observation, e.g. between tests."""
+    for metric in METRICS:
+        metric.reset()
+
+
+class RequestTrace:
+    """The time spent in each phase of the request being handled.
+
+    Attributes:
+        started: The perf_counter() value when the request started (float).
+        phases: The total seconds and number of calls of each phase (dict).
+    """
+
+    def __init__(self) -> None:
+        self.started = time.perf_counter()
+        self.phases: Dict[str, List[float]] = {}
+
+    def add(self, phase: str, seconds: float) -> None:
+        """Adds the time of one call of a phase."""
+        totals = self.phases.get(phase)
+        if totals is None:
+            self.phases[phase] = [seconds, 1]
+        else:
+            totals[0] += seconds
+            totals[1] += 1
+
+    def elapsed(self) -> float:
+        """Returns the seconds since the request started."""
+        return time.perf_counter() - self.started
+
+    def server_timing(self) -> str:
+        """Returns the phases as a Server-Timing header value, in milliseconds."""
+        return ", ".join(
+            f"{phase.replace('.', '-')};dur={seconds * 1000:.2f}" for phase, (seconds, _) in self.phases.items()
+        )
+
+
+# The trace of the request handled by the current thread or task, if any
+current_trace: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar("current_trace", default=None)
+
+
+@contextmanager
+def span(phase: str) -> Iterator[None]:
+    """Times a block of code as a phase of the current request.
+
+    The duration is recorded in the phase histogram, and added to the
+    request's trace (and so to its Server-Timing header) when inside a request.
+
+    Args:
+        phase: The name of the phase, e.g. "qr.encode" (string).
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        phase_duration.observe(elapsed, phase=phase)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add(phase, elapsed)
+
+
+def timed(phase: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """Decorates a function so that each call is timed as a phase (see span)."""
+    def decorator(fn: Callable[..., Any]) -> Callable[..., Any]:
+        @wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(phase):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+class CommandTimingListener(monitoring.CommandListener):
+    """Times every MongoDB command from pymongo's command monitoring events.
+
+    Each command is recorded in the command histogram with its collection,
+    and added to the current request's trace as the "mongo" phase.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        # Collections of the in-flight commands, by connection and request ID
+        self._collections: Dict[Tuple[Any, int], str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        target = event.command.get(event.command_name)
+        # Most commands name their collection, getMore carries it separately
+        collection = event.command.get("collection") if event.command_name == "getMore" else target
+        with self._lock:
+            self._collections[(event.connection_id, event.request_id)] = (
+                collection if isinstance(collection, str) else ""
+            )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        self._record(event)
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        mongo_command_failures.inc(command=event.command_name)
+        self._record(event)
+
+    def _record(self, event: Any) -> None:
+        with self._lock:
+            collection = self._collections.pop((event.connection_id, event.request_id), "")
+        seconds = event.duration_micros / 1e6
+        mongo_command_duration.observe(seconds, command=event.command_name, collection=collection)
+        trace = current_trace.get()
+        if trace is not None:
+            trace.add("mongo", seconds)
+
+
+# Process-wide command listener, registered on the MongoDB clients
+command_timings = CommandTimingListener()
@@ -0,0 +1,94 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from types import CodeType, FrameType
+from typing import Dict, Optional
+
+
+class SamplingProfiler:
+    """Samples the stacks of the threads serving requests, from one background thread.
+
+    A thread registers itself with ``start`` when a request begins and gets
+    its samples back from ``stop``. Every ``interval`` seconds the sampler
+    reads the current frame of each registered thread with
+    ``sys._current_frames()``, so profiled code runs unmodified. Stacks are
+    written in the folded format of flamegraph.pl and speedscope
+    (``outer;inner;leaf count`` per line).
+    """
+
+    def __init__(self, interval: float, directory: str) -> None:
+        self.interval = interval
+        self.directory = directory
+        self._lock = threading.Lock()
+        # Sample counts of each registered thread, by folded stack
+        self._active: Dict[int, Counter] = {}
+        self._labels: Dict[CodeType, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Starts sampling the calling thread."""
+        with self._lock:
+            self._active[threading.get_ident()] = Counter()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+                self._thread.start()
+
+    def stop(self) -> Counter:
+        """Stops sampling the calling thread and returns its samples."""
+        with self._lock:
+            return self._active.pop(threading.get_ident(), Counter())
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            with self._lock:
+                if not self._active:
+                    continue
+                frames = sys._current_frames()
+                for thread_id, samples in self._active.items():
+                    frame = frames.get(thread_id)
+                    if frame is not None:
+                        samples[self._fold(frame)] += 1
+
+    def _fold(self, frame: Optional[FrameType]) -> str:
+        labels = []
+        while frame is not None:
+            code = frame.f_code
+            label = self._labels.get(code)
+            if label is None:
+                # Semicolons separate frames in the folded format
+                label = self._labels[code] = (
+                    f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})".replace(";", ":")
+                )
+            labels.append(label)
+            frame = frame.f_back
+        return ";".join(reversed(labels))
+
+    def dump(self, samples: Counter, name: str) -> str:
+        """Writes samples to a .folded file of the profile directory.
+
+        Args:
+            samples: The samples returned by stop (Counter).
+            name: A name identifying the request, e.g. its route (string).
+
+        Returns:
+            The path of the written file.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        safe_name = "".join(c if c.isalnum() or c in "-_" else "_" for c in name).strip("_") or "request"
+        path = os.path.join(
+            self.directory, f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{os.getpid()}-{safe_name}.folded"
+        )
+        with open(path, 'w') as f:
+            for stack, count in samples.most_common():
+                f.write(f"{stack} {count}\n")
+        return path
+
+    def reset_after_fork(self) -> None:
+        """Forgets the parent's sampler thread, which does not exist in a forked child."""
+        self._lock = threading.Lock()
+        self._active = {}
+        self._thread = None
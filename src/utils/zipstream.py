@@ -0,0 +1,78 @@
+import io
+import zipfile
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator, Tuple
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """A write-only, non-seekable sink that hands out what was written so far."""
+
+    def __init__(self) -> None:
+        self._chunks = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        # zipfile needs the current offset to build the central directory
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(files: Iterable[Tuple[str, bytes]]) -> Iterator[bytes]:
+    """Streams a ZIP archive as it is built.
+
+    Each file is written as soon as it is produced by ``files`` and the
+    compressed bytes are yielded immediately, so the archive is never held
+    in memory as a whole.
+
+    Args:
+        files: An iterable of (archive name, file content) pairs.
+
+    Yields:
+        Consecutive chunks of the ZIP archive.
+    """
+    sink = _ChunkBuffer()
+    # PNG data is already deflate-compressed, so store it as-is
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        for name, data in files:
+            archive.writestr(name, data)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    # Closing the archive writes the central directory
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+async def stream_zip_async(files: AsyncIterable[Tuple[str, bytes]]) -> AsyncIterator[bytes]:
+    """Streams a ZIP archive as it is built from an asynchronous iterable.
+
+    The async counterpart of stream_zip, for ASGI responses.
+
+    Args:
+        files: An async iterable of (archive name, file content) pairs.
+
+    Yields:
+        Consecutive chunks of the ZIP archive.
+    """
+    sink = _ChunkBuffer()
+    with zipfile.ZipFile(sink, mode='w', compression=zipfile.ZIP_STORED) as archive:
+        async for name, data in files:
+            archive.writestr(name, data)
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
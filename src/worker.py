@@ -0,0 +1,20 @@
+from celery import Celery
+
+from src.config import CELERY_BROKER_URL, CELERY_TASK_ALWAYS_EAGER
+
+# Initialize the Celery application running the background jobs, started with:
+#   celery -A src.worker worker --loglevel=info
+# Job state is kept in MongoDB (see src.app.jobs.models), so no result backend is needed
+celery = Celery("qr_code_generator", broker=CELERY_BROKER_URL, include=["src.app.jobs.tasks"])
+
+celery.conf.update(
+    task_always_eager=CELERY_TASK_ALWAYS_EAGER,
+    task_ignore_result=True,
+    # Acknowledge a job once it finished, so a crashed worker's job is redelivered
+    task_acks_late=True,
+    task_reject_on_worker_lost=True,
+    # Jobs run for minutes, so do not reserve more than one per worker process
+    worker_prefetch_multiplier=1,
+    # Fail the submitting request within a second when the broker is down, instead of retrying for seconds
+    broker_transport_options={"max_retries": 2, "interval_start": 0, "interval_step": 0.5, "interval_max": 0.5},
+)
@@ -0,0 +1,148 @@
+import os
+from typing import Optional
+
+import click
+from flask import Flask, Response, jsonify, render_template, request
+from flask_cors import CORS
+
+# Corrected relative imports for submodules within the src package
+from src.app.auth.routes import auth
+from src.app.qrcodes.routes import qrcodes
+from src.app.analytics.routes import analytics
+from src.app.redirects.routes import redirects
+from src.app.jobs.routes import jobs
+
+# Corrected relative import for configurations
+from src.config import DEBUG, HOST, PORT, SECRET_KEY, ENSURE_INDEXES_ON_STARTUP
+from src.config import METRICS_ENABLED, SERVER_TIMING_ENABLED, PROFILE_DIR, PROFILE_SAMPLE_INTERVAL, PROFILE_SLOW_REQUEST_SECONDS
+from src.app.auth.utils import token_cache_stats
+from src.db.database import get_pool_stats
+from src.db.indexes import ensure_indexes
+from src.app.analytics.enrichment import enrich_stored_scans
+from src.app.analytics.models import RollupRebuildConflict, rebuild_scan_rollups
+from src.utils.json_provider import BSONJSONProvider
+from src.utils.metrics import RequestTrace, current_trace, render_metrics, request_duration
+from src.utils.profiler import SamplingProfiler
+
+# Initialize the Flask application
+app = Flask(__name__)
+# Serialize ObjectIds natively, with orjson when installed
+app.json = BSONJSONProvider(app)
+# Enable Cross-Origin Resource Sharing (CORS) for all routes
+CORS(app)
+
+# Register blueprints for authentication, QR codes, analytics, short link redirects and background jobs
+app.register_blueprint(auth, url_prefix='/auth')
+app.register_blueprint(qrcodes, url_prefix='/qrcodes')
+app.register_blueprint(analytics, url_prefix='/')
+app.register_blueprint(redirects, url_prefix='/r')
+app.register_blueprint(jobs, url_prefix='/jobs')
+
+# Sample the stacks of every request and keep those of slow ones, when enabled
+slow_request_profiler: Optional[SamplingProfiler] = (
+    SamplingProfiler(PROFILE_SAMPLE_INTERVAL, PROFILE_DIR) if PROFILE_SLOW_REQUEST_SECONDS is not None else None
+)
+if slow_request_profiler is not None:
+    os.register_at_fork(after_in_child=slow_request_profiler.reset_after_fork)
+
+def request_route() -> str:
+    """Returns the URL rule of the current request, so metrics are not labeled by raw path."""
+    return request.url_rule.rule if request.url_rule else "unmatched"
+
+if METRICS_ENABLED:
+    # Time every request, with its phases and MongoDB commands
+    @app.before_request
+    def start_request_trace() -> None:
+        """Starts the trace of the request, and sampling its stacks when profiling."""
+        current_trace.set(RequestTrace())
+        if slow_request_profiler is not None:
+            slow_request_profiler.start()
+
+    @app.after_request
+    def record_request_trace(response: Response) -> Response:
+        """Records the request latency, and reports its phases in a Server-Timing header if enabled.
+
+        Streamed responses are timed until their first byte is ready.
+        """
+        trace: Optional[RequestTrace] = current_trace.get()
+        if trace is not None:
+            request_duration.observe(
+                trace.elapsed(), method=request.method, route=request_route(), status=str(response.status_code)
+            )
+            if SERVER_TIMING_ENABLED and trace.phases:
+                response.headers["Server-Timing"] = trace.server_timing()
+        return response
+
+    @app.teardown_request
+    def finish_request_trace(error: Optional[BaseException]) -> None:
+        """Ends the trace of the request, writing its stacks if it was slow."""
+        trace: Optional[RequestTrace] = current_trace.get()
+        current_trace.set(None)
+        if slow_request_profiler is None:
+            return
+        samples = slow_request_profiler.stop()
+        if trace is not None and samples and trace.elapsed() >= PROFILE_SLOW_REQUEST_SECONDS:
+            path = slow_request_profiler.dump(samples, f"{request.method}-{request_route()}")
+            app.logger.warning(
+                "Slow request %s %s took %.3fs, stacks written to %s",
+                request.method, request.path, trace.elapsed(), path,
+            )
+
+    # Define the route exposing the metrics of this worker to Prometheus
+    @app.route('/metrics')
+    def metrics():
+        """Returns the request, phase and MongoDB command metrics of this worker."""
+        return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+# Provision the MongoDB indexes on startup when enabled
+if ENSURE_INDEXES_ON_STARTUP:
+    ensure_indexes()
+
+# Define the route for the index page
+@app.route('/')
+def index():
+    """Renders the index.html template."""
+    # Render the 'index.html' template for the root route
+    return render_template('index.html')
+
+# Define the route exposing database connection pool statistics
+@app.route('/stats/db')
+def db_stats():
+    """Returns the MongoDB connection pool statistics of this worker."""
+    return jsonify(get_pool_stats())
+
+# Define the route exposing the token verification cache statistics
+@app.route('/stats/tokens')
+def token_stats():
+    """Returns the hit/miss counters of the token caches of this worker."""
+    return jsonify(token_cache_stats())
+
+
+# Define a CLI command rebuilding the scan rollups from the raw scans
+@app.cli.command('rebuild-scan-rollups')
+def rebuild_scan_rollups_command():
+    """Recomputes the pre-aggregated scan counters (flask rebuild-scan-rollups).
+
+    Stop the workers ingesting scans first; the rebuild is abandoned if scans are written meanwhile.
+    """
+    try:
+        total = rebuild_scan_rollups()
+    except RollupRebuildConflict as e:
+        raise click.ClickException(str(e))
+    print(f"Aggregated {total} scans")
+
+
+# Define a CLI command enriching the scans stored without device, os, browser and region
+@app.cli.command('enrich-scans')
+def enrich_scans_command():
+    """Fills in the enriched fields of older scans (flask enrich-scans)."""
+    total = enrich_stored_scans()
+    print(f"Enriched {total} scans")
+
+
+# Define a CLI command creating the declared MongoDB indexes
+@app.cli.command('ensure-indexes')
+def ensure_indexes_command():
+    """Creates the declared MongoDB indexes (flask ensure-indexes)."""
+    for collection_name, index_names in ensure_indexes().items():
+        print(f"{collection_name}: {', '.join(index_names)}")
@@ -0,0 +1,94 @@
+import asyncio
+import importlib
+import json
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from src.asgi import app as asgi_app
+from src.app.analytics import services
+from src.app.analytics.ingest import IngestQueueFull
+
+async_models = importlib.import_module("src.app.analytics.async_models")
+async_routes = importlib.import_module("src.app.analytics.async_routes")
+
+DAY = datetime(2024, 5, 15)
+
+
+# Fixture backing the async analytics models with an in-memory database
+@pytest.fixture(autouse=True)
+def collections(async_db, monkeypatch):
+    monkeypatch.setattr(async_models, "scans_collection", async_db["scans"])
+    monkeypatch.setattr(async_models, "scan_rollups_collection", async_db["scan_rollups"])
+    services.histogram_cache.clear()
+    return async_db
+
+
+def rollup(scope, key, count, granularity="day", bucket=DAY):
+    return {"scope": scope, "key": key, "granularity": granularity, "bucket": bucket, "count": count}
+
+
+def get(path):
+    async def fetch():
+        response = await asgi_app.test_client().get(path)
+        return response, await response.get_data(as_text=True)
+
+    return asyncio.run(fetch())
+
+
+def test_scan_pages_link_to_the_next_page(collections):
+    qr_code_id = ObjectId()
+    collections.sync.scans.insert_many([{"qr_code_id": qr_code_id, "timestamp": DAY} for _ in range(3)])
+
+    response, body = get(f'/analytics/{qr_code_id}?limit=2')
+    assert response.status_code == 200
+    assert len(json.loads(body)) == 2
+    assert "rel=\"next\"" in response.headers["Link"]
+
+
+def test_scans_stream_as_ndjson(collections):
+    qr_code_id = ObjectId()
+    collections.sync.scans.insert_many([{"qr_code_id": qr_code_id, "timestamp": DAY} for _ in range(3)])
+
+    response, body = get(f'/analytics/{qr_code_id}?format=ndjson')
+    assert response.mimetype == "application/x-ndjson"
+    assert [json.loads(line)["qr_code_id"] for line in body.splitlines()] == [str(qr_code_id)] * 3
+
+
+def test_user_totals_and_histograms_read_the_rollups(collections):
+    user_id = ObjectId()
+    collections.sync.scan_rollups.insert_many([
+        rollup("user", user_id, 4),
+        rollup("user", user_id, 2, bucket=datetime(2024, 5, 16)),
+        rollup("user", user_id, 6, granularity="hour", bucket=datetime(2024, 5, 15, 9)),
+    ])
+
+    response, body = get(f'/analytics/user/{user_id}')
+    assert json.loads(body) == [{"total_scans": 6}]
+    response, body = get(f'/analytics/user/{user_id}/histogram?by=week')
+    assert json.loads(body) == {"by": "week", "buckets": [{"key": "2024-05-13T00:00:00Z", "count": 6}]}
+
+
+def test_deleting_scans_subtracts_them_from_the_owner(collections):
+    user_id, deleted, kept = ObjectId(), ObjectId(), ObjectId()
+    collections.sync.scans.insert_many([{"qr_code_id": deleted, "timestamp": DAY}, {"qr_code_id": kept, "timestamp": DAY}])
+    collections.sync.scan_rollups.insert_many([rollup("qr_code", deleted, 1), rollup("qr_code", kept, 1), rollup("user", user_id, 2)])
+
+    assert asyncio.run(async_models.delete_scans_of_qr_codes([deleted], user_id)) == 1
+    assert collections.sync.scan_rollups.find_one({"scope": "user"})["count"] == 1
+    assert collections.sync.scan_rollups.count_documents({"scope": "qr_code"}) == 1
+
+
+def test_scans_are_shed_when_the_buffer_is_full(monkeypatch):
+    def full(event, timeout=None):
+        assert timeout == 0
+        raise IngestQueueFull("Scan buffer is full")
+
+    monkeypatch.setattr(async_routes.scan_ingestor, "submit", full)
+
+    async def post():
+        response = await asgi_app.test_client().post(f'/scans/{ObjectId()}')
+        return response.status_code, response.headers.get("Retry-After")
+
+    assert asyncio.run(post()) == (503, "1")
@@ -0,0 +1,64 @@
+import pytest
+
+from src.app.analytics.enrichment import RegionDatabase, ScanEnricher, parse_user_agent
+
+IPHONE = (
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_0 like Mac OS X) AppleWebKit/605.1.15 "
+    "(KHTML, like Gecko) Version/17.0 Mobile/15E148 Safari/604.1"
+)
+ANDROID_TABLET = "Mozilla/5.0 (Linux; Android 14; SM-X710) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+WINDOWS_EDGE = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/120.0 Safari/537.36 Edg/120.0"
+)
+
+
+@pytest.mark.parametrize("user_agent, expected", [
+    (IPHONE, ("mobile", "iOS", "Safari")),
+    (ANDROID_TABLET, ("tablet", "Android", "Chrome")),
+    (WINDOWS_EDGE, ("desktop", "Windows", "Edge")),
+    ("Googlebot/2.1 (+http://www.google.com/bot.html)", ("bot", "Other", "Bot")),
+    (None, ("unknown", "unknown", "Other")),
+])
+def test_parse_user_agent(user_agent, expected):
+    assert parse_user_agent(user_agent) == expected
+
+
+@pytest.fixture
+def region_database(tmp_path):
+    path = tmp_path / "regions.csv"
+    path.write_text(
+        "start_ip,end_ip,region\n"
+        "198.51.100.0,198.51.100.255,US\n"
+        "203.0.113.0,203.0.113.255,AU\n"
+        "2001:db8::,2001:db8::ffff,DE\n"
+    )
+    return RegionDatabase(str(path))
+
+
+@pytest.mark.parametrize("ip_address, region", [
+    ("203.0.113.9", "AU"),
+    ("198.51.100.0", "US"),
+    ("::ffff:198.51.100.7", "US"),
+    ("2001:db8::1", "DE"),
+    ("192.0.2.1", None),
+    ("not an address", None),
+    (None, None),
+])
+def test_region_lookup(region_database, ip_address, region):
+    assert region_database.lookup(ip_address) == region
+
+
+def test_enricher_caches_lookups(region_database):
+    enricher = ScanEnricher(region_database)
+    scans = [{"user_agent": IPHONE, "ip_address": "203.0.113.9"} for _ in range(3)]
+
+    enricher.enrich(scans)
+
+    assert scans[2] == {
+        "user_agent": IPHONE, "ip_address": "203.0.113.9",
+        "device": "mobile", "os": "iOS", "browser": "Safari", "region": "AU",
+    }
+    stats = enricher.stats()
+    assert stats["user_agents"]["misses"] == 1 and stats["user_agents"]["hits"] == 2
+    assert stats["regions"]["misses"] == 1 and stats["regions"]["hits"] == 2
@@ -0,0 +1,111 @@
+import importlib
+from datetime import datetime, timedelta, timezone
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from src.app.analytics import services
+from src.config import ANALYTICS_CACHE_CLOSED_TTL, ANALYTICS_CACHE_TTL
+
+models = importlib.import_module("src.app.analytics.models")
+
+# A Wednesday afternoon
+NOW = datetime(2024, 5, 15, 14, 20)
+
+
+# Fixture to start each test with an empty histogram cache
+@pytest.fixture(autouse=True)
+def clear_histogram_cache():
+    services.histogram_cache.clear()
+
+
+def timestamp(value):
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+def test_daily_rollups_fold_into_weeks_starting_on_monday():
+    rollups = [
+        {"bucket": datetime(2024, 5, 13), "count": 2},
+        {"bucket": datetime(2024, 5, 15), "count": 3},
+        {"bucket": datetime(2024, 5, 20), "count": 1},
+    ]
+
+    assert models.fold_rollups(rollups, "week") == [
+        {"key": datetime(2024, 5, 13), "count": 5},
+        {"key": datetime(2024, 5, 20), "count": 1},
+    ]
+    assert len(models.fold_rollups(rollups, "day")) == 3
+
+
+def test_rollup_query_includes_the_bucket_containing_since():
+    key = ObjectId()
+    query = models.rollup_histogram_query("qr_code", key, "hour", since=NOW, until=NOW + timedelta(hours=2))
+
+    assert query == {
+        "scope": "qr_code",
+        "key": key,
+        "granularity": "hour",
+        "bucket": {"$gte": datetime(2024, 5, 15, 14), "$lt": NOW + timedelta(hours=2)},
+    }
+    assert models.rollup_histogram_query("user", key, "week")["granularity"] == "day"
+
+
+def test_field_histogram_groups_enriched_and_raw_scans(monkeypatch):
+    scans = mongomock.MongoClient().db.scans
+    monkeypatch.setattr(models, "scans_collection", scans)
+    qr_code_id = ObjectId()
+    scans.insert_many([
+        {"qr_code_id": qr_code_id, "timestamp": NOW, "browser": "Firefox", "device": "mobile"},
+        {"qr_code_id": qr_code_id, "timestamp": NOW, "user_agent": "Mozilla/5.0 Firefox/125.0"},
+        {"qr_code_id": qr_code_id, "timestamp": NOW, "user_agent": "Mozilla/5.0 Chrome/124.0"},
+        {"qr_code_id": qr_code_id, "timestamp": NOW - timedelta(days=1), "browser": "Safari"},
+        {"qr_code_id": ObjectId(), "timestamp": NOW, "browser": "Edge"},
+    ])
+
+    assert models.get_field_histogram([qr_code_id], "user_agent", since=NOW - timedelta(hours=1)) == [
+        {"key": "Firefox", "count": 2},
+        {"key": "Chrome", "count": 1},
+    ]
+    assert models.get_field_histogram([qr_code_id], "device", since=NOW - timedelta(hours=1)) == [
+        {"key": "unknown", "count": 2},
+        {"key": "mobile", "count": 1},
+    ]
+
+
+def test_open_histograms_expire_when_their_bucket_closes():
+    end_of_hour = datetime(2024, 5, 15, 14, 59, 30)
+    assert services.histogram_expiry("hour", None, now=end_of_hour) == min(
+        timestamp(datetime(2024, 5, 15, 15)), timestamp(end_of_hour + timedelta(seconds=ANALYTICS_CACHE_TTL))
+    )
+    assert services.histogram_expiry("week", None, now=NOW) == min(
+        timestamp(datetime(2024, 5, 20)), timestamp(NOW + timedelta(seconds=ANALYTICS_CACHE_TTL))
+    )
+    assert services.histogram_expiry("region", None, now=NOW) == timestamp(NOW + timedelta(seconds=ANALYTICS_CACHE_TTL))
+
+
+def test_closed_histograms_are_kept_longer():
+    expiry = services.histogram_expiry("hour", NOW - timedelta(days=1), now=NOW)
+
+    assert expiry == timestamp(NOW + timedelta(seconds=ANALYTICS_CACHE_CLOSED_TTL))
+
+
+def test_histograms_are_cached_per_query(monkeypatch):
+    calls = []
+
+    def get_rollup_histogram(scope, key, by, since, until):
+        calls.append((scope, key, by, since, until))
+        return [{"key": NOW, "count": len(calls)}]
+
+    monkeypatch.setattr(services, "get_rollup_histogram", get_rollup_histogram)
+    key = ObjectId()
+
+    first = services.get_scan_histogram("qr_code", key, "day")
+    assert services.get_scan_histogram("qr_code", key, "day") == first
+    assert len(calls) == 1
+    assert services.histogram_cache.hits == 1
+
+    # Another grouping or range is a different query
+    services.get_scan_histogram("qr_code", key, "hour")
+    services.get_scan_histogram("qr_code", key, "day", since=NOW)
+    assert len(calls) == 3
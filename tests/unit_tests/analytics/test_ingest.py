@@ -0,0 +1,135 @@
+import os
+import threading
+
+import pytest
+from pymongo.errors import PyMongoError
+
+from src.app.analytics.ingest import IngestQueueFull, ScanIngestor
+
+
+class RecordingIngestor(ScanIngestor):
+    """A scan ingestor keeping its batches in memory instead of MongoDB."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.stored = []
+        self.rolled_up = []
+        self.written_event = threading.Event()
+        self.fail_writes = False
+        self.fail_rollups = False
+
+    def write_batch(self, events):
+        if self.fail_writes:
+            raise PyMongoError("insert failed")
+        self.stored.append(list(events))
+
+    def roll_up_batch(self, events):
+        if self.fail_rollups:
+            raise PyMongoError("rollup failed")
+        self.rolled_up.append(list(events))
+        self.written_event.set()
+
+
+def scans(count):
+    return [{"scan": i} for i in range(count)]
+
+
+def test_full_batch_is_written_without_waiting_for_the_interval():
+    ingestor = RecordingIngestor(batch_size=3, flush_interval=60)
+    for event in scans(3):
+        ingestor.submit(event)
+
+    assert ingestor.written_event.wait(5)
+    assert ingestor.stored == [scans(3)]
+    assert ingestor.rolled_up == [scans(3)]
+    ingestor.stop()
+
+
+def test_partial_batch_is_written_after_the_interval():
+    ingestor = RecordingIngestor(batch_size=100, flush_interval=0.05)
+    ingestor.submit({"scan": 0})
+
+    assert ingestor.written_event.wait(5)
+    assert ingestor.stored == [[{"scan": 0}]]
+    ingestor.stop()
+
+
+def test_full_buffer_rejects_events():
+    ingestor = RecordingIngestor(max_buffer=2, batch_size=100, flush_interval=60)
+    # Hold the writer so the buffer cannot drain
+    with ingestor._write_lock:
+        ingestor.submit({"scan": 0})
+        ingestor.submit({"scan": 1})
+        with pytest.raises(IngestQueueFull):
+            ingestor.submit({"scan": 2}, timeout=0)
+    assert ingestor.stats()["rejected"] == 1
+    assert ingestor.stats()["enqueued"] == 2
+    ingestor.stop()
+
+
+def test_stop_flushes_buffered_events():
+    ingestor = RecordingIngestor(batch_size=2, flush_interval=60)
+    for event in scans(5):
+        ingestor.submit(event)
+    ingestor.stop()
+
+    assert [event for batch in ingestor.stored for event in batch] == scans(5)
+    assert max(len(batch) for batch in ingestor.stored) == 2
+    assert ingestor.stats()["written"] == 5
+    assert ingestor.stats()["buffered"] == 0
+
+
+def test_failed_insert_is_counted_as_failed():
+    ingestor = RecordingIngestor(batch_size=2)
+    ingestor.fail_writes = True
+    ingestor._write(scans(3))
+
+    assert ingestor.stats()["failed"] == 3
+    assert ingestor.stats()["written"] == 0
+    assert ingestor.rolled_up == []
+
+
+def test_failed_rollup_is_counted_apart_from_the_stored_scans():
+    ingestor = RecordingIngestor(batch_size=2)
+    ingestor.fail_rollups = True
+    ingestor._write(scans(3))
+
+    stats = ingestor.stats()
+    assert stats["written"] == 3
+    assert stats["failed"] == 0
+    assert stats["rollup_failed"] == 3
+
+
+def test_writer_survives_errors_other_than_mongo_errors():
+    ingestor = RecordingIngestor(batch_size=1, flush_interval=60)
+    write_batch = ingestor.write_batch
+
+    def fail_once(events):
+        if events[0]["scan"] == 0:
+            raise KeyError("qr_code_id")
+        write_batch(events)
+
+    ingestor.write_batch = fail_once
+    ingestor.submit({"scan": 0})
+    ingestor.submit({"scan": 1})
+
+    assert ingestor.written_event.wait(5)
+    ingestor.stop()
+    assert ingestor.stored == [[{"scan": 1}]]
+    assert ingestor.stats()["failed"] == 1
+    assert ingestor.stats()["written"] == 1
+
+
+def test_dead_writer_is_restarted():
+    ingestor = RecordingIngestor(batch_size=1, flush_interval=60)
+    # A writer thread that already exited
+    ingestor._thread = threading.Thread(target=lambda: None)
+    ingestor._thread.start()
+    ingestor._thread.join()
+    ingestor._pid = os.getpid()
+
+    ingestor.submit({"scan": 0})
+
+    assert ingestor.written_event.wait(5)
+    assert ingestor.stored == [[{"scan": 0}]]
+    ingestor.stop()
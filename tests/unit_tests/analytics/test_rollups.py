@@ -0,0 +1,65 @@
+import importlib
+from datetime import datetime, timedelta
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+models = importlib.import_module("src.app.analytics.models")
+
+
+# Fixture backing the scans and rollups with an in-memory database
+@pytest.fixture
+def db(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr(models, "scans_collection", db.scans)
+    monkeypatch.setattr(models, "scan_rollups_collection", db.scan_rollups)
+    monkeypatch.setattr(models, "scan_rollups_rebuild_collection", db.scan_rollups_rebuild)
+    monkeypatch.setattr(models, "get_qr_code_owners", lambda qr_code_ids: {})
+    return db
+
+
+def qr_code_day_counts(db):
+    return {
+        rollup["key"]: rollup["count"]
+        for rollup in db.scan_rollups.find({"scope": "qr_code", "granularity": "day"})
+    }
+
+
+def test_rebuild_replaces_the_rollups(db):
+    qr_code_id = ObjectId()
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    db.scans.insert_many([
+        {"_id": ObjectId.from_datetime(yesterday + timedelta(seconds=i)), "qr_code_id": qr_code_id, "timestamp": yesterday}
+        for i in range(3)
+    ])
+    # Drifted counters, and a rollup of a QR code without scans
+    db.scan_rollups.insert_many([
+        {"scope": "qr_code", "key": qr_code_id, "granularity": "day", "bucket": yesterday, "count": 7},
+        {"scope": "qr_code", "key": ObjectId(), "granularity": "day", "bucket": yesterday, "count": 1},
+    ])
+
+    assert models.rebuild_scan_rollups(batch_size=2) == 3
+    assert qr_code_day_counts(db) == {qr_code_id: 3}
+    assert "scan_rollups_rebuild" not in db.list_collection_names()
+    assert "scope_key_granularity_bucket" in db.scan_rollups.index_information()
+
+
+def test_rebuild_keeps_the_rollups_when_scans_are_written(db, monkeypatch):
+    qr_code_id = ObjectId()
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    db.scans.insert_one({"_id": ObjectId.from_datetime(yesterday), "qr_code_id": qr_code_id, "timestamp": yesterday})
+    db.scan_rollups.insert_one(
+        {"scope": "qr_code", "key": qr_code_id, "granularity": "day", "bucket": yesterday, "count": 2}
+    )
+
+    def ingest_scan(qr_code_ids):
+        # A scan written by the ingestor while the rebuild runs
+        db.scans.insert_one({"qr_code_id": qr_code_id, "timestamp": datetime.utcnow()})
+        return {}
+
+    monkeypatch.setattr(models, "get_qr_code_owners", ingest_scan)
+    with pytest.raises(models.RollupRebuildConflict):
+        models.rebuild_scan_rollups()
+    assert qr_code_day_counts(db) == {qr_code_id: 2}
+    assert "scan_rollups_rebuild" not in db.list_collection_names()
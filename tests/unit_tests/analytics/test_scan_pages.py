@@ -0,0 +1,23 @@
+import asyncio
+
+import pytest
+from bson import ObjectId
+
+from src import app
+from src.asgi import app as asgi_app
+
+
+@pytest.mark.parametrize("limit", ["-5", "0", "ten"])
+def test_invalid_limits_are_rejected(limit):
+    response = app.test_client().get(f'/analytics/{ObjectId()}?limit={limit}')
+
+    assert response.status_code == 400
+    assert response.json == {"error": "limit must be a positive integer"}
+
+
+def test_invalid_limits_are_rejected_by_the_async_app():
+    async def fetch():
+        response = await asgi_app.test_client().get(f'/analytics/{ObjectId()}?limit=-5')
+        return response.status_code, await response.get_json()
+
+    assert asyncio.run(fetch()) == (400, {"error": "limit must be a positive integer"})
@@ -0,0 +1,65 @@
+import asyncio
+import importlib
+
+import pytest
+from quart import url_for
+
+from src.asgi import app as asgi_app
+from src.app.auth.hashing import password_hasher
+
+async_models = importlib.import_module("src.app.auth.async_models")
+
+CREDENTIALS = {"email": "user@example.com", "password": "password"}
+
+
+# Fixture backing the async user model with an in-memory database, with cheap hashes
+@pytest.fixture(autouse=True)
+def users(async_db, monkeypatch):
+    monkeypatch.setattr(async_models, "users_collection", async_db["users"])
+    monkeypatch.setattr(password_hasher, "rounds", 4)
+    return async_db.sync.users
+
+
+def test_register_and_login(users):
+    async def register_and_login():
+        client = asgi_app.test_client()
+        registered = await client.post('/auth/register', json={"username": "user", **CREDENTIALS})
+        duplicate = await client.post('/auth/register', json={"username": "user", **CREDENTIALS})
+        wrong = await client.post('/auth/login', json={**CREDENTIALS, "password": "wrong"})
+        login = await client.post('/auth/login', json=CREDENTIALS)
+        return registered.status_code, duplicate.status_code, wrong.status_code, login.status_code, await login.get_json()
+
+    registered, duplicate, wrong, login, tokens = asyncio.run(register_and_login())
+    assert (registered, duplicate, wrong, login) == (201, 400, 401, 200)
+    assert tokens["access_token"] and tokens["refresh_token"]
+    assert users.find_one({"email": CREDENTIALS["email"]})["password_hash"] != CREDENTIALS["password"]
+
+
+def test_login_rehashes_passwords_with_another_cost_factor(users, monkeypatch):
+    async def register_and_login():
+        client = asgi_app.test_client()
+        await client.post('/auth/register', json={"username": "user", **CREDENTIALS})
+        monkeypatch.setattr(password_hasher, "rounds", 5)
+        return (await client.post('/auth/login', json=CREDENTIALS)).status_code
+
+    assert asyncio.run(register_and_login()) == 200
+    assert not password_hasher.needs_rehash(users.find_one()["password_hash"])
+
+
+def test_logout_revokes_the_refresh_token():
+    async def login_and_logout():
+        client = asgi_app.test_client()
+        await client.post('/auth/register', json={"username": "user", **CREDENTIALS})
+        tokens = await (await client.post('/auth/login', json=CREDENTIALS)).get_json()
+        async with asgi_app.test_request_context('/'):
+            refresh_url = url_for("auth.refresh_token")
+        refreshed = await client.post(refresh_url, json={"refresh_token": tokens["refresh_token"]})
+        await client.post(
+            '/auth/logout',
+            headers={"Authorization": f"Bearer {tokens['access_token']}"},
+            json={"refresh_token": tokens["refresh_token"]},
+        )
+        refused = await client.post(refresh_url, json={"refresh_token": tokens["refresh_token"]})
+        return refreshed.status_code, refused.status_code
+
+    assert asyncio.run(login_and_logout()) == (200, 401)
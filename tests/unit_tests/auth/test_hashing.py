@@ -0,0 +1,79 @@
+import threading
+
+import bcrypt
+import pytest
+from bson import ObjectId
+
+from src.app.auth import routes
+from src.app.auth.hashing import HashingBusy, PasswordHasher
+
+
+def occupy(hasher):
+    # Start a task holding the only slot of the pool until the event is set
+    release = threading.Event()
+    future = hasher._submit(release.wait)
+    return release, future
+
+
+def test_saturated_pool_rejects_work():
+    hasher = PasswordHasher(max_workers=1, max_queue=0, rounds=4)
+    release, future = occupy(hasher)
+
+    with pytest.raises(HashingBusy):
+        hasher.hash("password")
+    assert hasher.rejected == 1
+
+    release.set()
+    future.result()
+
+
+def test_slot_is_released_after_the_work_completes():
+    hasher = PasswordHasher(max_workers=1, max_queue=0, rounds=4)
+    release, future = occupy(hasher)
+    release.set()
+    future.result()
+
+    password_hash = hasher.hash("password")
+    assert hasher.verify("password", password_hash) is True
+    assert hasher.rejected == 0
+
+
+def test_slot_is_released_after_a_failure():
+    hasher = PasswordHasher(max_workers=1, max_queue=0, rounds=4)
+
+    with pytest.raises(ValueError):
+        hasher.verify("password", b"not a bcrypt hash")
+    assert hasher.verify("password", hasher.hash("password")) is True
+
+
+def test_slow_work_times_out():
+    hasher = PasswordHasher(max_workers=1, max_queue=0, rounds=4, timeout=0.05)
+    release = threading.Event()
+
+    with pytest.raises(HashingBusy):
+        hasher._run(release.wait)
+    release.set()
+
+
+@pytest.mark.parametrize("password_hash, needs_rehash", [
+    (bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=4)), False),
+    (bcrypt.hashpw(b"password", bcrypt.gensalt(rounds=5)), True),
+    (b"$2b$xx$invalid", True),
+    (b"plain", True),
+])
+def test_needs_rehash_compares_the_cost_factor(password_hash, needs_rehash):
+    assert PasswordHasher(rounds=4).needs_rehash(password_hash) is needs_rehash
+
+
+def test_busy_hashing_answers_503(monkeypatch):
+    from src import app
+
+    def busy(password, password_hash):
+        raise HashingBusy("Password hashing is saturated")
+
+    monkeypatch.setattr(routes, "find_user_by_email", lambda email: {"_id": ObjectId(), "password_hash": b""})
+    monkeypatch.setattr(routes, "verify_password", busy)
+    response = app.test_client().post('/auth/login', json={"email": "user@example.com", "password": "password"})
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
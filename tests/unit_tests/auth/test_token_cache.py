@@ -0,0 +1,61 @@
+import pytest
+from bson import ObjectId
+from src.app.auth.utils import generate_token, is_token_revoked, revoke_token, token_cache, verify_token_cached
+
+
+# Fixture to start each test with an empty token cache
+@pytest.fixture(autouse=True)
+def clear_token_cache():
+    token_cache.clear()
+
+
+def test_verified_token_is_cached():
+    user_id = ObjectId()
+    token = generate_token(user_id)
+
+    assert verify_token_cached(token) == user_id
+    hits = token_cache.hits
+    assert verify_token_cached(token) == user_id
+    assert token_cache.hits == hits + 1
+
+
+def test_invalid_token_is_rejected():
+    assert verify_token_cached("invalid_token") is None
+    assert len(token_cache) == 0
+
+
+def test_revoked_token_is_rejected():
+    token = generate_token(ObjectId())
+    assert verify_token_cached(token) is not None
+
+    assert revoke_token(token) is True
+    assert verify_token_cached(token) is None
+
+
+def test_revoked_refresh_token_is_rejected():
+    from flask import url_for
+    from src import app
+
+    token = generate_token(ObjectId(), token_type="refresh")
+    with app.test_request_context():
+        refresh_url = url_for("auth.refresh_token")
+    client = app.test_client()
+    assert client.post(refresh_url, json={"refresh_token": token}).status_code == 200
+
+    assert revoke_token(token) is True
+    response = client.post(refresh_url, json={"refresh_token": token})
+    assert response.status_code == 401
+    assert is_token_revoked(token) is True
+
+
+def test_token_cache_stats_are_exposed():
+    from src import app
+
+    token = generate_token(ObjectId())
+    verify_token_cached(token)
+    verify_token_cached(token)
+
+    stats = app.test_client().get("/stats/tokens").get_json()
+    assert stats["verified"]["hits"] == token_cache.hits
+    assert stats["verified"]["entries"] == 1
+    assert "misses" in stats["revoked"]
@@ -0,0 +1,69 @@
+import mongomock
+import pytest
+
+
+class AsyncCursor:
+    """Exposes a mongomock cursor, or a list of documents, through pymongo's AsyncCursor interface."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def sort(self, *args, **kwargs):
+        self._cursor = self._cursor.sort(*args, **kwargs)
+        return self
+
+    def limit(self, limit):
+        self._cursor = self._cursor.limit(limit)
+        return self
+
+    def batch_size(self, batch_size):
+        return self
+
+    async def to_list(self, length=None):
+        documents = list(self._cursor)
+        return documents if length is None else documents[:length]
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self._cursor:
+            yield document
+
+
+class AsyncCollection:
+    """Exposes a mongomock collection through pymongo's AsyncCollection interface."""
+
+    def __init__(self, collection):
+        self._collection = collection
+        self.name = collection.name
+
+    def find(self, *args, **kwargs):
+        return AsyncCursor(self._collection.find(*args, **kwargs))
+
+    async def aggregate(self, pipeline):
+        return AsyncCursor(list(self._collection.aggregate(pipeline)))
+
+    def __getattr__(self, attr):
+        method = getattr(self._collection, attr)
+
+        async def call(*args, **kwargs):
+            return method(*args, **kwargs)
+
+        return call
+
+
+class AsyncDatabase:
+    """An in-memory database whose collections are awaited like the async client's."""
+
+    def __init__(self):
+        self.sync = mongomock.MongoClient().db
+
+    def __getitem__(self, name):
+        return AsyncCollection(self.sync[name])
+
+
+# Fixture providing an in-memory database for the async models
+@pytest.fixture
+def async_db():
+    return AsyncDatabase()
@@ -0,0 +1,80 @@
+import mongomock
+import pytest
+from datetime import datetime
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from src.config import MONGODB_URI
+from src.db.database import get_db
+from src.db.indexes import declared_indexes, ensure_indexes
+
+
+def plan_stages(plan):
+    """Yields every stage name of an explain() winning plan."""
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            yield plan["stage"]
+        for value in plan.values():
+            yield from plan_stages(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from plan_stages(value)
+
+
+def winning_plan(explain):
+    return explain["queryPlanner"]["winningPlan"]
+
+
+# Fixture to provision the indexes once for the module on a live server, as
+# only a real query planner can tell whether a query uses them
+@pytest.fixture(scope="module")
+def indexes():
+    client = MongoClient(MONGODB_URI, serverSelectionTimeoutMS=1000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError:
+        pytest.skip("MongoDB is not reachable")
+    finally:
+        client.close()
+    return ensure_indexes()
+
+
+def test_ensure_indexes_is_idempotent():
+    db = mongomock.MongoClient().db
+    first = ensure_indexes(db)
+    second = ensure_indexes(db)
+
+    assert first == second
+    existing = db.users.index_information()
+    assert existing["email_unique"]["unique"] is True
+
+
+def test_ttl_index_is_optional():
+    assert "timestamp_ttl" not in [index.document["name"] for index in declared_indexes(None)["scans"]]
+    assert "timestamp_ttl" in [index.document["name"] for index in declared_indexes(3600)["scans"]]
+
+    db = mongomock.MongoClient().db
+    ensure_indexes(db, scans_ttl_seconds=3600)
+    assert db.scans.index_information()["timestamp_ttl"]["expireAfterSeconds"] == 3600
+
+
+@pytest.mark.parametrize("collection, query, sort", [
+    ("users", {"email": "test@example.com"}, None),
+    ("qrcodes", {"user_id": ObjectId()}, [("created_at", -1)]),
+    ("qrcodes", {"user_id": ObjectId(), "$or": [
+        {"created_at": {"$lt": datetime(2024, 1, 1)}},
+        {"created_at": datetime(2024, 1, 1), "_id": {"$lt": ObjectId()}},
+    ]}, [("created_at", -1), ("_id", -1)]),
+    ("scans", {"qr_code_id": ObjectId()}, None),
+    ("scans", {"qr_code_id": ObjectId(), "_id": {"$gt": ObjectId()}}, [("_id", 1)]),
+    ("scans", {"qr_code_id": ObjectId(), "timestamp": {"$gte": datetime(2024, 1, 1)}}, None),
+    ("scan_rollups", {"scope": "user", "key": ObjectId(), "granularity": "day"}, None),
+])
+def test_hot_queries_use_an_index(indexes, collection, query, sort):
+    cursor = get_db()[collection].find(query)
+    if sort:
+        cursor = cursor.sort(sort)
+    stages = list(plan_stages(winning_plan(cursor.explain())))
+
+    assert "COLLSCAN" not in stages
+    assert "IXSCAN" in stages
@@ -0,0 +1,93 @@
+import importlib
+
+import pytest
+from bson.objectid import ObjectId
+
+# "src.app" is also the Flask application, so resolve the module by name
+tasks = importlib.import_module("src.app.jobs.tasks")
+
+
+# Fixture recording the job state changes instead of writing them to MongoDB
+@pytest.fixture
+def updates(tmp_path, monkeypatch):
+    updates = []
+    monkeypatch.setattr(tasks, "JOB_STORAGE_DIR", str(tmp_path))
+    monkeypatch.setattr(tasks, "complete_job", lambda job_id, path, result: updates.append(("succeeded", result)))
+    monkeypatch.setattr(tasks, "fail_job", lambda job_id, error: updates.append(("failed", error)))
+    return updates
+
+
+def claim(monkeypatch, job):
+    monkeypatch.setattr(tasks, "start_job", lambda job_id: job)
+
+
+def test_run_job_writes_the_output_and_completes(monkeypatch, updates):
+    job = {"_id": ObjectId(), "kind": "scans"}
+    claim(monkeypatch, job)
+
+    def export(job, path):
+        tasks.write_file(path, [b"a\n", b"b\n"])
+        return {"scans": 2}
+
+    tasks.run_job(str(job["_id"]), export)
+
+    assert updates == [("succeeded", {"scans": 2})]
+    with open(tasks.job_path(job["_id"], "scans"), "rb") as f:
+        assert f.read() == b"a\nb\n"
+
+
+def test_run_job_records_failures(monkeypatch, updates):
+    job = {"_id": ObjectId(), "kind": "qrcodes"}
+    claim(monkeypatch, job)
+
+    def export(job, path):
+        tasks.write_file(path, iter_then_fail())
+
+    with pytest.raises(RuntimeError):
+        tasks.run_job(str(job["_id"]), export)
+
+    assert updates == [("failed", "boom")]
+    # The partial output was discarded
+    assert list(tasks.os.scandir(tasks.JOB_STORAGE_DIR)) == []
+
+
+def test_redelivered_job_is_not_run_twice(monkeypatch, updates):
+    claim(monkeypatch, None)
+
+    def export(job, path):
+        raise AssertionError("must not run")
+
+    tasks.run_job(str(ObjectId()), export)
+
+    assert updates[0][0] == "failed"
+
+
+def iter_then_fail():
+    yield b"partial"
+    raise RuntimeError("boom")
+
+
+def test_succeeded_job_is_downloaded_through_the_route(tmp_path, monkeypatch):
+    import mongomock
+    from src import app
+
+    decorators = importlib.import_module("src.app.auth.decorators")
+    models = importlib.import_module("src.app.jobs.models")
+    user_id = ObjectId()
+    monkeypatch.setattr(decorators, "verify_token_cached", lambda token: user_id)
+    monkeypatch.setattr(models, "jobs_collection", mongomock.MongoClient().db.jobs)
+    # The default relative storage directory, under a scratch working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(tasks, "JOB_STORAGE_DIR", "storage/jobs")
+    job = models.create_job(user_id, "scans", {})
+
+    def export(job, path):
+        tasks.write_file(path, [b'{"scan": 1}\n'])
+        return {"scans": 1}
+
+    tasks.run_job(str(job["_id"]), export)
+    response = app.test_client().get(f'/jobs/{job["_id"]}/download', headers={"Authorization": "Bearer token"})
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    assert response.data == b'{"scan": 1}\n'
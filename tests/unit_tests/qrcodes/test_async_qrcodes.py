@@ -0,0 +1,110 @@
+import asyncio
+import importlib
+
+import pytest
+from bson import ObjectId
+
+from src.asgi import app as asgi_app
+from src.app.auth import async_decorators
+
+async_models = importlib.import_module("src.app.qrcodes.async_models")
+analytics_async_models = importlib.import_module("src.app.analytics.async_models")
+
+USER_ID = ObjectId()
+
+
+# Fixture backing the async models with an in-memory database, and authenticating every request as USER_ID
+@pytest.fixture(autouse=True)
+def collections(async_db, monkeypatch):
+    monkeypatch.setattr(async_models, "qrcodes_collection", async_db["qrcodes"])
+    monkeypatch.setattr(async_models, "logos_collection", async_db["logos"])
+    monkeypatch.setattr(analytics_async_models, "scans_collection", async_db["scans"])
+    monkeypatch.setattr(analytics_async_models, "scan_rollups_collection", async_db["scan_rollups"])
+    monkeypatch.setattr(async_decorators, "verify_token_cached", lambda token: USER_ID)
+    return async_db
+
+
+def create(user_id=USER_ID, url="https://example.com", **kwargs):
+    return async_models.create_qr_code(user_id, url, "Title", "#000000", "#ffffff", **kwargs)
+
+
+def test_find_or_create_replays_a_deduplicated_qr_code():
+    async def create_twice():
+        first, created = await async_models.find_or_create_qr_code(
+            USER_ID, "https://example.com", "Title", "#000000", "#ffffff", dedupe=True
+        )
+        second, created_again = await async_models.find_or_create_qr_code(
+            USER_ID, "https://example.com", "Title", "#000000", "#ffffff", dedupe=True
+        )
+        return first, created, second, created_again
+
+    first, created, second, created_again = asyncio.run(create_twice())
+    assert created is True
+    assert created_again is False
+    assert second["_id"] == first["_id"]
+
+
+def test_qr_codes_of_a_user_are_listed_newest_first():
+    async def list_codes():
+        for index in range(3):
+            await create(url=f"https://example.com/{index}")
+        await create(user_id=ObjectId())
+        return await async_models.get_qr_codes_by_user(USER_ID, limit=2)
+
+    qr_codes = asyncio.run(list_codes())
+    assert [qr_code["url"] for qr_code in qr_codes] == ["https://example.com/2", "https://example.com/1"]
+    assert "dedupe_key" not in qr_codes[0]
+
+
+def test_list_route_pages_through_the_async_models():
+    async def fetch():
+        for index in range(3):
+            await create(url=f"https://example.com/{index}")
+        client = asgi_app.test_client()
+        headers = {"Authorization": "Bearer token"}
+        first = await client.get('/qrcodes/my_qrcodes?limit=2', headers=headers)
+        next_url = first.headers["Link"].split(";")[0].strip("<>")
+        second = await client.get(next_url, headers=headers)
+        return await first.get_json(), await second.get_json(), second.headers.get("Link")
+
+    first, second, last_link = asyncio.run(fetch())
+    assert [qr_code["url"] for qr_code in first + second] == [
+        "https://example.com/2", "https://example.com/1", "https://example.com/0"
+    ]
+    assert last_link is None
+
+
+def test_delete_route_only_deletes_the_users_qr_codes(collections):
+    async def delete():
+        own = await create()
+        other = await create(user_id=ObjectId())
+        client = asgi_app.test_client()
+        headers = {"Authorization": "Bearer token"}
+        deleted = await client.delete(f'/qrcodes/qrcodes/{own["_id"]}', headers=headers)
+        refused = await client.delete(f'/qrcodes/qrcodes/{other["_id"]}', headers=headers)
+        return deleted.status_code, refused.status_code
+
+    assert asyncio.run(delete()) == (200, 404)
+    assert collections.sync.qrcodes.count_documents({}) == 1
+
+
+@pytest.mark.parametrize("body", [{}, {"url": ""}])
+def test_generate_route_requires_a_url(collections, body):
+    async def generate():
+        response = await asgi_app.test_client().post(
+            '/qrcodes/generate', json=body, headers={"Authorization": "Bearer token"}
+        )
+        return response.status_code, await response.get_json()
+
+    assert asyncio.run(generate()) == (400, {"error": "No URL provided"})
+    assert collections.sync.qrcodes.count_documents({}) == 0
+
+
+def test_routes_require_a_token(monkeypatch):
+    monkeypatch.setattr(async_decorators, "verify_token_cached", lambda token: None)
+
+    async def fetch():
+        response = await asgi_app.test_client().get('/qrcodes/my_qrcodes')
+        return response.status_code
+
+    assert asyncio.run(fetch()) == 401
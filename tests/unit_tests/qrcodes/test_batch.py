@@ -0,0 +1,92 @@
+import importlib
+import io
+import json
+import zipfile
+
+import mongomock
+import pytest
+from bson.objectid import ObjectId
+
+from src import app
+from src.app.qrcodes.rendering import render_qr_spec
+from src.app.qrcodes.services import batch_specs
+
+# "src.app" is also the Flask application, so resolve the modules by name
+decorators = importlib.import_module("src.app.auth.decorators")
+models = importlib.import_module("src.app.qrcodes.models")
+routes = importlib.import_module("src.app.qrcodes.routes")
+
+
+# Fixture backing the QR code models with an in-memory collection
+@pytest.fixture
+def qrcodes_collection(monkeypatch):
+    db = mongomock.MongoClient().db
+    monkeypatch.setattr(models, "qrcodes_collection", db.qrcodes)
+    monkeypatch.setattr(models, "logos_collection", db.logos)
+    return db.qrcodes
+
+
+@pytest.mark.parametrize("item, error", [
+    ({"url": "https://example.com", "box_size": 10_000}, "box_size must be an integer between 1 and 50"),
+    ({"url": "https://example.com", "box_size": "12"}, "box_size must be an integer between 1 and 50"),
+    ({"url": "https://example.com", "box_size": True}, "box_size must be an integer between 1 and 50"),
+    ({"url": "https://example.com", "border": -1}, "border must be an integer between 0 and 20"),
+    ({"url": "https://example.com", "foreground_color": "nope"}, "Invalid foreground_color"),
+    ({"url": "https://example.com", "title": ["a"]}, "title must be a string"),
+    ({"url": ""}, "No URL provided"),
+])
+def test_batch_specs_reject_items_the_pool_cannot_render(item, error):
+    specs, indexes, errors = batch_specs([item], {})
+
+    assert specs == [] and indexes == []
+    assert errors == [{"index": 0, "error": error}]
+
+
+def test_batch_specs_keep_valid_sizes():
+    specs, indexes, errors = batch_specs([{"url": "https://example.com", "box_size": 4, "border": 0}], {})
+
+    assert errors == [] and indexes == [0]
+    assert (specs[0]["box_size"], specs[0]["border"], specs[0]["format"]) == (4, 0, "png")
+
+
+def test_create_qr_codes_inserts_in_input_order(qrcodes_collection):
+    user_id = ObjectId()
+
+    created = models.create_qr_codes(user_id, [{"url": "https://a.example"}, {"url": "https://b.example", "title": "b"}])
+
+    assert [qrcodes_collection.find_one({"_id": qr_code["_id"]})["url"] for qr_code in created] == [
+        "https://a.example", "https://b.example",
+    ]
+    assert qrcodes_collection.count_documents({"user_id": user_id}) == 2
+
+
+@pytest.mark.parametrize("body", [{}, {"url": ""}])
+def test_generate_route_requires_a_url(monkeypatch, qrcodes_collection, body):
+    monkeypatch.setattr(decorators, "verify_token_cached", lambda token: ObjectId())
+
+    response = app.test_client().post('/qrcodes/generate', json=body, headers={"Authorization": "Bearer token"})
+
+    assert response.status_code == 400
+    assert response.get_json() == {"error": "No URL provided"}
+    assert qrcodes_collection.count_documents({}) == 0
+
+
+def test_batch_route_streams_images_and_a_manifest(monkeypatch, qrcodes_collection):
+    user_id = ObjectId()
+    monkeypatch.setattr(decorators, "verify_token_cached", lambda token: user_id)
+    # Render in this process instead of the render pool
+    monkeypatch.setattr(routes, "render_qr_batch", lambda specs: map(render_qr_spec, specs))
+    items = [{"url": "https://a.example"}, {"url": "https://b.example", "box_size": 500}]
+
+    response = app.test_client().post(
+        '/qrcodes/generate/batch', json={"items": items}, headers={"Authorization": "Bearer token"}
+    )
+
+    assert response.status_code == 200
+    archive = zipfile.ZipFile(io.BytesIO(response.data))
+    manifest = json.loads(archive.read("manifest.json"))
+    (created,) = manifest["created"]
+    assert created["index"] == 0 and archive.read(created["file"]).startswith(b"\x89PNG")
+    assert manifest["errors"] == [{"index": 1, "error": "box_size must be an integer between 1 and 50"}]
+    # Only the rendered item was saved
+    assert qrcodes_collection.count_documents({"user_id": user_id}) == 1
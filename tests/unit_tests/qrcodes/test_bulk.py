@@ -0,0 +1,53 @@
+from datetime import datetime
+
+from bson.objectid import ObjectId
+
+from src.app.analytics.models import rollup_decrements
+from src.app.qrcodes.models import qr_codes_query
+from src.app.qrcodes.routes import bulk_query, parse_updates, update_fields
+
+
+def test_query_always_restricts_to_the_owner():
+    user_id, qr_code_id = ObjectId(), ObjectId()
+    after = datetime(2025, 1, 1)
+
+    assert qr_codes_query(user_id, [qr_code_id], "campaign", after) == {
+        "user_id": user_id,
+        "_id": {"$in": [qr_code_id]},
+        "title": "campaign",
+        "created_at": {"$gte": after},
+    }
+
+
+def test_bulk_query_requires_a_selection():
+    user_id = ObjectId()
+
+    assert bulk_query({}, user_id) == (None, "Select QR codes by qr_code_ids, title, created_after or created_before")
+    assert bulk_query({"qr_code_ids": ["nope"]}, user_id) == (None, "Invalid QR Code ID")
+    query, error = bulk_query({"created_before": "2025-01-01T00:00:00+01:00"}, user_id)
+    # Times are converted to naive UTC like the stored timestamps
+    assert error is None and query["created_at"] == {"$lt": datetime(2024, 12, 31, 23)}
+
+
+def test_update_fields_only_accept_drawable_colors_and_titles():
+    assert update_fields({"title": "a", "foreground_color": "#ff0000"}) == (
+        {"title": "a", "foreground_color": "#ff0000"}, None
+    )
+    assert update_fields({"background_color": "not a color"}) == (None, "Invalid background_color")
+    assert update_fields({"url": "https://example.com"})[1].startswith("Only title")
+
+    updates, error = parse_updates([{"qr_code_id": str(ObjectId()), "title": "b"}, {"qr_code_id": "x"}])
+    assert updates is None and error == "updates[1]: Invalid QR Code ID"
+
+
+def test_rollup_decrements_are_combined_per_user_bucket():
+    user_id, bucket = ObjectId(), datetime(2025, 1, 1)
+    rollups = [
+        {"granularity": "day", "bucket": bucket, "count": 3},
+        {"granularity": "day", "bucket": bucket, "count": 2},
+    ]
+
+    (update,) = rollup_decrements(rollups, user_id)
+
+    assert update._filter == {"scope": "user", "key": user_id, "granularity": "day", "bucket": bucket}
+    assert update._doc == {"$inc": {"count": -5}}
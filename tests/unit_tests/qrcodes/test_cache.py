@@ -0,0 +1,60 @@
+import pytest
+from src.app.qrcodes.cache import RenderCache, render_cache, render_cache_key
+from src.app.qrcodes.rendering import generate_qr_code
+from src.utils.cache import LRUCache
+
+
+# Fixture to start each test with an empty render cache
+@pytest.fixture(autouse=True)
+def clear_render_cache():
+    render_cache.clear()
+
+
+def test_lru_cache_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.set("a", b"1")
+    cache.set("b", b"2")
+    # Touch "a" so that "b" becomes the least recently used entry
+    assert cache.get("a") == b"1"
+    cache.set("c", b"3")
+
+    assert cache.get("b") is None
+    assert cache.get("c") == b"3"
+    assert cache.stats()["evictions"] == 1
+
+
+def test_lru_cache_byte_budget():
+    cache = LRUCache(max_entries=10, max_bytes=5)
+    cache.set("a", b"123")
+    cache.set("b", b"456")
+
+    assert cache.get("a") is None
+    assert cache.get("b") == b"456"
+
+
+def test_render_cache_key_depends_on_every_input():
+    base = render_cache_key("https://example.com", "#000000", "#ffffff", 10, 5, None)
+    assert base == render_cache_key("https://example.com", "#000000", "#ffffff", 10, 5, None)
+    assert base != render_cache_key("https://example.com", "#000001", "#ffffff", 10, 5, None)
+    assert base != render_cache_key("https://example.com", "#000000", "#ffffff", 10, 4, None)
+    assert base != render_cache_key("https://example.com", "#000000", "#ffffff", 10, 5, "digest")
+
+
+def test_disk_tier_promotes_hits(tmp_path):
+    cache = RenderCache(max_entries=4, directory=str(tmp_path))
+    cache.set("abcdef", b"png-bytes")
+    cache.clear()
+
+    # The entry is gone from memory but still served by the disk tier
+    assert cache.get("abcdef") == b"png-bytes"
+    assert cache.stats()["disk"]["hits"] == 1
+    assert cache.memory.get("abcdef") == b"png-bytes"
+
+
+def test_generate_qr_code_cache_hit():
+    first = generate_qr_code("https://example.com", "title").getvalue()
+    second = generate_qr_code("https://example.com", "title").getvalue()
+
+    assert first == second
+    assert first.startswith(b"\x89PNG")
+    assert render_cache.stats()["memory"]["hits"] == 1
@@ -0,0 +1,101 @@
+import importlib
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from src import app
+from src.app.qrcodes.images import ImageStore
+
+from src.app.qrcodes.models import (
+    IdempotencyKeyReused,
+    check_replay,
+    dedupe_key,
+    qr_code_update,
+    qr_code_upsert_query,
+)
+
+
+def test_dedupe_key_covers_content_fields_only():
+    qr_code = {"url": "https://example.com", "title": "Menu", "error_correction": "M"}
+
+    assert dedupe_key(qr_code) == dedupe_key({**qr_code, "_id": ObjectId(), "code": "abc1234"})
+    assert dedupe_key(qr_code) != dedupe_key({**qr_code, "error_correction": "H"})
+    # Moving characters between fields changes the digest
+    assert dedupe_key({"url": "ab", "title": "c"}) != dedupe_key({"url": "a", "title": "bc"})
+
+
+def test_upsert_query_matches_only_requested_keys():
+    user_id = ObjectId()
+    qr_code_data = {"user_id": user_id, "url": "https://example.com"}
+
+    query = qr_code_upsert_query(qr_code_data, idempotency_key="retry-1")
+
+    assert query == {"user_id": user_id, "$or": [{"idempotency_key": "retry-1"}]}
+    assert "dedupe_key" not in qr_code_data
+
+    query = qr_code_upsert_query(qr_code_data, dedupe=True)
+
+    assert query["$or"] == [{"dedupe_key": dedupe_key(qr_code_data)}]
+
+
+def test_replay_with_other_content_is_rejected():
+    qr_code = {"url": "https://example.com", "title": "Menu"}
+
+    check_replay(qr_code, dict(qr_code))
+    with pytest.raises(IdempotencyKeyReused):
+        check_replay(qr_code, {**qr_code, "url": "https://example.org"})
+
+
+def test_content_updates_drop_the_dedupe_key():
+    assert qr_code_update({"title": "New"}) == {"$set": {"title": "New"}, "$unset": {"dedupe_key": ""}}
+
+
+@pytest.mark.parametrize("dedupe", ["false", 0, None])
+def test_dedupe_must_be_a_boolean(monkeypatch, dedupe):
+    # "src.app" is also the Flask application, so resolve the modules by name
+    decorators = importlib.import_module("src.app.auth.decorators")
+    models = importlib.import_module("src.app.qrcodes.models")
+    monkeypatch.setattr(decorators, "verify_token_cached", lambda token: ObjectId())
+    monkeypatch.setattr(models, "qrcodes_collection", mongomock.MongoClient().db.qrcodes)
+
+    response = app.test_client().post(
+        '/qrcodes/generate',
+        json={"url": "https://example.com", "dedupe": dedupe},
+        headers={"Authorization": "Bearer token"},
+    )
+
+    assert response.status_code == 400
+    assert response.json == {"error": "dedupe must be true or false"}
+    assert models.qrcodes_collection.count_documents({}) == 0
+
+
+@pytest.mark.parametrize("request_options", [
+    {"headers": {"Idempotency-Key": "retry-1"}, "json": {"url": "https://example.com"}},
+    {"headers": {}, "json": {"url": "https://example.com", "dedupe": True}},
+])
+def test_retried_generation_replays_the_stored_image(tmp_path, monkeypatch, request_options):
+    decorators = importlib.import_module("src.app.auth.decorators")
+    models = importlib.import_module("src.app.qrcodes.models")
+    routes = importlib.import_module("src.app.qrcodes.routes")
+    services = importlib.import_module("src.app.qrcodes.services")
+    # Keep the default relative store directory, under a scratch working directory
+    monkeypatch.chdir(tmp_path)
+    store = ImageStore("storage/images")
+    monkeypatch.setattr(routes, "image_store", store)
+    monkeypatch.setattr(services, "image_store", store)
+    user_id = ObjectId()
+    monkeypatch.setattr(decorators, "verify_token_cached", lambda token: user_id)
+    monkeypatch.setattr(models, "qrcodes_collection", mongomock.MongoClient().db.qrcodes)
+    client = app.test_client()
+    headers = {"Authorization": "Bearer token", **request_options["headers"]}
+
+    first = client.post('/qrcodes/generate', json=request_options["json"], headers=headers)
+    second = client.post('/qrcodes/generate', json=request_options["json"], headers=headers)
+
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    assert second.status_code == 200
+    assert second.headers["Idempotent-Replayed"] == "true"
+    assert second.data == first.data
+    assert models.qrcodes_collection.count_documents({}) == 1
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import qrcode
+from src.app.qrcodes.encoder import ERROR_CORRECTION_LEVELS, encode_matrix, minimal_version
+
+PAYLOADS = [
+    "QR",
+    "https://example.com",
+    "https://example.com/r/Ab3dE9x",
+    "0123456789" * 12,
+    "HELLO WORLD $%*+-./:" * 8,
+    "https://example.com/?q=" + "ünïcödé" * 40,
+]
+
+
+def build_qr(url, level):
+    qr = qrcode.QRCode(version=1, border=5, error_correction=level)
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr
+
+
+@pytest.mark.parametrize("error_correction", list(ERROR_CORRECTION_LEVELS))
+@pytest.mark.parametrize("url", PAYLOADS)
+def test_matches_qrcode_fit(url, error_correction):
+    qr = build_qr(url, ERROR_CORRECTION_LEVELS[error_correction])
+
+    assert (encode_matrix(url, error_correction) == np.array(qr.get_matrix())).all()
+
+
+def test_minimal_version_matches_best_fit():
+    # Long numeric payloads cross the version 10 and 27 header size boundaries
+    for length in range(1, 4000, 37):
+        qr = qrcode.QRCode(error_correction=ERROR_CORRECTION_LEVELS["L"])
+        qr.add_data("7" * length)
+        assert minimal_version(qr.data_list, ERROR_CORRECTION_LEVELS["L"]) == qr.best_fit()
+
+
+def test_higher_level_needs_larger_version():
+    url = "https://example.com/" + "a" * 60
+
+    assert len(encode_matrix(url, "H")) > len(encode_matrix(url, "L"))
+
+
+def test_too_long_payload_raises():
+    with pytest.raises(qrcode.exceptions.DataOverflowError):
+        encode_matrix("a" * 5000, "H")
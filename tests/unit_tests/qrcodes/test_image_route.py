@@ -0,0 +1,68 @@
+import importlib
+
+import mongomock
+import pytest
+from bson import ObjectId
+
+from src import app
+from src.app.qrcodes import services
+from src.app.qrcodes.images import ImageStore
+
+# "src.app" is also the Flask application, so resolve the modules by name
+decorators = importlib.import_module("src.app.auth.decorators")
+models = importlib.import_module("src.app.qrcodes.models")
+
+USER_ID = ObjectId()
+HEADERS = {"Authorization": "Bearer token"}
+
+
+# Fixture storing images under the default relative directory of a scratch working directory
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(services, "image_store", ImageStore("storage/images"))
+    monkeypatch.setattr(models, "qrcodes_collection", mongomock.MongoClient().db.qrcodes)
+    monkeypatch.setattr(decorators, "verify_token_cached", lambda token: USER_ID)
+
+
+def saved_qr_code(user_id=USER_ID):
+    return models.create_qr_code(user_id, "https://example.com", "Title", "#000000", "#ffffff")
+
+
+def test_stored_image_is_served():
+    qr_code_id = saved_qr_code()["_id"]
+    client = app.test_client()
+
+    first = client.get(f'/qrcodes/qrcodes/{qr_code_id}/image', headers=HEADERS)
+    second = client.get(f'/qrcodes/qrcodes/{qr_code_id}/image', headers=HEADERS)
+
+    assert first.status_code == 200
+    assert first.mimetype == "image/png"
+    assert first.data.startswith(b"\x89PNG")
+    assert second.data == first.data
+
+
+def test_matching_etag_gets_a_304():
+    qr_code_id = saved_qr_code()["_id"]
+    client = app.test_client()
+    etag = client.get(f'/qrcodes/qrcodes/{qr_code_id}/image', headers=HEADERS).headers["ETag"]
+
+    response = client.get(f'/qrcodes/qrcodes/{qr_code_id}/image', headers={**HEADERS, "If-None-Match": etag})
+
+    assert response.status_code == 304
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.parametrize("qr_code_id", ["not-an-id", str(ObjectId())])
+def test_missing_qr_code_gets_a_404(qr_code_id):
+    response = app.test_client().get(f'/qrcodes/qrcodes/{qr_code_id}/image', headers=HEADERS)
+
+    assert response.status_code == 404
+
+
+def test_other_users_image_gets_a_404():
+    qr_code_id = saved_qr_code(ObjectId())["_id"]
+
+    response = app.test_client().get(f'/qrcodes/qrcodes/{qr_code_id}/image', headers=HEADERS)
+
+    assert response.status_code == 404
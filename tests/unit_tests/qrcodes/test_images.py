@@ -0,0 +1,38 @@
+from bson.objectid import ObjectId
+
+from src.app.qrcodes.images import ImageStore
+from src.app.qrcodes.services import image_render_key
+
+
+def qr_code(**fields):
+    return {"_id": ObjectId(), "url": "https://example.com", "foreground_color": "#000000",
+            "background_color": "#ffffff", **fields}
+
+
+def test_put_get_and_delete(tmp_path):
+    store = ImageStore(directory=str(tmp_path))
+    qr_code_id = str(ObjectId())
+
+    assert store.get(qr_code_id, "key", "png") is None
+    path = store.put(qr_code_id, "key", "png", b"image")
+
+    # Stored under a shard named after the end of the ID
+    assert path.startswith(str(tmp_path / qr_code_id[-2:] / qr_code_id))
+    assert store.get(qr_code_id, "key", "png") == path
+    with open(path, "rb") as f:
+        assert f.read() == b"image"
+
+    store.delete(qr_code_id)
+    assert store.get(qr_code_id, "key", "png") is None
+
+
+def test_render_key_changes_with_every_render_input():
+    code = qr_code()
+    key = image_render_key(code, "png")
+
+    assert image_render_key(code, "png") == key
+    assert image_render_key(code, "webp") != key
+    assert image_render_key(code, "png", box_size=20) != key
+    assert image_render_key(code, "png", border=1) != key
+    assert image_render_key({**code, "foreground_color": "#ff0000"}, "png") != key
+    assert image_render_key({**code, "logo_id": str(ObjectId())}, "png") != key
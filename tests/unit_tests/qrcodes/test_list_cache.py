@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import pytest
+from bson import ObjectId
+
+from src.app.qrcodes.cache import QRCodeListCache
+from src.app.qrcodes.models import QR_CODE_FIELDS, qr_codes_page_projection
+from src.app.qrcodes.services import encode_list_cursor, parse_list_cursor
+
+
+def test_list_cursor_round_trip():
+    qr_code = {"_id": ObjectId(), "created_at": datetime(2024, 5, 17, 8, 30, 12, 345000)}
+
+    assert parse_list_cursor(encode_list_cursor(qr_code)) == (qr_code["created_at"], qr_code["_id"])
+    assert parse_list_cursor(None) is None
+
+
+@pytest.mark.parametrize("cursor", ["abc", "123", "123-notanid", f"-{ObjectId()}"])
+def test_malformed_list_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        parse_list_cursor(cursor)
+
+
+def test_invalidation_drops_every_page_of_the_user():
+    cache = QRCodeListCache(max_users=10, max_pages=10, ttl=60)
+    user_id, other_user_id = ObjectId(), ObjectId()
+    cache.store(cache.bucket(user_id), (None, 100, None), (b"[]", None))
+    cache.store(cache.bucket(user_id), ("cursor", 100, None), (b"[]", None))
+    cache.store(cache.bucket(other_user_id), (None, 100, None), (b"[]", None))
+
+    cache.invalidate(user_id)
+
+    assert cache.bucket(user_id) == {}
+    assert (None, 100, None) in cache.bucket(other_user_id)
+
+
+def test_page_read_before_a_write_is_never_served():
+    cache = QRCodeListCache(max_users=10, max_pages=10, ttl=60)
+    user_id = ObjectId()
+    # A reader takes the bucket, then a write lands before it stores its page
+    bucket = cache.bucket(user_id)
+    cache.invalidate(user_id)
+    cache.store(bucket, (None, 100, None), (b"[\"stale\"]", None))
+
+    assert (None, 100, None) not in cache.bucket(user_id)
+
+
+def test_pages_per_user_are_bounded():
+    cache = QRCodeListCache(max_users=10, max_pages=2, ttl=60)
+    bucket = cache.bucket(ObjectId())
+    for index in range(5):
+        cache.store(bucket, (str(index), 100, None), (b"[]", None))
+
+    assert len(bucket) == 2
+
+
+def test_page_projection_never_returns_internal_fields():
+    projection = qr_codes_page_projection()
+
+    assert set(projection) == set(QR_CODE_FIELDS)
+    assert "idempotency_key" not in projection and "dedupe_key" not in projection
+    assert qr_codes_page_projection(["url"]) == {"url": 1, "created_at": 1}
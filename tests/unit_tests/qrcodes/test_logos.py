@@ -0,0 +1,69 @@
+import importlib
+import io
+
+import pytest
+from PIL import Image
+
+from src.app.qrcodes.cache import render_cache
+from src.app.qrcodes.logos import InvalidLogo, LogoStore, preset_sides
+from src.app.qrcodes.rendering import generate_qr_code
+
+# "src.app" is also the Flask application, so resolve the module by name
+services = importlib.import_module("src.app.qrcodes.services")
+rendering = importlib.import_module("src.app.qrcodes.rendering")
+
+
+def png_bytes(size, color):
+    img_io = io.BytesIO()
+    Image.new("RGBA", size, color).save(img_io, "PNG")
+    return img_io.getvalue()
+
+
+# Fixture providing an empty logo store, also used by generate_qr_code
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = LogoStore(directory=str(tmp_path), max_dimension=64, preset_versions=2)
+    monkeypatch.setattr(services, "logo_store", store)
+    monkeypatch.setattr(rendering, "logo_store", store)
+    render_cache.clear()
+    return store
+
+
+def test_preset_sides_match_rendered_sizes():
+    # A version 1 code at box_size 10 with a border of 5 is 310 pixels wide
+    assert preset_sides([1, 2]) == [62, 70]
+
+
+def test_save_normalizes_and_resizes_presets(store):
+    path, width, height = store.save("logo1", png_bytes((200, 100), (255, 0, 0, 255)))
+
+    # Downscaled to the maximum dimension, keeping the aspect ratio
+    assert (width, height) == (64, 32)
+    assert Image.open(path).mode == "RGBA"
+    store.memory.clear()
+    assert store.variant("logo1", 62).size == (62, 62)
+    # The preset variant was read back from disk instead of being resized
+    assert store.memory.stats()["misses"] == 1
+
+
+def test_variant_is_resized_once_then_cached(store):
+    store.save("logo1", png_bytes((32, 32), (0, 0, 255, 255)))
+    first = store.variant("logo1", 40)
+    second = store.variant("logo1", 40)
+
+    assert first.getpixel((20, 20)) == (0, 0, 255, 255)
+    assert store.memory.stats()["hits"] == 1
+    assert first.tobytes() == second.tobytes()
+
+
+def test_save_rejects_invalid_images(store):
+    with pytest.raises(InvalidLogo):
+        store.save("logo1", b"not an image")
+
+
+def test_generate_qr_code_pastes_stored_logo(store):
+    store.save("logo1", png_bytes((32, 32), (0, 255, 0, 255)))
+    img = Image.open(generate_qr_code("https://example.com", "", logo_id="logo1"))
+
+    # The logo covers the center of the code
+    assert img.convert("RGB").getpixel((img.size[0] // 2, img.size[1] // 2)) == (0, 255, 0)
@@ -0,0 +1,29 @@
+import io
+import sys
+
+from PIL import Image
+
+from src.app.qrcodes.pool import get_render_pool
+from src.app.qrcodes.rendering import render_qr_spec
+
+
+def worker_modules():
+    """Reports, from inside a pool worker, whether the web application was loaded."""
+    src = sys.modules["src"]
+    return {
+        "app": type(getattr(src, "app", None)).__name__,
+        "wsgi": "src.wsgi" in sys.modules,
+        "routes": "src.app.qrcodes.routes" in sys.modules,
+        "models": "src.app.qrcodes.models" in sys.modules,
+    }
+
+
+def test_render_pool_workers_do_not_create_the_app():
+    pool = get_render_pool()
+    # Render first so the worker has unpickled and imported the rendering module
+    png, error = pool.submit(render_qr_spec, {"url": "https://example.com"}).result(timeout=60)
+    loaded = pool.submit(worker_modules).result(timeout=60)
+
+    assert error is None
+    assert Image.open(io.BytesIO(png)).format == "PNG"
+    assert loaded == {"app": "module", "wsgi": False, "routes": False, "models": False}
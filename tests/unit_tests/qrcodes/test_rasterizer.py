@@ -0,0 +1,45 @@
+import numpy as np
+import qrcode
+from src.app.qrcodes.rasterizer import parse_color, rasterize_matrix
+
+
+def build_qr():
+    qr = qrcode.QRCode(version=1, box_size=10, border=5)
+    qr.add_data("https://example.com")
+    qr.make(fit=True)
+    return qr
+
+
+def test_black_and_white_matches_pil_factory():
+    qr = build_qr()
+    expected = qr.make_image().get_image()
+    img = rasterize_matrix(qr.get_matrix(), 10)
+
+    assert img.mode == "1"
+    assert img.size == expected.size
+    assert (np.array(img.convert("L")) == np.array(expected.convert("L"))).all()
+
+
+def test_colors_match_pil_factory():
+    qr = build_qr()
+    expected = qr.make_image(fill_color="#ff0000", back_color="#00ff00").get_image()
+    img = rasterize_matrix(qr.get_matrix(), 10, "#ff0000", "#00ff00")
+
+    assert img.mode == "P"
+    assert (np.array(img.convert("RGB")) == np.array(expected.convert("RGB"))).all()
+
+
+def test_translucent_colors_keep_their_alpha():
+    qr = build_qr()
+    img = rasterize_matrix(qr.get_matrix(), 10, "#ff000080", "transparent")
+
+    assert img.mode == "RGBA"
+    pixels = np.array(img)
+    # The corner is light (border), the first finder module is dark
+    assert tuple(pixels[0, 0]) == (0, 0, 0, 0)
+    assert tuple(pixels[50, 50]) == (255, 0, 0, 128)
+
+
+def test_opaque_alpha_is_dropped():
+    assert parse_color("#ff0000ff") == (255, 0, 0)
+    assert parse_color("#ff000080") == (255, 0, 0, 128)
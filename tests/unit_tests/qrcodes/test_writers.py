@@ -0,0 +1,61 @@
+import re
+import xml.dom.minidom
+
+import pytest
+
+from src.app.qrcodes.rendering import build_qr_matrix
+from src.app.qrcodes.services import color_error
+from src.app.qrcodes.writers import iter_eps, iter_pdf, iter_svg, row_runs
+
+
+def test_row_runs_cover_every_dark_module():
+    matrix = build_qr_matrix("https://example.com")
+    rebuilt = [[False] * len(row) for row in matrix]
+    for y, runs in row_runs(matrix):
+        for x, length in runs:
+            for column in range(x, x + length):
+                rebuilt[y][column] = True
+
+    assert rebuilt == [list(row) for row in matrix]
+
+
+def test_svg_uses_a_single_path():
+    matrix = build_qr_matrix("https://example.com")
+    document = b"".join(iter_svg(matrix, 10, "#000000", "#ffffff")).decode("utf-8")
+
+    svg = xml.dom.minidom.parseString(document).documentElement
+    assert svg.getAttribute("width") == str(len(matrix) * 10)
+    assert len(svg.getElementsByTagName("path")) == 1
+    assert not svg.getElementsByTagName("image")
+
+
+def test_pdf_cross_reference_offsets():
+    matrix = build_qr_matrix("https://example.com")
+    document = b"".join(iter_pdf(matrix, 10))
+
+    assert document.startswith(b"%PDF-1.4")
+    # Every xref entry must point at the start of its object
+    xref = document[document.rindex(b"xref"):]
+    offsets = [int(offset) for offset in re.findall(rb"(\d{10}) 00000 n", xref)]
+    for number, offset in enumerate(offsets, start=1):
+        assert document[offset:].startswith(f"{number} 0 obj".encode("ascii"))
+
+
+def test_translucent_colors_in_vector_output():
+    matrix = build_qr_matrix("https://example.com")
+    svg = b"".join(iter_svg(matrix, 10, "#000000", "#ffffff80")).decode()
+
+    assert 'fill="#ffffff" fill-opacity="0.502"' in svg
+    with pytest.raises(ValueError):
+        b"".join(iter_eps(matrix, 10, "#000000", "transparent"))
+
+
+@pytest.mark.parametrize("value, image_format, error", [
+    ("#ff0000", "pdf", None),
+    ("transparent", "svg", None),
+    ("transparent", "eps", "Transparent colors are not supported for eps output"),
+    ("not-a-color", "svg", "Invalid foreground_color"),
+    (None, "png", "foreground_color must be a string"),
+])
+def test_colors_are_checked_before_streaming(value, image_format, error):
+    assert color_error("foreground_color", value, image_format) == error
@@ -0,0 +1,43 @@
+import importlib
+
+from bson.objectid import ObjectId
+
+from src.app.redirects.services import NOT_FOUND, RedirectCache
+
+# "src.app" is also the Flask application, so resolve the module by name
+services = importlib.import_module("src.app.redirects.services")
+
+
+def test_disk_tier_is_shared_between_caches(tmp_path):
+    qr_code = {"_id": ObjectId(), "url": "https://example.com"}
+    RedirectCache(directory=str(tmp_path)).set("abc123", qr_code)
+
+    # Another worker's cache finds the entry on disk and promotes it
+    other = RedirectCache(directory=str(tmp_path))
+    assert other.get("abc123") == (qr_code["_id"], "https://example.com")
+    assert other.memory.get("abc123") == (qr_code["_id"], "https://example.com")
+
+
+def test_expired_disk_entries_are_ignored(tmp_path):
+    RedirectCache(ttl=-1, directory=str(tmp_path)).set("abc123", {"_id": ObjectId(), "url": "https://example.com"})
+
+    assert RedirectCache(directory=str(tmp_path)).get("abc123") is None
+
+
+def test_resolve_short_code_queries_once(monkeypatch):
+    lookups = []
+
+    def find_qr_code_by_code(code):
+        lookups.append(code)
+        return None if code == "missing" else {"_id": ObjectId(), "url": "https://example.com"}
+
+    monkeypatch.setattr(services, "find_qr_code_by_code", find_qr_code_by_code)
+    monkeypatch.setattr(services, "redirect_cache", RedirectCache())
+
+    assert services.resolve_short_code("abc123")[1] == "https://example.com"
+    assert services.resolve_short_code("abc123")[1] == "https://example.com"
+    # Unknown codes are cached too
+    assert services.resolve_short_code("missing") is None
+    assert services.resolve_short_code("missing") is None
+    assert services.redirect_cache.get("missing") is NOT_FOUND
+    assert lookups == ["abc123", "missing"]
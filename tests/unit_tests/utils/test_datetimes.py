@@ -0,0 +1,22 @@
+from datetime import datetime
+
+import pytest
+
+from src.utils.datetimes import parse_datetime
+
+
+@pytest.mark.parametrize("value, expected", [
+    (None, None),
+    ("", None),
+    ("2024-01-01", datetime(2024, 1, 1)),
+    ("2024-01-01T12:30:00", datetime(2024, 1, 1, 12, 30)),
+    # Aware times are converted to naive UTC, like the stored timestamps
+    ("2024-01-01T12:30:00+02:00", datetime(2024, 1, 1, 10, 30)),
+])
+def test_parse_datetime(value, expected):
+    assert parse_datetime(value) == expected
+
+
+def test_parse_datetime_rejects_invalid_values():
+    with pytest.raises(ValueError):
+        parse_datetime("yesterday")
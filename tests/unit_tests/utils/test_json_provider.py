@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from src.utils import json_provider
+from werkzeug.http import http_date as werkzeug_http_date
+
+from src.utils.json_provider import BSONJSONProvider, http_date
+
+
+@pytest.fixture(params=["orjson", "stdlib"])
+def app(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(json_provider, "orjson", None)
+    elif json_provider.orjson is None:
+        pytest.skip("orjson is not installed")
+    app = Flask(__name__)
+    app.json = BSONJSONProvider(app)
+    return app
+
+
+def test_documents_are_encoded_like_serialized_copies(app):
+    provider = app.json
+    qr_code_id, user_id = ObjectId(), ObjectId()
+    created_at = datetime(2024, 5, 17, 8, 30, 12, 345000)
+    document = {"_id": qr_code_id, "user_id": user_id, "title": "Café", "created_at": created_at}
+    serialized = {**document, "_id": str(qr_code_id), "user_id": str(user_id)}
+    flask_provider = DefaultJSONProvider(Flask(__name__))
+
+    assert provider.loads(provider.dumps([document])) == flask_provider.loads(flask_provider.dumps([serialized]))
+    assert provider.loads(provider.dumpb(document))["created_at"] == "Fri, 17 May 2024 08:30:12 GMT"
+
+
+def test_response_body_is_compact_json(app):
+    with app.app_context():
+        response = app.json.response({"b": ObjectId("0123456789abcdef01234567"), "a": 1})
+
+    assert response.mimetype == "application/json"
+    assert response.get_data() == b'{"a":1,"b":"0123456789abcdef01234567"}\n'
+
+
+def test_unsupported_values_raise_type_error(app):
+    with pytest.raises(TypeError):
+        app.json.dumps({"value": object()})
+
+
+@pytest.mark.parametrize("value", [
+    datetime(2024, 2, 29, 23, 59, 59, 999999),
+    datetime(1999, 12, 31, 0, 0, 1),
+    datetime(2024, 5, 17, 8, 30, tzinfo=timezone(timedelta(hours=2))),
+])
+def test_http_date_matches_werkzeug(value):
+    assert http_date(value) == werkzeug_http_date(value)
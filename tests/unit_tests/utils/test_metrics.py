@@ -0,0 +1,92 @@
+import importlib
+from types import SimpleNamespace
+
+import pytest
+
+from src.utils.metrics import (
+    CommandTimingListener,
+    Histogram,
+    RequestTrace,
+    current_trace,
+    mongo_command_duration,
+    phase_duration,
+    reset_metrics,
+    span,
+)
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("test_seconds", "Test.", buckets=(0.1, 1.0))
+    histogram.observe(0.05, route="/a")
+    histogram.observe(0.5, route="/a")
+    histogram.observe(5, route="/a")
+
+    lines = list(histogram.render())
+
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="/a"} 3' in lines
+    assert 'test_seconds_sum{route="/a"} 5.55' in lines
+
+
+def test_label_values_are_escaped():
+    histogram = Histogram("test_seconds", "Test.", buckets=(1.0,))
+    histogram.observe(0.5, route='say "hi"\\')
+
+    assert 'test_seconds_count{route="say \\"hi\\"\\\\"} 1' in list(histogram.render())
+
+
+def test_span_adds_to_current_trace():
+    reset_metrics()
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    try:
+        with span("qr.encode"):
+            pass
+        with span("qr.encode"):
+            pass
+    finally:
+        current_trace.reset(token)
+
+    assert trace.phases["qr.encode"][1] == 2
+    assert trace.server_timing().startswith("qr-encode;dur=")
+    assert 'app_phase_duration_seconds_count{phase="qr.encode"} 2' in list(phase_duration.render())
+
+
+def test_command_listener_times_commands_by_collection():
+    reset_metrics()
+    listener = CommandTimingListener()
+    trace = RequestTrace()
+    token = current_trace.set(trace)
+    try:
+        listener.started(SimpleNamespace(
+            command_name="find", command={"find": "qrcodes"}, connection_id=("localhost", 27017), request_id=1
+        ))
+        listener.succeeded(SimpleNamespace(
+            command_name="find", duration_micros=1500, connection_id=("localhost", 27017), request_id=1
+        ))
+    finally:
+        current_trace.reset(token)
+
+    lines = list(mongo_command_duration.render())
+    assert 'mongodb_command_duration_seconds_count{collection="qrcodes",command="find"} 1' in lines
+    assert trace.phases["mongo"] == [0.0015, 1]
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_server_timing_header_is_opt_in(monkeypatch, enabled):
+    wsgi = importlib.import_module("src.wsgi")
+    decorators = importlib.import_module("src.app.auth.decorators")
+    monkeypatch.setattr(wsgi, "SERVER_TIMING_ENABLED", enabled)
+
+    def reject_token(token):
+        with span("auth.jwt_decode"):
+            return None
+
+    monkeypatch.setattr(decorators, "verify_token_cached", reject_token)
+
+    response = wsgi.app.test_client().get('/qrcodes/my_qrcodes', headers={"Authorization": "Bearer token"})
+
+    assert response.status_code == 401
+    assert ("auth-jwt_decode" in response.headers.get("Server-Timing", "")) is enabled
@@ -0,0 +1,28 @@
+import asyncio
+import io
+import zipfile
+
+from src.utils.zipstream import stream_zip, stream_zip_async
+
+FILES = [("a.png", b"\x89PNG" + bytes(1000)), ("manifest.json", b'{"created": []}')]
+
+
+def test_stream_zip_yields_a_readable_archive_file_by_file():
+    chunks = list(stream_zip(iter(FILES)))
+
+    # Every file is flushed as soon as it is written, then the central directory
+    assert len(chunks) == len(FILES) + 1
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert [(name, archive.read(name)) for name in archive.namelist()] == FILES
+
+
+def test_stream_zip_async_matches_the_sync_archive():
+    async def files():
+        for file in FILES:
+            yield file
+
+    async def collect():
+        return b"".join([chunk async for chunk in stream_zip_async(files())])
+
+    archive = zipfile.ZipFile(io.BytesIO(asyncio.run(collect())))
+    assert [(name, archive.read(name)) for name in archive.namelist()] == FILES